@@ -60,126 +60,70 @@
 #
 
 
-from os import path,listdir
+from os import path
 import numpy as np
-from scipy.special import gamma
-from datetime import date, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_IOSnet_csv
+from Wind_registry import station_config, mask_gaps
+from Wind_stats import value_counts, value_counts_moments, value_counts_histogram
+from Weibull_methods import W_method_names, WeibullSuffStats, fit_Weibull, Weibull_curves
+from Weibull_gof import gof_scores
+from Weibull_bootstrap import bootstrap_Weibull_days, bootstrap_intervals
 
 
 ###  Weibull parameter estimation methods  ###
 W_param_est = ["EMJ", "EML", "GM1", "GM2", "ML", "MML", "MM", "PDM", "EPF"]
-Weibull_P = []
 
+###  Weibull curves compared with the histogram: density at the bin  ###
+###  midpoints ("midpoint") or bin probabilities from the CDF ("cdf")  ###
+W_comparison = "midpoint"
 
-###  Weather station index to calculate for  ###
-#
-# 0 : Vacoas
-# 1 : MRT, Bras d'Eau
-# 2 : Réserve Tortues, Rodrigues
-# 3 : UoM FoA rooftop, Réduit
-#
-#
-stationIdx = 3
+###  Number of bootstrap resamples for the confidence intervals of k  ###
+###  and c, e.g. 1000 (0 to skip the bootstrap, which takes a while)  ###
+nboot = 0
 
+
+###  Weather station to calculate for (see Stations.json)  ###
+#
+# IOSnet_Vacoas    : Vacoas
+# IOSnet_Bras_dEau : MRT, Bras d'Eau
+# IOSnet_Rodrigues : Réserve Tortues, Rodrigues
+# IOSnet_Reduit    : UoM FoA rooftop, Réduit
 #
-#  NOTE:
-#  First 2 strings describes weather station and location, 3rd string is the
-#  path to the data. 4th and 5th strings are keywords for the CSV data. 6th
-#  item is the bin size (in m/s) to use for the histogram.  Finally, the last
-#  string in each sublist is the mask to apply to each data series due to gaps
-#  in the collection.
 #
-IOSnet_stations = [[
-                    "Mauritius Meteorological Station",
-                    "Vacoas",
-                    "./Sample_data/IOSnet/Vacoas",
-                    "WD_nf01_Avg",
-                    "WS_nf01_Avg",
-                    0.50,
-                    "(wind_df['timestamp'] < '2022-02-17 00:00:00') | ((wind_df['timestamp'] > '2022-03-09 23:59:00') & (wind_df['timestamp'] < '2022-05-29 00:00:00')) | (wind_df['timestamp'] > '2022-12-06 23:59:00')"
-                   ],
-                   [
-                     "MRT",
-                     "Bras d'Eau",
-                     "./Sample_data/IOSnet/Bras_dEau",
-                     "WD_mk01_Avg",
-                     "WS_mk01_Avg",
-                     0.20,
-                     "(wind_df['timestamp'] < '2020-03-19 00:00:00') | ((wind_df['timestamp'] > '2020-05-18 23:59:00') & (wind_df['timestamp'] < '2022-01-14 00:00:00')) | (wind_df['timestamp'] > '2022-05-17 23:59:00')"
-                   ],
-                   [
-                     "Reserves Tortues",
-                     "Rodrigues",
-                     "./Sample_data/IOSnet/Rodrigues",
-                     "WD_mo01_Avg",
-                     "WS_mo01_Avg",
-                     0.50,
-                     "(wind_df['timestamp'] < '2022-09-03 00:00:00') | (wind_df['timestamp'] > '2022-11-30 23:59:00')"
-                   ],
-                   [
-                     "Réduit",
-                     "UoM FoA rooftop, Réduit",
-                     "./Sample_data/IOSnet/Reduit",
-                     "WD_mp01_Avg",
-                     "WS_mp01_Avg",
-                     0.50,
-                     "(wind_df['timestamp'] > '2022-12-05 23:59:00')"
-                   ]]
+station = station_config("IOSnet_Reduit")
 
 
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(IOSnet_stations[stationIdx][2]):
-    print("{:s} is not a directory!".format(IOSnet_stations[stationIdx][2]))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
-
-##  Weather station data
-filelist = sorted( listdir(IOSnet_stations[stationIdx][2]) )
-
-print("\nSuccessfully accessed directory")
-print(IOSnet_stations[stationIdx][2])
-print("\nContent of directory:")
-print(filelist)
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-print()
-
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(IOSnet_stations[stationIdx][2] + "/" + filelist[i]))
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-    tmp_df = pd.read_csv(IOSnet_stations[stationIdx][2] + "/" + filelist[i], header=0)
 
 
-    # Create new data frame with timestamp and wind data only,
-    # and drop NaN values.
-    #
-    # WD_xxxx_Avg: average wind direction (degrees)
-    # WS_xxxx_Avg: wind speed
-    #
-    if (i == 0):
-        wind_df = tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')
+###  BEGIN Open files and load relevant data into arrays  ###
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')],
-                             axis=0)
+##  Weather station data
+#
+# WD_xxxx_Avg: average wind direction (degrees)
+# WS_xxxx_Avg: wind speed
+#
+wind_df, ingest_report = load_directory(station.path, read_IOSnet_csv,
+                                        station.wd_col,
+                                        station.ws_col, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
 
 
-print("Converting time stamps to datetime objects ...")
-wind_df['timestamp'] = pd.to_datetime( wind_df['timestamp'], format="%Y-%m-%dT%H:%M:%SZ" )
-
 print()
 print("------------------------------------------------------------")
 print("type(wind_df):")
@@ -197,9 +141,8 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Set up mask excluding gaps in the data and apply mask
-mask = eval( IOSnet_stations[stationIdx][6] )
-new_df = wind_df.loc[ mask ]
+# Mask excluding gaps in the data (see Stations.json) and apply mask
+new_df = mask_gaps(wind_df, station)
 
 print()
 print("------------------------------------------------------------")
@@ -221,17 +164,17 @@ print("------------------------------------------------------------")
 ###  BEGIN Make histogram and probability distribution  ###
 
 # Convert wind speed series to numpy array
-avg_ws = new_df[[ IOSnet_stations[stationIdx][4] ]].to_numpy().T[0]
+avg_ws = new_df[ station.ws_col ].to_numpy()
+ws_vc = value_counts(avg_ws)
 
-bin_size = IOSnet_stations[stationIdx][5]  # m/s
-ceil_ws = np.ceil(avg_ws.max())
-hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+bin_size = station.bin_size  # m/s
+hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
 
-# Probability density, mean and standard deviation
-ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
-cumul_P = (ws_P * bin_size).cumsum()
-ws_mean = avg_ws.mean()
-ws_stddev = np.std(avg_ws)
+# Probability density over the real widths of the bins, mean and standard
+# deviation
+ws_P = (hist_w8ts / hist_w8ts.sum()) / np.diff(hist_edges)
+cumul_P = (ws_P * np.diff(hist_edges)).cumsum()
+ws_count, ws_mean, ws_stddev = value_counts_moments(ws_vc)
 ws_midpts = np.zeros( hist_w8ts.shape )
 
 
@@ -267,248 +210,44 @@ print()
 
 ###  BEGIN parameter estimation  ###
 
-#---------------------------------------------------------------------#
-#  Empirical method/standard deviation method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Empirical method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Lysen empirical method (Lysen, 1983)
-k = (ws_stddev / ws_mean)**-1.086
-c = ws_mean * ( 0.568 + 0.434/k )**(-1.0/k)
-
-print("Lysen empirical method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Graphical Method (Rohatgi & Nelson, 1994)
-
-y = np.log( -1.0 * np.log(1.0 - cumul_P) )
-
-# Eliminate NaN or Inf in y array which might arise due to log(0)
-y = y[ np.logical_not( np.isnan(y) ) ]
-y = y[ np.logical_not( np.isinf(y) ) ]
-
-# midpoints
-x = np.log( ws_midpts[0 : len(y)] )
-
-
-den = (x * x).sum() - (len(x) * x.mean() * x.mean())
-
-num = (x * y).sum() - (len(x) * x.mean() * y.mean())
-k = num / den
-num = (y.mean() * (x * x).sum()) - (x.mean() * (x * y).sum())
-c = np.e**(-1.0 * (num / den) / k)
-
-print("Graphical method (using histogram's midpoints): k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-
-
-# upper edges
-x = np.log( hist_edges[1 : 1+len(y)] )
-
-den = (x * x).sum() - (len(x) * x.mean() * x.mean())
-
-num = (x * y).sum() - (len(x) * x.mean() * y.mean())
-k = num / den
-num = (y.mean() * (x * x).sum()) - (x.mean() * (x * y).sum())
-c = np.e**(-1.0 * (num / den) / k)
-
-print("Graphical method (using histogram's upper edges): k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Maximum likelihood method (Stevens & Smulders, 1979)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-# Take ln(avg_ws) and replace NaN values with 0.0
-log_ws = np.log(avg_ws)
-np.nan_to_num(log_ws, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-
-# Find number of non-zero wind speed data points
-n = np.count_nonzero( [ avg_ws > 0.1 ] )
-
-i=0
-while True:
-    ws_pow_k = avg_ws**k
-
-    prev_k = k
-    k = 1.0 / ( (ws_pow_k * log_ws).sum()/ws_pow_k.sum() - log_ws.sum()/n )
-    i = i + 1
-
-    #print("#{:3d}\tk = {:4.2f}".format(i, k))
-
-    if (abs(k - prev_k) < 0.005):
-        break
+# Sufficient statistics: moments, histogram and the wind speeds for the
+# maximum likelihood method
+W_stats = WeibullSuffStats(ws_mean, ws_stddev, hist_w8ts, hist_edges, ws_vc.values, ws_vc.counts)
+W_params = fit_Weibull(W_stats, W_param_est)
 
-# Calculate c from best estimates for k
-c = ( (avg_ws**k).sum() / n )**(1/k)
-
-print("Maximum likelihood method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Modified maximum likelihood method (Seguro & Lambert, 2000)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-# Take ln(avg_ws) and replace NaN values with 0.0
-log_ws = np.log(ws_midpts)
-np.nan_to_num(log_ws, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-
-# Total number of bins
-n = hist_w8ts.sum()
-
-i=0
-#print("\nIterating for the maximum likelihood method ...")
-#print("#{:3d}\tk = {:4.2f}".format(i, k))
-while True:
-    ws_pow_k = ws_midpts**k
-
-    prev_k = k
-    k = 1.0 / ( (ws_pow_k * log_ws * hist_w8ts).sum()/(ws_pow_k * hist_w8ts).sum() - (log_ws * hist_w8ts).sum()/n )
-    i = i + 1
-
-    #print("#{:3d}\tk = {:4.2f}".format(i, k))
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-# Calculate c from best estimates for k
-c = ( (ws_pow_k * hist_w8ts).sum()/n )**(1/k)
-
-print("Modified maximum likelihood method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Method of moments (Bowden et al. 1983)
-k = ( (0.9874*ws_mean) / ws_stddev )**1.0983
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Method of moments: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Power density method (Akdag & Dinler, 2009)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-i=0
-while True:
-    Epf = gamma(1.0 + 3.0/k) / ( gamma(1.0 + 1.0/k)**3 )
-
-    prev_k = k
-    k = 1.0 + 3.69/(Epf*Epf)
-    i = i + 1
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Power density method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Energy pattern factor method (Akdag & Guler, 2015)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-i=0
-while True:
-    Epf = gamma(1.0 + 3.0/k) / ( gamma(1.0 + 1.0/k)**3 )
-
-    prev_k = k
-    k = (0.59039*Epf**4 + 2.15143*Epf**3 - 5.78961*Epf*Epf + 3.27527*Epf - 0.220374) / (0.992007*Epf**4 - 0.800468*Epf**3 - 2.60973*Epf*Epf + 3.69115*Epf - 1.27285)
-    i = i + 1
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Energy pattern factor method: k = {:.2f}\tc = {:.2f}".format(k,c))
+for i in range( len(W_param_est) ):
+    k, c = W_params[ W_param_est[i] ]
+    print("{:s}: k = {:.2f}\tc = {:.2f}".format(W_method_names[ W_param_est[i] ], k, c))
 
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
+# Calculate curves, one row per method
+W_k = np.array([ W_params[method][0] for method in W_param_est ])
+W_c = np.array([ W_params[method][1] for method in W_param_est ])
+Weibull_P = Weibull_curves(hist_edges, W_k, W_c, W_comparison)
 
 ###  END parameter estimation  ###
 
 
+###  BEGIN Bootstrap confidence intervals  ###
 
-###  BEGIN Statistical comparison  ###
-
-#---------------------------------------------------------------------#
-#  Root Mean Square Error (RMSE)
+# The 1-minute data is autocorrelated, so whole days are resampled
+if (nboot > 0):
+    W_boot = bootstrap_Weibull_days(new_df['timestamp'], avg_ws, bin_size, nboot=nboot, methods=W_param_est)
 
-RMSE = []
-for i in range( len(W_param_est) ):
-    diff = (Weibull_P[i] - ws_P) * (Weibull_P[i] - ws_P)
-    RMSE.append( np.sqrt( diff.sum() / len(diff) ) )
+    print("\n95% bootstrap confidence intervals ({:d} resamples of days):".format(nboot))
+    print(bootstrap_intervals(W_boot).to_string(float_format="{:.2f}".format))
 
-print()
-#---------------------------------------------------------------------#
+###  END Bootstrap confidence intervals  ###
 
-#---------------------------------------------------------------------#
-#  Coefficient of Determination (R^2)
 
-Rsqrd = []
-diff_den = (ws_P - ws_P.mean()) * (ws_P - ws_P.mean())
-for i in range( len(W_param_est) ):
-    diff_num = (Weibull_P[i] - ws_P) * (Weibull_P[i] - ws_P)
-    Rsqrd.append( 1 - ( diff_num.sum() / diff_den.sum() ) )
 
-print()
-#---------------------------------------------------------------------#
-
-#---------------------------------------------------------------------#
-#  Mean Absolute Percentage Error (MAPE)
+###  BEGIN Statistical comparison  ###
 
-MAPE = []
-for i in range( len(W_param_est) ):
-    diff = np.abs(Weibull_P[i] - ws_P) / ws_P
-    np.nan_to_num(diff, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-    MAPE.append( ( diff.sum() / len(diff) ) * 100.0 )
+#  Root Mean Square Error (RMSE), Coefficient of Determination (R^2), Mean
+#  Absolute Percentage Error (MAPE), chi-square and Kolmogorov-Smirnov
+#  distance, for all the curves at once
+W_gof = gof_scores(Weibull_P, ws_P, hist_edges, hist_w8ts.sum())
 
 print()
-#---------------------------------------------------------------------#
 
 ###  END Statistical comparison  ###
 
@@ -518,7 +257,7 @@ print("------------------------------------------------------------")
 print()
 print("Computed the Weibull curve for the wind speed data from the IOS-net project")
 print("for the weather station found at")
-print("{:s}, {:s}".format(IOSnet_stations[stationIdx][0], IOSnet_stations[stationIdx][1]))
+print("{:s}, {:s}".format(station.name, station.location))
 print("Data ranges from {:s}  to  {:s}".format(wind_df['timestamp'].min().strftime("%d.%m.%Y"), wind_df['timestamp'].max().strftime("%d.%m.%Y")))
 print()
 print("------------------------------------------------------------")
@@ -526,11 +265,11 @@ print()
 print("Statistical difference between actual wind speed data distribution and the")
 print("Weibull curve:")
 print()
-print("Method \t RMSE     R squared       MAPE")
-print("------------------------------------------------------------")
+print("Method \t RMSE     R squared       MAPE     Chi-square (dof)       KS")
+print("--------------------------------------------------------------------------------")
 for i in range( len(W_param_est) ):
-    print("{:s} \t {:7.5f}    {:7.5f}   {:7.5f}".format(W_param_est[i], RMSE[i], Rsqrd[i], MAPE[i]))
-print("------------------------------------------------------------")
+    print("{:s} \t {:7.5f}    {:7.5f}   {:7.5f}   {:12.3f} ({:3d})   {:7.5f}".format(W_param_est[i], W_gof.RMSE[i], W_gof.Rsqrd[i], W_gof.MAPE[i], W_gof.chi2[i], W_gof.chi2_dof[i], W_gof.KS[i]))
+print("--------------------------------------------------------------------------------")
 
 
 print()
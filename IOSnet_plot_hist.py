@@ -46,121 +46,64 @@
 #
 
 
-from os import path,listdir
+from os import path
 import numpy as np
 from scipy.special import gamma
 from datetime import date, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_IOSnet_csv
+from Wind_registry import station_config, mask_gaps
+from Wind_stats import value_counts, value_counts_moments, value_counts_histogram
+from Wind_plots import pyplot, show_figure
 
 
-###  Weather station index to calculate for  ###
+###  Weather station to calculate for (see Stations.json)  ###
 #
-# 0 : Vacoas
-# 1 : MRT, Bras d'Eau
-# 2 : Réserve Tortues, Rodrigues
-# 3 : UoM FoA rooftop, Réduit
+# IOSnet_Vacoas    : Vacoas
+# IOSnet_Bras_dEau : MRT, Bras d'Eau
+# IOSnet_Rodrigues : Réserve Tortues, Rodrigues
+# IOSnet_Reduit    : UoM FoA rooftop, Réduit
 #
 #
-stationIdx = 1
-
-#
-#  NOTE:
-#  First 2 strings describes weather station and location, 3rd string is the
-#  path to the data. 4th and 5th strings are keywords for the CSV data. 6th
-#  item is the bin size (in m/s) to use for the histogram.  Finally, the last
-#  string in each sublist is the mask to apply to each data series due to gaps
-#  in the collection.
-#
-IOSnet_stations = [[
-                    "Mauritius Meteorological Station",
-                    "Vacoas",
-                    "./Sample_data/IOSnet/Vacoas",
-                    "WD_nf01_Avg",
-                    "WS_nf01_Avg",
-                    0.50,
-                    "(wind_df['timestamp'] < '2022-02-17 00:00:00') | ((wind_df['timestamp'] > '2022-03-09 23:59:00') & (wind_df['timestamp'] < '2022-05-29 00:00:00')) | (wind_df['timestamp'] > '2022-12-06 23:59:00')"
-                   ],
-                   [
-                     "MRT",
-                     "Bras d'Eau",
-                     "./Sample_data/IOSnet/Bras_dEau",
-                     "WD_mk01_Avg",
-                     "WS_mk01_Avg",
-                     0.20,
-                     "(wind_df['timestamp'] < '2020-03-19 00:00:00') | ((wind_df['timestamp'] > '2020-05-18 23:59:00') & (wind_df['timestamp'] < '2022-01-14 00:00:00')) | (wind_df['timestamp'] > '2022-05-17 23:59:00')"
-                   ],
-                   [
-                     "Reserves Tortues",
-                     "Rodrigues",
-                     "./Sample_data/IOSnet/Rodrigues",
-                     "WD_mo01_Avg",
-                     "WS_mo01_Avg",
-                     0.50,
-                     "(wind_df['timestamp'] < '2022-09-03 00:00:00') | (wind_df['timestamp'] > '2022-11-30 23:59:00')"
-                   ],
-                   [
-                     "Réduit",
-                     "UoM FoA rooftop, Réduit",
-                     "./Sample_data/IOSnet/Reduit",
-                     "WD_mp01_Avg",
-                     "WS_mp01_Avg",
-                     0.50,
-                     "(wind_df['timestamp'] > '2022-12-05 23:59:00')"
-                   ]]
+station = station_config("IOSnet_Bras_dEau")
 
 
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(IOSnet_stations[stationIdx][2]):
-    print("{:s} is not a directory!".format(IOSnet_stations[stationIdx][2]))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-##  Weather station data
-filelist = sorted( listdir(IOSnet_stations[stationIdx][2]) )
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-print("\nSuccessfully accessed directory")
-print(IOSnet_stations[stationIdx][2])
-print("\nContent of directory:")
-print(filelist)
 
-print()
 
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(IOSnet_stations[stationIdx][2] + "/" + filelist[i]))
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
 
-    tmp_df = pd.read_csv(IOSnet_stations[stationIdx][2] + "/" + filelist[i], header=0)
 
 
-    # Create new data frame with timestamp and wind data only,
-    # and drop NaN values.
-    #
-    # WD_xxxx_Avg: average wind direction (degrees)
-    # WS_xxxx_Avg: wind speed
-    #
-    if (i == 0):
-        wind_df = tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')
+###  BEGIN Open files and load relevant data into arrays  ###
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')],
-                             axis=0)
+##  Weather station data
+#
+# WD_xxxx_Avg: average wind direction (degrees)
+# WS_xxxx_Avg: wind speed
+#
+wind_df, ingest_report = load_directory(station.path, read_IOSnet_csv,
+                                        station.wd_col,
+                                        station.ws_col, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
 
 
-print("Converting time stamps to datetime objects ...")
-wind_df['timestamp'] = pd.to_datetime( wind_df['timestamp'], format="%Y-%m-%dT%H:%M:%SZ" )
-
 print()
 print("------------------------------------------------------------")
 print("type(wind_df):")
@@ -178,9 +121,8 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Set up mask excluding gaps in the data and apply mask
-mask = eval( IOSnet_stations[stationIdx][6] )
-new_df = wind_df.loc[ mask ]
+# Mask excluding gaps in the data (see Stations.json) and apply mask
+new_df = mask_gaps(wind_df, station)
 
 print()
 print("------------------------------------------------------------")
@@ -202,17 +144,17 @@ print("------------------------------------------------------------")
 ###  BEGIN Make histogram and probability distribution  ###
 
 # Convert wind speed series to numpy array
-avg_ws = new_df[[ IOSnet_stations[stationIdx][4] ]].to_numpy().T[0]
+avg_ws = new_df[ station.ws_col ].to_numpy()
+ws_vc = value_counts(avg_ws)
 
-bin_size = IOSnet_stations[stationIdx][5]  # m/s
-ceil_ws = np.ceil(avg_ws.max())
-hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+bin_size = station.bin_size  # m/s
+ceil_ws = np.ceil(ws_vc.values.max())
+hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
 
 # Probability density, mean and standard deviation
 ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
 cumul_P = (ws_P * bin_size).cumsum()
-ws_mean = avg_ws.mean()
-ws_stddev = np.std(avg_ws)
+ws_count, ws_mean, ws_stddev = value_counts_moments(ws_vc)
 ws_midpts = np.zeros( hist_w8ts.shape )
 
 for i in range(len(ws_midpts)):
@@ -247,8 +189,8 @@ print()
 
 ###  BEGIN Plot  ###
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
 fig, ax = plt.subplots(1,1)
 
@@ -262,7 +204,7 @@ ax.set_ylabel("Weight")
 ax.bar(hist_edges[:-1], hist_w8ts, align='edge', width=bin_size, color='whitesmoke', edgecolor='black', linewidth=1.5)
 fig.tight_layout()
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_hist")
 
 ###  END Plot  ###
 
@@ -60,121 +60,64 @@
 #
 
 
-from os import path,listdir
+from os import path
 import numpy as np
-from scipy.special import gamma
 from datetime import date, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_IOSnet_csv
+from Wind_registry import station_config, mask_gaps
+from Wind_stats import value_counts, value_counts_moments, value_counts_histogram
+from Weibull_methods import W_param_est, W_method_names, WeibullSuffStats, fit_Weibull, Weibull_pdf
+from Wind_plots import pyplot, show_figure
 
 
-###  Weather station index to calculate for  ###
+###  Weather station to calculate for (see Stations.json)  ###
 #
-# 0 : Vacoas
-# 1 : MRT, Bras d'Eau
-# 2 : Réserve Tortues, Rodrigues
-# 3 : UoM FoA rooftop, Réduit
+# IOSnet_Vacoas    : Vacoas
+# IOSnet_Bras_dEau : MRT, Bras d'Eau
+# IOSnet_Rodrigues : Réserve Tortues, Rodrigues
+# IOSnet_Reduit    : UoM FoA rooftop, Réduit
 #
 #
-stationIdx = 3
-
-#
-#  NOTE:
-#  First 2 strings describes weather station and location, 3rd string is the
-#  path to the data. 4th and 5th strings are keywords for the CSV data. 6th
-#  item is the bin size (in m/s) to use for the histogram.  Finally, the last
-#  string in each sublist is the mask to apply to each data series due to gaps
-#  in the collection.
-#
-IOSnet_stations = [[
-                    "Mauritius Meteorological Station",
-                    "Vacoas",
-                    "./Sample_data/IOSnet/Vacoas",
-                    "WD_nf01_Avg",
-                    "WS_nf01_Avg",
-                    0.50,
-                    "(wind_df['timestamp'] < '2022-02-17 00:00:00') | ((wind_df['timestamp'] > '2022-03-09 23:59:00') & (wind_df['timestamp'] < '2022-05-29 00:00:00')) | (wind_df['timestamp'] > '2022-12-06 23:59:00')"
-                   ],
-                   [
-                     "MRT",
-                     "Bras d'Eau",
-                     "./Sample_data/IOSnet/Bras_dEau",
-                     "WD_mk01_Avg",
-                     "WS_mk01_Avg",
-                     0.20,
-                     "(wind_df['timestamp'] < '2020-03-19 00:00:00') | ((wind_df['timestamp'] > '2020-05-18 23:59:00') & (wind_df['timestamp'] < '2022-01-14 00:00:00')) | (wind_df['timestamp'] > '2022-05-17 23:59:00')"
-                   ],
-                   [
-                     "Reserves Tortues",
-                     "Rodrigues",
-                     "./Sample_data/IOSnet/Rodrigues",
-                     "WD_mo01_Avg",
-                     "WS_mo01_Avg",
-                     0.50,
-                     "(wind_df['timestamp'] < '2022-09-03 00:00:00') | (wind_df['timestamp'] > '2022-11-30 23:59:00')"
-                   ],
-                   [
-                     "Réduit",
-                     "UoM FoA rooftop, Réduit",
-                     "./Sample_data/IOSnet/Reduit",
-                     "WD_mp01_Avg",
-                     "WS_mp01_Avg",
-                     0.50,
-                     "(wind_df['timestamp'] > '2022-12-05 23:59:00')"
-                   ]]
+station = station_config("IOSnet_Reduit")
 
 
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(IOSnet_stations[stationIdx][2]):
-    print("{:s} is not a directory!".format(IOSnet_stations[stationIdx][2]))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-##  Weather station data
-filelist = sorted( listdir(IOSnet_stations[stationIdx][2]) )
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-print("\nSuccessfully accessed directory")
-print(IOSnet_stations[stationIdx][2])
-print("\nContent of directory:")
-print(filelist)
 
-print()
 
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(IOSnet_stations[stationIdx][2] + "/" + filelist[i]))
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
 
-    tmp_df = pd.read_csv(IOSnet_stations[stationIdx][2] + "/" + filelist[i], header=0)
 
 
-    # Create new data frame with timestamp and wind data only,
-    # and drop NaN values.
-    #
-    # WD_xxxx_Avg: average wind direction (degrees)
-    # WS_xxxx_Avg: wind speed
-    #
-    if (i == 0):
-        wind_df = tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')
+###  BEGIN Open files and load relevant data into arrays  ###
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')],
-                             axis=0)
+##  Weather station data
+#
+# WD_xxxx_Avg: average wind direction (degrees)
+# WS_xxxx_Avg: wind speed
+#
+wind_df, ingest_report = load_directory(station.path, read_IOSnet_csv,
+                                        station.wd_col,
+                                        station.ws_col, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
 
 
-print("Converting time stamps to datetime objects ...")
-wind_df['timestamp'] = pd.to_datetime( wind_df['timestamp'], format="%Y-%m-%dT%H:%M:%SZ" )
-
 print()
 print("------------------------------------------------------------")
 print("type(wind_df):")
@@ -192,9 +135,8 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Set up mask excluding gaps in the data and apply mask
-mask = eval( IOSnet_stations[stationIdx][6] )
-new_df = wind_df.loc[ mask ]
+# Mask excluding gaps in the data (see Stations.json) and apply mask
+new_df = mask_gaps(wind_df, station)
 
 print()
 print("------------------------------------------------------------")
@@ -216,17 +158,17 @@ print("------------------------------------------------------------")
 ###  BEGIN Make histogram and probability distribution  ###
 
 # Convert wind speed series to numpy array
-avg_ws = new_df[[ IOSnet_stations[stationIdx][4] ]].to_numpy().T[0]
+avg_ws = new_df[ station.ws_col ].to_numpy()
+ws_vc = value_counts(avg_ws)
 
-bin_size = IOSnet_stations[stationIdx][5]  # m/s
-ceil_ws = np.ceil(avg_ws.max())
-hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+bin_size = station.bin_size  # m/s
+ceil_ws = np.ceil(ws_vc.values.max())
+hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
 
 # Probability density, mean and standard deviation
 ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
 cumul_P = (ws_P * bin_size).cumsum()
-ws_mean = avg_ws.mean()
-ws_stddev = np.std(avg_ws)
+ws_count, ws_mean, ws_stddev = value_counts_moments(ws_vc)
 ws_midpts = np.zeros( hist_w8ts.shape )
 
 
@@ -266,208 +208,24 @@ print()
 # k and c
 u = np.linspace(0.0, ceil_ws, 100)  # numpy array
 
-
-#---------------------------------------------------------------------#
-#  Empirical method/standard deviation method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Empirical method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-EMJ = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Lysen empirical method (Lysen, 1983)
-k = (ws_stddev / ws_mean)**-1.086
-c = ws_mean * ( 0.568 + 0.434/k )**(-1.0/k)
-
-print("Lysen empirical method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-EML = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Graphical Method (Rohatgi & Nelson, 1994)
-
-y = np.log( -1.0 * np.log(1.0 - cumul_P) )
-
-# Eliminate NaN or Inf in y array which might arise due to log(0)
-y = y[ np.logical_not( np.isnan(y) ) ]
-y = y[ np.logical_not( np.isinf(y) ) ]
-
-# midpoints
-x = np.log( ws_midpts[0 : len(y)] )
-
-
-den = (x * x).sum() - (len(x) * x.mean() * x.mean())
-
-num = (x * y).sum() - (len(x) * x.mean() * y.mean())
-k = num / den
-num = (y.mean() * (x * x).sum()) - (x.mean() * (x * y).sum())
-c = np.e**(-1.0 * (num / den) / k)
-
-print("Graphical method (using histogram's midpoints): k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-GM1 = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-
-
-# upper edges
-x = np.log( hist_edges[1 : 1+len(y)] )
-
-den = (x * x).sum() - (len(x) * x.mean() * x.mean())
-
-num = (x * y).sum() - (len(x) * x.mean() * y.mean())
-k = num / den
-num = (y.mean() * (x * x).sum()) - (x.mean() * (x * y).sum())
-c = np.e**(-1.0 * (num / den) / k)
-
-print("Graphical method (using histogram's upper edges): k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-GM2 = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Maximum likelihood method (Stevens & Smulders, 1979)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-# Take ln(avg_ws) and replace NaN values with 0.0
-log_ws = np.log(avg_ws)
-np.nan_to_num(log_ws, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-
-# Find number of non-zero wind speed data points
-n = np.count_nonzero( [ avg_ws > 0.1 ] )
-
-i=0
-while True:
-    ws_pow_k = avg_ws**k
-
-    prev_k = k
-    k = 1.0 / ( (ws_pow_k * log_ws).sum()/ws_pow_k.sum() - log_ws.sum()/n )
-    i = i + 1
-
-    #print("#{:3d}\tk = {:4.2f}".format(i, k))
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-# Calculate c from best estimates for k
-c = ( (avg_ws**k).sum() / n )**(1/k)
-
-print("Maximum likelihood method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-ML = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Modified maximum likelihood method (Seguro & Lambert, 2000)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-# Take ln(avg_ws) and replace NaN values with 0.0
-log_ws = np.log(ws_midpts)
-np.nan_to_num(log_ws, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-
-# Total number of bins
-n = hist_w8ts.sum()
-
-i=0
-#print("\nIterating for the maximum likelihood method ...")
-#print("#{:3d}\tk = {:4.2f}".format(i, k))
-while True:
-    ws_pow_k = ws_midpts**k
-
-    prev_k = k
-    k = 1.0 / ( (ws_pow_k * log_ws * hist_w8ts).sum()/(ws_pow_k * hist_w8ts).sum() - (log_ws * hist_w8ts).sum()/n )
-    i = i + 1
-
-    #print("#{:3d}\tk = {:4.2f}".format(i, k))
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-# Calculate c from best estimates for k
-c = ( (ws_pow_k * hist_w8ts).sum()/n )**(1/k)
-
-print("Modified maximum likelihood method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-MML = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Method of moments (Bowden et al. 1983)
-k = ( (0.9874*ws_mean) / ws_stddev )**1.0983
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Method of moments: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-MM = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Power density method (Akdag & Dinler, 2009)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-i=0
-while True:
-    Epf = gamma(1.0 + 3.0/k) / ( gamma(1.0 + 1.0/k)**3 )
-
-    prev_k = k
-    k = 1.0 + 3.69/(Epf*Epf)
-    i = i + 1
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Power density method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-PDM = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Energy pattern factor method (Akdag & Guler, 2015)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-i=0
-while True:
-    Epf = gamma(1.0 + 3.0/k) / ( gamma(1.0 + 1.0/k)**3 )
-
-    prev_k = k
-    k = (0.59039*Epf**4 + 2.15143*Epf**3 - 5.78961*Epf*Epf + 3.27527*Epf - 0.220374) / (0.992007*Epf**4 - 0.800468*Epf**3 - 2.60973*Epf*Epf + 3.69115*Epf - 1.27285)
-    i = i + 1
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Energy pattern factor method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-EPF = (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
-#---------------------------------------------------------------------#
+# Sufficient statistics: moments, histogram and the wind speeds for the
+# maximum likelihood method
+W_stats = WeibullSuffStats(ws_mean, ws_stddev, hist_w8ts, hist_edges, ws_vc.values, ws_vc.counts)
+W_params = fit_Weibull(W_stats)
+
+for method in W_param_est:
+    print("{:s}: k = {:.2f}\tc = {:.2f}".format(W_method_names[method], *W_params[method]))
+
+# Calculate curves
+EMJ = Weibull_pdf(u, *W_params["EMJ"])
+EML = Weibull_pdf(u, *W_params["EML"])
+GM1 = Weibull_pdf(u, *W_params["GM1"])
+GM2 = Weibull_pdf(u, *W_params["GM2"])
+ML  = Weibull_pdf(u, *W_params["ML"])
+MML = Weibull_pdf(u, *W_params["MML"])
+MM  = Weibull_pdf(u, *W_params["MM"])
+PDM = Weibull_pdf(u, *W_params["PDM"])
+EPF = Weibull_pdf(u, *W_params["EPF"])
 
 ###  END parameter estimation  ###
 
@@ -477,8 +235,8 @@ print()
 
 ###  BEGIN Plot  ###
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
 # maximum y ordinate
 ceil_y = 1.1 * np.max([ws_P.max(), EMJ.max(), EML.max(), GM1.max(), GM2.max(), ML.max(), MML.max(), MM.max(), PDM.max(), EPF.max()])
@@ -504,7 +262,7 @@ ax.plot(u, EPF,  linewidth=2.0, marker='|', color='purple', label="EPF")
 ax.legend(loc="upper right", bbox_to_anchor=(0.85,0.87), frameon=True).get_frame().set_alpha(1.0)
 fig.tight_layout()
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_hist_Weibull")
 
 ###  END Plot  ###
 
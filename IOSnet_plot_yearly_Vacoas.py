@@ -46,92 +46,64 @@
 #
 
 
-from os import path,listdir
+from os import path
 import numpy as np
 from scipy.special import gamma
-from datetime import date, timedelta
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_IOSnet_csv
+from Wind_registry import station_config, mask_gaps
+from Wind_resample import resample_wind
+from Wind_plots import pyplot, show_figure, figure_yearly
 
 
-###  Weather station index to calculate for  ###
+###  Weather station to calculate for (see Stations.json)  ###
 #
-# 0 : Vacoas
-# 1 : MRT, Bras d'Eau
-# 2 : Réserve Tortues, Rodrigues
+# IOSnet_Vacoas    : Vacoas
+# IOSnet_Bras_dEau : MRT, Bras d'Eau
+# IOSnet_Rodrigues : Réserve Tortues, Rodrigues
+# IOSnet_Reduit    : UoM FoA rooftop, Réduit
 #
 #
-stationIdx = 0
-
-
-IOSnet_stations = [["Vacoas",
-                    "Mauritius Meteorological Station, Vacoas",
-                    "./Sample_data/IOSnet/Vacoas",
-                    "WD_nf01_Avg",
-                    "WS_nf01_Avg"],
-                   ["MRT",
-                    "Bras d'Eau",
-                    "./Sample_data/IOSnet/Bras_dEau",
-                    "WD_mk01_Avg",
-                    "WS_mk01_Avg"],
-                   ["Reserves Tortues",
-                    "Reserves Tortues, Rodrigues",
-                    "./Sample_data/IOSnet/Rodrigues",
-                    "WD_mo01_Avg",
-                    "WS_mo01_Avg"]]
+station = station_config("IOSnet_Vacoas")
 
 
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(IOSnet_stations[stationIdx][2]):
-    print("{:s} is not a directory!".format(IOSnet_stations[stationIdx][2]))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-##  Weather station data
-filelist = sorted( listdir(IOSnet_stations[stationIdx][2]) )
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-print("\nSuccessfully accessed directory")
-print(IOSnet_stations[stationIdx][2])
-print("\nContent of directory:")
-print(filelist)
 
-print()
 
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(IOSnet_stations[stationIdx][2] + "/" + filelist[i]))
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
 
-    tmp_df = pd.read_csv(IOSnet_stations[stationIdx][2] + "/" + filelist[i], header=0)
 
 
-    # Create new data frame with timestamp and wind data only,
-    # and drop NaN values.
-    #
-    # WD_nf01_Avg: average wind direction (degrees)
-    # WS_nf01_Avg: wind speed
-    #
-    if (i == 0):
-        wind_df = tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')
+###  BEGIN Open files and load relevant data into arrays  ###
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['timestamp', IOSnet_stations[stationIdx][3], IOSnet_stations[stationIdx][4]]].dropna(axis=0, how='any')],
-                             axis=0)
+##  Weather station data
+#
+# WD_xxxx_Avg: average wind direction (degrees)
+# WS_xxxx_Avg: wind speed
+#
+wind_df, ingest_report = load_directory(station.path, read_IOSnet_csv,
+                                        station.wd_col,
+                                        station.ws_col, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
 
 
-print("Converting time stamps to datetime objects ...")
-wind_df['timestamp'] = pd.to_datetime( wind_df['timestamp'], format="%Y-%m-%dT%H:%M:%SZ" )
-
 print()
 print("------------------------------------------------------------")
 print("type(wind_df):")
@@ -149,13 +121,13 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Mask excluding gaps in the data
-mask = (wind_df['timestamp'] < '2022-02-17') | ((wind_df['timestamp'] > '2022-03-09') & (wind_df['timestamp'] < '2022-05-29')) | (wind_df['timestamp'] > '2022-12-06')
-
-# Apply mask and resample
-trim_df = wind_df.loc[mask]
-new_df = trim_df.resample(timedelta(days=2), axis=0, on='timestamp').mean()
-new_df.reset_index(inplace=True)
+# Mask excluding gaps in the data (see Stations.json) and average over
+# intervals of station.yearly_resample (vector mean of the wind direction)
+trim_df = mask_gaps(wind_df, station)
+avg = resample_wind(trim_df['timestamp'], trim_df[ station.ws_col ], trim_df[ station.wd_col ], station.yearly_resample)
+new_df = pd.DataFrame({ 'timestamp': avg.time,
+                        station.wd_col: avg.wd,
+                        station.ws_col: avg.ws })
 
 
 print()
@@ -181,84 +153,18 @@ print("\n\n")
 print("------------------------------------------------------------")
 print("Plotting wind speed data for period:")
 print("{:s}  ->  {:s}".format(new_df['timestamp'].min().strftime("%d.%m.%Y"), new_df['timestamp'].max().strftime("%d.%m.%Y")))
-print("for IOSnet weather station at {:s}".format(IOSnet_stations[stationIdx][1]))
+print("for IOSnet weather station at {:s}".format(station.location))
 print("------------------------------------------------------------")
 print("\n\n")
 
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
-
-# ------------------------------------------------------------------
-fig, ax = plt.subplots(4,1)
-
-fig.autofmt_xdate()
-x_axis_format = mdates.DateFormatter('%b')
-
-##  2019  ##
-ax[0].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[0].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[0].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[0].set_ylabel("u (m/s)")
-ax[0].grid(True, which='minor', axis='x')
-ax[0].grid(True, which='major', axis='y')
-
-mask = (new_df['timestamp'] >= '2019-01-01') & (new_df['timestamp'] <= '2019-12-31')
-ax[0].set_xlim(date(year=2019, month=1, day=1), date(year=2019, month=12, day=31))
-ax[0].set_ylim(0.0, 1.1*new_df[ IOSnet_stations[stationIdx][4] ].loc[mask].max())
-ax[0].plot(new_df['timestamp'].loc[mask], new_df[ IOSnet_stations[stationIdx][4] ].loc[mask], linewidth=2.0, marker='o', color='blue')
-
-##  2020  ##
-ax[1].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[1].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[1].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[1].set_ylabel("u (m/s)")
-ax[1].grid(True, which='minor', axis='x')
-ax[1].grid(True, which='major', axis='y')
-
-mask = (new_df['timestamp'] >= '2020-01-01') & (new_df['timestamp'] <= '2020-12-31')
-ax[1].set_xlim(date(year=2020, month=1, day=1), date(year=2020, month=12, day=31))
-ax[1].set_ylim(0.0, 1.1*new_df[ IOSnet_stations[stationIdx][4] ].loc[mask].max())
-ax[1].plot(new_df['timestamp'].loc[mask], new_df[ IOSnet_stations[stationIdx][4] ].loc[mask], linewidth=2.0, marker='o', color='gold')
-
-##  2021  ##
-ax[2].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[2].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[2].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[2].set_ylabel("u (m/s)")
-ax[2].grid(True, which='minor', axis='x')
-ax[2].grid(True, which='major', axis='y')
-
-mask = (new_df['timestamp'] >= '2021-01-01') & (new_df['timestamp'] <= '2021-12-31')
-ax[2].set_xlim(date(year=2021, month=1, day=1), date(year=2021, month=12, day=31))
-ax[2].set_ylim(0.0, 1.1*new_df[ IOSnet_stations[stationIdx][4] ].loc[mask].max())
-ax[2].plot(new_df['timestamp'].loc[mask], new_df[ IOSnet_stations[stationIdx][4] ].loc[mask], linewidth=2.0, marker='o', color='green')
-
-##  2022  ##
-ax[3].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[3].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[3].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[3].set_ylabel("u (m/s)")
-ax[3].grid(True, which='minor', axis='x')
-ax[3].grid(True, which='major', axis='y')
-
-mask = (new_df['timestamp'] >= '2022-01-01') & (new_df['timestamp'] <= '2022-12-31')
-ax[3].set_xlim(date(year=2022, month=1, day=1), date(year=2022, month=12, day=31))
-ax[3].set_ylim(0.0, 1.1*new_df[ IOSnet_stations[stationIdx][4] ].loc[mask].max())
-ax[3].plot(new_df['timestamp'].loc[mask], new_df[ IOSnet_stations[stationIdx][4] ].loc[mask], linewidth=2.0, marker='o', color='darkorchid')
-
-
-fig.tight_layout()
-
-
-#print("Saving plot with filename {:s} ... \n\n".format("IOSnet_raw_Vacoas.eps"))
-#plt.savefig("IOSnet_raw_Vacoas.eps", format='eps')
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
-#print("Saving plot with filename {:s} ... \n\n".format("IOSnet_raw_Vacoas.png"))
-#plt.savefig("IOSnet_raw_Vacoas.png", format='png')
-# ------------------------------------------------------------------
+# One subplot per year of the data
+fig = figure_yearly(plt, new_df['timestamp'], new_df[ station.ws_col ])
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_yearly")
 
 ###  END Plot  ###
 
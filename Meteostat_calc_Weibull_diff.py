@@ -51,40 +51,42 @@
 #
 
 
-from sys import argv
-from os import path,listdir
+from os import path
 import numpy as np
-from scipy.special import gamma
-from datetime import date, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_registry import station_config, mask_gaps
+from Wind_stats import value_counts, value_counts_moments, value_counts_histogram
+from Weibull_methods import W_method_names, WeibullSuffStats, fit_Weibull, Weibull_curves
+from Weibull_gof import gof_scores
+from Weibull_bootstrap import bootstrap_Weibull, bootstrap_intervals
 
 
 ###  Weibull parameter estimation methods  ###
 W_param_est = ["EMJ", "EML", "GM1", "GM2", "ML", "MML", "MM", "PDM", "EPF"]
-Weibull_P = []
 
+###  Weibull curves compared with the histogram: density at the bin  ###
+###  midpoints ("midpoint") or bin probabilities from the CDF ("cdf")  ###
+W_comparison = "midpoint"
 
-###  Path for UoM Farm data files  ###
-DataPath = "./Sample_data/Meteostat/Plaisance_20180101_-_20221231.csv"
+###  Number of bootstrap resamples for the confidence intervals of k  ###
+###  and c, e.g. 1000 (0 to skip the bootstrap, which takes a while)  ###
+nboot = 0
 
-# Check if given path for weather station data is indeed a directory
-if not path.isfile(DataPath):
-    print("Cannot access {:s}!".format(DataPath))
+
+###  Weather station (see Stations.json)  ###
+station = station_config("Meteostat_Plaisance")
+
+# Check if given path for weather station data is accessible
+if not path.isfile(station.path):
+    print("Cannot access {:s}!".format(station.path))
     exit(1)
 
 
 ###  BEGIN Open files and load relevant data into arrays  ###
 
-print("Opening CSV file {:s} ...".format(DataPath))
-
-tmp_df = pd.read_csv(DataPath, parse_dates=['date'])
+print("Opening CSV file {:s} ...".format(station.path))
 
-# Filter only date and wind data, and eliminate nulls
-wind_df = tmp_df[['date', 'wdir', 'wspd']].dropna(axis=0, how='any')
+# Only the date and wind data, without nulls
+wind_df = station.reader(station.path, *station.reader_args)
 
 ###  END Open files and load relevant data into arrays  ###
 
@@ -107,9 +109,8 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Set up mask excluding gaps in the data and apply mask
-mask = (wind_df['date'] > '2018-02-01 23:59:00')
-new_df = wind_df.loc[ mask ]
+# Mask excluding gaps in the data (see Stations.json) and apply mask
+new_df = mask_gaps(wind_df, station)
 
 print()
 print("------------------------------------------------------------")
@@ -131,17 +132,17 @@ print("------------------------------------------------------------")
 ###  BEGIN Make histogram and probability distribution  ###
 
 # Convert wind speed series to numpy array
-avg_ws = new_df[['wspd']].to_numpy().T[0]
+avg_ws = new_df[ station.ws_col ].to_numpy()
+ws_vc = value_counts(avg_ws)
 
-bin_size = 1.5  # m/s
-ceil_ws = np.ceil(avg_ws.max())
-hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+bin_size = station.bin_size  # m/s
+hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
 
-# Probability density, mean and standard deviation
-ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
-cumul_P = (ws_P * bin_size).cumsum()
-ws_mean = avg_ws.mean()
-ws_stddev = np.std(avg_ws)
+# Probability density over the real widths of the bins, mean and standard
+# deviation
+ws_P = (hist_w8ts / hist_w8ts.sum()) / np.diff(hist_edges)
+cumul_P = (ws_P * np.diff(hist_edges)).cumsum()
+ws_count, ws_mean, ws_stddev = value_counts_moments(ws_vc)
 ws_midpts = np.zeros( hist_w8ts.shape )
 
 for i in range(len(ws_midpts)):
@@ -176,248 +177,43 @@ print()
 
 ###  BEGIN parameter estimation  ###
 
-#---------------------------------------------------------------------#
-#  Empirical method/standard deviation method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Empirical method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Lysen empirical method (Lysen, 1983)
-k = (ws_stddev / ws_mean)**-1.086
-c = ws_mean * ( 0.568 + 0.434/k )**(-1.0/k)
-
-print("Lysen empirical method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Graphical Method (Rohatgi & Nelson, 1994)
-
-y = np.log( -1.0 * np.log(1.0 - cumul_P) )
-
-# Eliminate NaN or Inf in y array which might arise due to log(0)
-y = y[ np.logical_not( np.isnan(y) ) ]
-y = y[ np.logical_not( np.isinf(y) ) ]
-
-# midpoints
-x = np.log( ws_midpts[0 : len(y)] )
-
-
-den = (x * x).sum() - (len(x) * x.mean() * x.mean())
-
-num = (x * y).sum() - (len(x) * x.mean() * y.mean())
-k = num / den
-num = (y.mean() * (x * x).sum()) - (x.mean() * (x * y).sum())
-c = np.e**(-1.0 * (num / den) / k)
-
-print("Graphical method (using histogram's midpoints): k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-
-
-# upper edges
-x = np.log( hist_edges[1 : 1+len(y)] )
-
-den = (x * x).sum() - (len(x) * x.mean() * x.mean())
-
-num = (x * y).sum() - (len(x) * x.mean() * y.mean())
-k = num / den
-num = (y.mean() * (x * x).sum()) - (x.mean() * (x * y).sum())
-c = np.e**(-1.0 * (num / den) / k)
-
-print("Graphical method (using histogram's upper edges): k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Maximum likelihood method (Stevens & Smulders, 1979)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-# Take ln(avg_ws) and replace NaN values with 0.0
-log_ws = np.log(avg_ws)
-np.nan_to_num(log_ws, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-
-# Find number of non-zero wind speed data points
-n = np.count_nonzero( [ avg_ws > 0.1 ] )
-
-i=0
-while True:
-    ws_pow_k = avg_ws**k
-
-    prev_k = k
-    k = 1.0 / ( (ws_pow_k * log_ws).sum()/ws_pow_k.sum() - log_ws.sum()/n )
-    i = i + 1
-
-    #print("#{:3d}\tk = {:4.2f}".format(i, k))
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-# Calculate c from best estimates for k
-c = ( (avg_ws**k).sum() / n )**(1/k)
-
-print("Maximum likelihood method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Modified maximum likelihood method (Seguro & Lambert, 2000)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
+# Sufficient statistics: moments, histogram and the wind speeds for the
+# maximum likelihood method
+W_stats = WeibullSuffStats(ws_mean, ws_stddev, hist_w8ts, hist_edges, ws_vc.values, ws_vc.counts)
+W_params = fit_Weibull(W_stats, W_param_est)
 
-# Take ln(avg_ws) and replace NaN values with 0.0
-log_ws = np.log(ws_midpts)
-np.nan_to_num(log_ws, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-
-# Total number of bins
-n = hist_w8ts.sum()
-
-i=0
-#print("\nIterating for the maximum likelihood method ...")
-#print("#{:3d}\tk = {:4.2f}".format(i, k))
-while True:
-    ws_pow_k = ws_midpts**k
-
-    prev_k = k
-    k = 1.0 / ( (ws_pow_k * log_ws * hist_w8ts).sum()/(ws_pow_k * hist_w8ts).sum() - (log_ws * hist_w8ts).sum()/n )
-    i = i + 1
-
-    #print("#{:3d}\tk = {:4.2f}".format(i, k))
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-# Calculate c from best estimates for k
-c = ( (ws_pow_k * hist_w8ts).sum()/n )**(1/k)
-
-print("Modified maximum likelihood method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-# Calculate curve
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Method of moments (Bowden et al. 1983)
-k = ( (0.9874*ws_mean) / ws_stddev )**1.0983
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Method of moments: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Power density method (Akdag & Dinler, 2009)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-i=0
-while True:
-    Epf = gamma(1.0 + 3.0/k) / ( gamma(1.0 + 1.0/k)**3 )
-
-    prev_k = k
-    k = 1.0 + 3.69/(Epf*Epf)
-    i = i + 1
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Power density method: k = {:.2f}\tc = {:.2f}".format(k,c))
-
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
-
-
-#---------------------------------------------------------------------#
-#  Energy pattern factor method (Akdag & Guler, 2015)
-
-# Seed k using estimate from empirical method (Justus et al., 1978)
-k = (ws_stddev / ws_mean)**-1.086
-
-i=0
-while True:
-    Epf = gamma(1.0 + 3.0/k) / ( gamma(1.0 + 1.0/k)**3 )
-
-    prev_k = k
-    k = (0.59039*Epf**4 + 2.15143*Epf**3 - 5.78961*Epf*Epf + 3.27527*Epf - 0.220374) / (0.992007*Epf**4 - 0.800468*Epf**3 - 2.60973*Epf*Epf + 3.69115*Epf - 1.27285)
-    i = i + 1
-
-    if (abs(k - prev_k) < 0.005):
-        break
-
-c = ws_mean / gamma(1.0 + 1.0/k)
-
-print("Energy pattern factor method: k = {:.2f}\tc = {:.2f}".format(k,c))
+for i in range( len(W_param_est) ):
+    k, c = W_params[ W_param_est[i] ]
+    print("{:s}: k = {:.2f}\tc = {:.2f}".format(W_method_names[ W_param_est[i] ], k, c))
 
-Weibull_P.append( (k/c) * (ws_midpts/c)**(k-1) * np.exp(-1.0 * (ws_midpts/c)**k) )
-#---------------------------------------------------------------------#
+# Calculate curves, one row per method
+W_k = np.array([ W_params[method][0] for method in W_param_est ])
+W_c = np.array([ W_params[method][1] for method in W_param_est ])
+Weibull_P = Weibull_curves(hist_edges, W_k, W_c, W_comparison)
 
 ###  END parameter estimation  ###
 
 
+###  BEGIN Bootstrap confidence intervals  ###
 
-###  BEGIN Statistical comparison  ###
-
-#---------------------------------------------------------------------#
-#  Root Mean Square Error (RMSE)
+if (nboot > 0):
+    W_boot = bootstrap_Weibull(ws_vc.values, ws_vc.counts, bin_size, nboot=nboot, methods=W_param_est)
 
-RMSE = []
-for i in range( len(W_param_est) ):
-    diff = (Weibull_P[i] - ws_P) * (Weibull_P[i] - ws_P)
-    RMSE.append( np.sqrt( diff.sum() / len(diff) ) )
+    print("\n95% bootstrap confidence intervals ({:d} resamples):".format(nboot))
+    print(bootstrap_intervals(W_boot).to_string(float_format="{:.2f}".format))
 
-print()
-#---------------------------------------------------------------------#
+###  END Bootstrap confidence intervals  ###
 
-#---------------------------------------------------------------------#
-#  Coefficient of Determination (R^2)
-
-Rsqrd = []
-diff_den = (ws_P - ws_P.mean()) * (ws_P - ws_P.mean())
-for i in range( len(W_param_est) ):
-    diff_num = (Weibull_P[i] - ws_P) * (Weibull_P[i] - ws_P)
-    Rsqrd.append( 1 - ( diff_num.sum() / diff_den.sum() ) )
 
-print()
-#---------------------------------------------------------------------#
 
-#---------------------------------------------------------------------#
-#  Mean Absolute Percentage Error (MAPE)
+###  BEGIN Statistical comparison  ###
 
-MAPE = []
-for i in range( len(W_param_est) ):
-    diff = np.abs(Weibull_P[i] - ws_P) / ws_P
-    np.nan_to_num(diff, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
-    MAPE.append( ( diff.sum() / len(diff) ) * 100.0 )
+#  Root Mean Square Error (RMSE), Coefficient of Determination (R^2), Mean
+#  Absolute Percentage Error (MAPE), chi-square and Kolmogorov-Smirnov
+#  distance, for all the curves at once
+W_gof = gof_scores(Weibull_P, ws_P, hist_edges, hist_w8ts.sum())
 
 print()
-#---------------------------------------------------------------------#
 
 ###  END Statistical comparison  ###
 
@@ -427,18 +223,18 @@ print("------------------------------------------------------------")
 print()
 print("Computed the Weibull curve for the wind speed data from the")
 print("Meteostat weather station at Plaisance, Mauritius")
-print("Data ranges from {:s}  to  {:s}".format(wind_df['date'].min().strftime("%d.%m.%Y"), wind_df['date'].max().strftime("%d.%m.%Y")))
+print("Data ranges from {:s}  to  {:s}".format(wind_df[ station.ts_col ].min().strftime("%d.%m.%Y"), wind_df[ station.ts_col ].max().strftime("%d.%m.%Y")))
 print()
 print("------------------------------------------------------------")
 print()
 print("Statistical difference between actual wind speed data distribution and the")
 print("Weibull curve:")
 print()
-print("Method \t RMSE     R squared       MAPE")
-print("------------------------------------------------------------")
+print("Method \t RMSE     R squared       MAPE     Chi-square (dof)       KS")
+print("--------------------------------------------------------------------------------")
 for i in range( len(W_param_est) ):
-    print("{:s} \t {:7.5f}    {:7.5f}   {:7.5f}".format(W_param_est[i], RMSE[i], Rsqrd[i], MAPE[i]))
-print("------------------------------------------------------------")
+    print("{:s} \t {:7.5f}    {:7.5f}   {:7.5f}   {:12.3f} ({:3d})   {:7.5f}".format(W_param_est[i], W_gof.RMSE[i], W_gof.Rsqrd[i], W_gof.MAPE[i], W_gof.chi2[i], W_gof.chi2_dof[i], W_gof.KS[i]))
+print("--------------------------------------------------------------------------------")
 
 
 print()
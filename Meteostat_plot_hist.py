@@ -42,30 +42,32 @@ from os import path,listdir
 import numpy as np
 from scipy.special import gamma
 from datetime import date, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_registry import station_config, mask_gaps
+from Wind_stats import value_counts, value_counts_moments, value_counts_histogram
+from Wind_plots import pyplot, show_figure
 
 
-###  Path for UoM Farm data files  ###
-DataPath = "./Sample_data/Meteostat/Plaisance_20180101_-_20221231.csv"
+###  Weather station (see Stations.json)  ###
+station = station_config("Meteostat_Plaisance")
 
-# Check if given path for weather station data is indeed a directory
-if not path.isfile(DataPath):
-    print("Cannot access {:s}!".format(DataPath))
+# Check if given path for weather station data is accessible
+if not path.isfile(station.path):
+    print("Cannot access {:s}!".format(station.path))
     exit(1)
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
+
 
-print("Opening CSV file {:s} ...".format(DataPath))
 
-tmp_df = pd.read_csv(DataPath, parse_dates=['date'])
+###  BEGIN Open files and load relevant data into arrays  ###
+
+print("Opening CSV file {:s} ...".format(station.path))
 
-# Filter only date and wind data, and eliminate nulls
-wind_df = tmp_df[['date', 'wdir', 'wspd']].dropna(axis=0, how='any')
+# Only the date and wind data, without nulls
+wind_df = station.reader(station.path, *station.reader_args)
 
 ###  END Open files and load relevant data into arrays  ###
 
@@ -88,9 +90,8 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Set up mask excluding gaps in the data and apply mask
-mask = (wind_df['date'] > '2018-02-01 23:59:00')
-new_df = wind_df.loc[ mask ]
+# Mask excluding gaps in the data (see Stations.json) and apply mask
+new_df = mask_gaps(wind_df, station)
 
 print()
 print("------------------------------------------------------------")
@@ -112,17 +113,17 @@ print("------------------------------------------------------------")
 ###  BEGIN Make histogram and probability distribution  ###
 
 # Convert wind speed series to numpy array
-avg_ws = new_df[['wspd']].to_numpy().T[0]
+avg_ws = new_df[ station.ws_col ].to_numpy()
+ws_vc = value_counts(avg_ws)
 
 bin_size = 1.0  # m/s
-ceil_ws = np.ceil(avg_ws.max())
-hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+ceil_ws = np.ceil(ws_vc.values.max())
+hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
 
 # Probability density, mean and standard deviation
 ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
 cumul_P = (ws_P * bin_size).cumsum()
-ws_mean = avg_ws.mean()
-ws_stddev = np.std(avg_ws)
+ws_count, ws_mean, ws_stddev = value_counts_moments(ws_vc)
 ws_midpts = np.zeros( hist_w8ts.shape )
 
 for i in range(len(ws_midpts)):
@@ -157,8 +158,8 @@ print()
 
 ###  BEGIN Plot  ###
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
 fig, ax = plt.subplots(1,1)
 
@@ -172,7 +173,7 @@ ax.set_ylabel("Weight")
 ax.bar(hist_edges[:-1], hist_w8ts, align='edge', width=bin_size, color='whitesmoke', edgecolor='black', linewidth=1.5)
 fig.tight_layout()
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_hist")
 
 ###  END Plot  ###
 
@@ -41,31 +41,33 @@ from sys import argv
 from os import path,listdir
 import numpy as np
 from scipy.special import gamma
-from datetime import date, timedelta
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_registry import station_config, mask_gaps
+from Wind_resample import resample_wind
+from Wind_plots import pyplot, show_figure, figure_yearly
 
 
-###  Path for UoM Farm data files  ###
-DataPath = "./Sample_data/Meteostat/Plaisance_20180101_-_20221231.csv"
+###  Weather station (see Stations.json)  ###
+station = station_config("Meteostat_Plaisance")
 
-# Check if given path for weather station data is indeed a directory
-if not path.isfile(DataPath):
-    print("Cannot access {:s}!".format(DataPath))
+# Check if given path for weather station data is accessible
+if not path.isfile(station.path):
+    print("Cannot access {:s}!".format(station.path))
     exit(1)
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
+
+
 
-print("Opening CSV file {:s} ...".format(DataPath))
+###  BEGIN Open files and load relevant data into arrays  ###
 
-tmp_df = pd.read_csv(DataPath, parse_dates=['date'])
+print("Opening CSV file {:s} ...".format(station.path))
 
-# Filter only date and wind data, and eliminate nulls
-wind_df = tmp_df[['date', 'wdir', 'wspd']].dropna(axis=0, how='any')
+# Only the date and wind data, without nulls
+wind_df = station.reader(station.path, *station.reader_args)
 
 ###  END Open files and load relevant data into arrays  ###
 
@@ -88,9 +90,13 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Resample
-new_df = wind_df.resample(timedelta(days=2), axis=0, on='date').mean()
-new_df.reset_index(inplace=True)
+# Mask excluding gaps in the data (see Stations.json) and average over
+# intervals of station.yearly_resample (vector mean of the wind direction)
+trim_df = mask_gaps(wind_df, station)
+avg = resample_wind(trim_df[ station.ts_col ], trim_df[ station.ws_col ], trim_df[ station.wd_col ], station.yearly_resample)
+new_df = pd.DataFrame({ station.ts_col: avg.time,
+                        station.wd_col: avg.wd,
+                        station.ws_col: avg.ws })
 
 
 print()
@@ -115,92 +121,19 @@ print("------------------------------------------------------------")
 print("\n\n")
 print("------------------------------------------------------------")
 print("Plotting wind speed data for period:")
-print("{:s}  ->  {:s}".format(new_df['date'].min().strftime("%d.%m.%Y"), new_df['date'].max().strftime("%d.%m.%Y")))
-print("for Meteostat weather station at Plaisance, Mauritius")
+print("{:s}  ->  {:s}".format(new_df[ station.ts_col ].min().strftime("%d.%m.%Y"), new_df[ station.ts_col ].max().strftime("%d.%m.%Y")))
+print("for Meteostat weather station at {:s}, Mauritius".format(station.location))
 print("------------------------------------------------------------")
 print("\n\n")
 
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
-
-# ------------------------------------------------------------------
-fig, ax = plt.subplots(5,1)
-
-fig.autofmt_xdate()
-x_axis_format = mdates.DateFormatter('%b')
-
-##  2018  ##
-ax[0].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[0].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[0].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[0].set_ylabel("u (m/s)")
-ax[0].grid(True, which='minor', axis='x')
-ax[0].grid(True, which='major', axis='y')
-
-mask = (new_df['date'] >= '2018-01-01') & (new_df['date'] <= '2018-12-31')
-ax[0].set_xlim(date(year=2018, month=1, day=1), date(year=2018, month=12, day=31))
-ax[0].set_ylim(0.0, 1.1*new_df['wspd'].loc[mask].max())
-ax[0].plot(new_df['date'].loc[mask], new_df['wspd'].loc[mask], linewidth=2.0, marker='o', color='red')
-
-##  2019  ##
-ax[1].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[1].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[1].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[1].set_ylabel("u (m/s)")
-ax[1].grid(True, which='minor', axis='x')
-ax[1].grid(True, which='major', axis='y')
-
-mask = (new_df['date'] >= '2019-01-01') & (new_df['date'] <= '2019-12-31')
-ax[1].set_xlim(date(year=2019, month=1, day=1), date(year=2019, month=12, day=31))
-ax[1].set_ylim(0.0, 1.1*new_df['wspd'].loc[mask].max())
-ax[1].plot(new_df['date'].loc[mask], new_df['wspd'].loc[mask], linewidth=2.0, marker='o', color='blue')
-
-##  2020  ##
-ax[2].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[2].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[2].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[2].set_ylabel("u (m/s)")
-ax[2].grid(True, which='minor', axis='x')
-ax[2].grid(True, which='major', axis='y')
-
-mask = (new_df['date'] >= '2020-01-01') & (new_df['date'] <= '2020-12-31')
-ax[2].set_xlim(date(year=2020, month=1, day=1), date(year=2020, month=12, day=31))
-ax[2].set_ylim(0.0, 1.1*new_df['wspd'].loc[mask].max())
-ax[2].plot(new_df['date'].loc[mask], new_df['wspd'].loc[mask], linewidth=2.0, marker='o', color='gold')
-
-##  2021  ##
-ax[3].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[3].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[3].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[3].set_ylabel("u (m/s)")
-ax[3].grid(True, which='minor', axis='x')
-ax[3].grid(True, which='major', axis='y')
-
-mask = (new_df['date'] >= '2021-01-01') & (new_df['date'] <= '2021-12-31')
-ax[3].set_xlim(date(year=2021, month=1, day=1), date(year=2021, month=12, day=31))
-ax[3].set_ylim(0.0, 1.1*new_df['wspd'].loc[mask].max())
-ax[3].plot(new_df['date'].loc[mask], new_df['wspd'].loc[mask], linewidth=2.0, marker='o', color='green')
-
-##  2022  ##
-ax[4].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[4].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[4].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[4].set_ylabel("u (m/s)")
-ax[4].grid(True, which='minor', axis='x')
-ax[4].grid(True, which='major', axis='y')
-
-mask = (new_df['date'] >= '2022-01-01') & (new_df['date'] <= '2022-12-31')
-ax[4].set_xlim(date(year=2022, month=1, day=1), date(year=2022, month=12, day=31))
-ax[4].set_ylim(0.0, 1.1*new_df['wspd'].loc[mask].max())
-ax[4].plot(new_df['date'].loc[mask], new_df['wspd'].loc[mask], linewidth=2.0, marker='o', color='darkorchid')
-
-
-fig.tight_layout()
-# ------------------------------------------------------------------
-
-
-plt.show()
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
+
+# One subplot per year of the data
+fig = figure_yearly(plt, new_df[ station.ts_col ], new_df[ station.ws_col ])
+
+show_figure(fig, plot_dir, station.station + "_yearly")
 
 ###  END Plot  ###
 
@@ -35,52 +35,44 @@
 
 
 from sys import argv
-from os import path,listdir
+from os import path
 import numpy as np
 from scipy.special import gamma
 from datetime import date, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_UoM_Farm_dat
+from Wind_registry import station_config, mask_gaps
+from Wind_stats import value_counts, value_counts_moments, value_counts_histogram
+from Wind_plots import pyplot, show_figure
 
 
-###  Path for UoM Farm data files  ###
-DataPath = "/mnt/80_GiB_DATA/data/FARWIND_UoM/Data_UoM_Farm"
+###  Weather station (see Stations.json)  ###
+station = station_config("UoM_Farm")
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(DataPath):
-    print("{:s} is not a directory!".format(DataPath))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-##  Weather station data
-filelist = sorted( listdir(DataPath) )
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-print("\nSuccessfully accessed directory")
-print(DataPath)
-print("\nContent of directory:")
-print(filelist)
 
-print()
 
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(DataPath + "/" + filelist[i]))
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
 
-    tmp_df = pd.read_csv(DataPath + "/" + filelist[i], skiprows=[0,2,3], parse_dates=['TIMESTAMP'])
 
-    if (i == 0):
-        wind_df = tmp_df[['TIMESTAMP', 'WS_ms_Avg', 'WS_ms_S_WVT', 'WindDir_D1_WVT', 'WindDir_SD1_WVT']].dropna(axis=0, how='any')
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['TIMESTAMP', 'WS_ms_Avg', 'WS_ms_S_WVT', 'WindDir_D1_WVT', 'WindDir_SD1_WVT']].dropna(axis=0, how='any')],
-                            axis=0)
+###  BEGIN Open files and load relevant data into arrays  ###
+
+##  Weather station data
+wind_df, ingest_report = load_directory(station.path, read_UoM_Farm_dat, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
@@ -100,20 +92,42 @@ print("------------------------------------------------------------")
 
 
 
+###  BEGIN Refining data  ###
+
+# Mask excluding gaps in the data (see Stations.json) and apply mask
+new_df = mask_gaps(wind_df, station)
+
+print()
+print("------------------------------------------------------------")
+print("type(new_df):")
+print(type(new_df))
+print("------------------------------------------------------------")
+print("new_df.info():")
+print(new_df.info())
+print("------------------------------------------------------------")
+print(new_df.iloc[:20])
+print(". . .")
+print(new_df.iloc[-20:])
+print("------------------------------------------------------------")
+
+###  END Refining data  ###
+
+
+
 ###  BEGIN Make histogram and probability distribution  ###
 
 # Convert wind speed series to numpy array
-avg_ws = wind_df[[ 'WS_ms_Avg' ]].to_numpy().T[0]
+avg_ws = new_df[ station.ws_col ].to_numpy()
+ws_vc = value_counts(avg_ws)
 
-bin_size = 0.20  # m/s
-ceil_ws = np.ceil(avg_ws.max())
-hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+bin_size = station.bin_size  # m/s
+ceil_ws = np.ceil(ws_vc.values.max())
+hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
 
 # Probability density, mean and standard deviation
 ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
 cumul_P = (ws_P * bin_size).cumsum()
-ws_mean = avg_ws.mean()
-ws_stddev = np.std(avg_ws)
+ws_count, ws_mean, ws_stddev = value_counts_moments(ws_vc)
 ws_midpts = np.zeros( hist_w8ts.shape )
 
 for i in range(len(ws_midpts)):
@@ -148,8 +162,8 @@ print()
 
 ###  BEGIN Plot  ###
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
 fig, ax = plt.subplots(1,1)
 
@@ -163,7 +177,7 @@ ax.set_ylabel("Weight")
 ax.bar(hist_edges[:-1], hist_w8ts, align='edge', width=bin_size, color='whitesmoke', edgecolor='black', linewidth=1.5)
 fig.tight_layout()
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_hist")
 
 ###  END Plot  ###
 
@@ -34,52 +34,44 @@
 #
 
 from sys import argv
-from os import path,listdir
+from os import path
 import numpy as np
 from scipy.special import gamma
-from datetime import date, timedelta
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_UoM_Farm_dat
+from Wind_registry import station_config, mask_gaps
+from Wind_resample import resample_wind
+from Wind_plots import pyplot, show_figure, figure_yearly
 
 
-###  Path for UoM Farm data files  ###
-DataPath = "/mnt/80_GiB_DATA/data/FARWIND_UoM/Data_UoM_Farm"
+###  Weather station (see Stations.json)  ###
+station = station_config("UoM_Farm")
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(DataPath):
-    print("{:s} is not a directory!".format(DataPath))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-##  Weather station data
-filelist = sorted( listdir(DataPath) )
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-print("\nSuccessfully accessed directory")
-print(DataPath)
-print("\nContent of directory:")
-print(filelist)
 
-print()
 
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(DataPath + "/" + filelist[i]))
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
 
-    tmp_df = pd.read_csv(DataPath + "/" + filelist[i], skiprows=[0,2,3], parse_dates=['TIMESTAMP'])
 
-    if (i == 0):
-        wind_df = tmp_df[['TIMESTAMP', 'WS_ms_Avg', 'WS_ms_S_WVT', 'WindDir_D1_WVT', 'WindDir_SD1_WVT']].dropna(axis=0, how='any')
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['TIMESTAMP', 'WS_ms_Avg', 'WS_ms_S_WVT', 'WindDir_D1_WVT', 'WindDir_SD1_WVT']].dropna(axis=0, how='any')],
-                            axis=0)
+###  BEGIN Open files and load relevant data into arrays  ###
+
+##  Weather station data
+wind_df, ingest_report = load_directory(station.path, read_UoM_Farm_dat, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
@@ -98,9 +90,13 @@ print(wind_df.iloc[-20:])
 print("------------------------------------------------------------")
 
 
-# Resample
-new_df = wind_df.resample(timedelta(days=1), axis=0, on='TIMESTAMP').mean()
-new_df.reset_index(inplace=True)
+# Mask excluding gaps in the data (see Stations.json) and average over
+# intervals of station.yearly_resample (vector mean of the wind direction)
+trim_df = mask_gaps(wind_df, station)
+avg = resample_wind(trim_df[ station.ts_col ], trim_df[ station.ws_col ], trim_df[ station.wd_col ], station.yearly_resample)
+new_df = pd.DataFrame({ station.ts_col: avg.time,
+                        station.wd_col: avg.wd,
+                        station.ws_col: avg.ws })
 
 
 ###  BEGIN Plot  ###
@@ -108,69 +104,19 @@ new_df.reset_index(inplace=True)
 print("\n\n")
 print("------------------------------------------------------------")
 print("Plotting wind speed data for period:")
-print("{:s}  ->  {:s}".format(new_df['TIMESTAMP'].min().strftime("%d.%m.%Y"), new_df['TIMESTAMP'].max().strftime("%d.%m.%Y")))
+print("{:s}  ->  {:s}".format(new_df[ station.ts_col ].min().strftime("%d.%m.%Y"), new_df[ station.ts_col ].max().strftime("%d.%m.%Y")))
 print("for UoM Farm weather station.")
 print("------------------------------------------------------------")
 print("\n\n")
 
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
-
-# ------------------------------------------------------------------
-fig, ax = plt.subplots(3,1)
-
-fig.autofmt_xdate()
-x_axis_format = mdates.DateFormatter('%b')
-
-##  2015  ##
-ax[0].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[0].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[0].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[0].set_ylabel("u (m/s)")
-ax[0].grid(True, which='minor', axis='x')
-ax[0].grid(True, which='major', axis='y')
-
-mask = (new_df['TIMESTAMP'] >= '2015-01-01') & (new_df['TIMESTAMP'] <= '2015-12-31')
-ax[0].set_xlim(date(year=2015, month=1, day=1), date(year=2015, month=12, day=31))
-ax[0].set_ylim(0.0, 1.1*new_df['WS_ms_Avg'].loc[mask].max())
-ax[0].plot(new_df['TIMESTAMP'].loc[mask], new_df['WS_ms_Avg'].loc[mask], linewidth=2.0, marker='o', color='blue')
-
-##  2016  ##
-ax[1].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[1].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[1].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[1].set_ylabel("u (m/s)")
-ax[1].grid(True, which='minor', axis='x')
-ax[1].grid(True, which='major', axis='y')
-
-mask = (new_df['TIMESTAMP'] >= '2016-01-01') & (new_df['TIMESTAMP'] <= '2016-12-31')
-ax[1].set_xlim(date(year=2016, month=1, day=1), date(year=2016, month=12, day=31))
-ax[1].set_ylim(0.0, 1.1*new_df['WS_ms_Avg'].loc[mask].max())
-ax[1].plot(new_df['TIMESTAMP'].loc[mask], new_df['WS_ms_Avg'].loc[mask], linewidth=2.0, marker='o', color='gold')
-
-##  2022  ##
-ax[2].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax[2].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax[2].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax[2].set_ylabel("u (m/s)")
-ax[2].grid(True, which='minor', axis='x')
-ax[2].grid(True, which='major', axis='y')
-
-mask = (new_df['TIMESTAMP'] >= '2022-01-01') & (new_df['TIMESTAMP'] <= '2022-12-31')
-ax[2].set_xlim(date(year=2022, month=1, day=1), date(year=2022, month=12, day=31))
-ax[2].set_ylim(0.0, 1.1*new_df['WS_ms_Avg'].loc[mask].max())
-ax[2].plot(new_df['TIMESTAMP'].loc[mask], new_df['WS_ms_Avg'].loc[mask], linewidth=2.0, marker='o', color='green')
-
-
-fig.tight_layout()
-
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
-#print("Saving plot with filename {:s} ... \n\n".format("SWIO_raw_Vacoas.eps"))
-#plt.savefig("SWIO_raw_Vacoas.eps", format='eps')
-# ------------------------------------------------------------------
+# One subplot per year of the data
+fig = figure_yearly(plt, new_df[ station.ts_col ], new_df[ station.ws_col ])
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_yearly")
 
 ###  END Plot  ###
 
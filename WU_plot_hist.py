@@ -39,71 +39,51 @@
 #
 
 
-from os import path,listdir
+from os import path
 import numpy as np
 from scipy.special import gamma
 from datetime import date, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_WU_csv
+from Wind_registry import station_config, mask_gaps
+from Wind_stats import value_counts, value_counts_moments, value_counts_histogram
+from Wind_plots import pyplot, show_figure
 
 
-###  Weather station index to calculate for  ###
+###  Weather station to calculate for (see Stations.json)  ###
 #
-# 0 : Quatres Bornes
-# 1 : Bout du Monde, Ebene
+# WU_IPLAINEW2 : Quatres Bornes
+# WU_IPLAIN36  : Bout du Monde, Ebene
 #
 #
-stationIdx = 0
-
-
-WU_stations = [["IPLANEW2",
-                "Quatres Bornes",
-                "./Sample_data/Weather_Underground/Quatres_Bornes_IPLAINEW2",
-                0.5
-               ],
-               ["IPLAIN36",
-                "Bout du Monde, Ebene",
-                "./Sample_data/Weather_Underground/Ebene_IPLAIN36",
-                0.5
-               ]]
+station = station_config("WU_IPLAINEW2")
 
 
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(WU_stations[stationIdx][2]):
-    print("{:s} is not a directory!".format(WU_stations[stationIdx][2]))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-##  Weather station data
-filelist = sorted( listdir(WU_stations[stationIdx][2]) )
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-print("\nSuccessfully accessed directory")
-print(WU_stations[stationIdx][2])
-print("\nContent of directory:")
-print(filelist)
 
-print()
 
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(WU_stations[stationIdx][2] + "/" + filelist[i]))
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
 
-    tmp_df = pd.read_csv(WU_stations[stationIdx][2] + "/" + filelist[i], parse_dates=['Date'])
 
-    if (i == 0):
-        wind_df = tmp_df[['Date', 'Avg']].dropna(axis=0, how='any')
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['Date', 'Avg']].dropna(axis=0, how='any')],
-                            axis=0)
+###  BEGIN Open files and load relevant data into arrays  ###
+
+##  Weather station data
+wind_df, ingest_report = load_directory(station.path, read_WU_csv, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
@@ -124,20 +104,42 @@ print("------------------------------------------------------------")
 
 
 
+###  BEGIN Refining data  ###
+
+# Mask excluding gaps in the data (see Stations.json) and apply mask
+new_df = mask_gaps(wind_df, station)
+
+print()
+print("------------------------------------------------------------")
+print("type(new_df):")
+print(type(new_df))
+print("------------------------------------------------------------")
+print("new_df.info():")
+print(new_df.info())
+print("------------------------------------------------------------")
+print(new_df.iloc[:20])
+print(". . .")
+print(new_df.iloc[-20:])
+print("------------------------------------------------------------")
+
+###  END Refining data  ###
+
+
+
 ###  BEGIN Make histogram and probability distribution  ###
 
 # Convert wind speed series to numpy array
-avg_ws = wind_df[['Avg']].to_numpy().T[0]
+avg_ws = new_df[ station.ws_col ].to_numpy()
+ws_vc = value_counts(avg_ws)
 
-bin_size = WU_stations[stationIdx][3]  # m/s
-ceil_ws = np.ceil(avg_ws.max())
-hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+bin_size = station.bin_size  # m/s
+ceil_ws = np.ceil(ws_vc.values.max())
+hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
 
 # Probability density, mean and standard deviation
 ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
 cumul_P = (ws_P * bin_size).cumsum()
-ws_mean = avg_ws.mean()
-ws_stddev = np.std(avg_ws)
+ws_count, ws_mean, ws_stddev = value_counts_moments(ws_vc)
 ws_midpts = np.zeros( hist_w8ts.shape )
 
 for i in range(len(ws_midpts)):
@@ -172,8 +174,8 @@ print()
 
 ###  BEGIN Plot  ###
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
 fig, ax = plt.subplots(1,1)
 
@@ -187,7 +189,7 @@ ax.set_ylabel("Weight")
 ax.bar(hist_edges[:-1], hist_w8ts, align='edge', width=bin_size, color='whitesmoke', edgecolor='black', linewidth=1.5)
 fig.tight_layout()
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_hist")
 
 ###  END Plot  ###
 
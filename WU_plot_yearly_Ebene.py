@@ -38,69 +38,51 @@
 #
 
 
-from os import path,listdir
+from os import path
 import numpy as np
 from scipy.special import gamma
-from datetime import date, timedelta
 import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import matplotlib.dates as mdates
-rcParams['font.size'] = 16.0
+from Wind_loader import load_directory, read_WU_csv
+from Wind_registry import station_config, mask_gaps
+from Wind_resample import resample_wind
+from Wind_plots import pyplot, show_figure, figure_yearly
 
 
-###  Weather station index to calculate for  ###
+###  Weather station to calculate for (see Stations.json)  ###
 #
-# 0 : Quatres Bornes
-# 1 : Bout du Monde, Ebene
+# WU_IPLAINEW2 : Quatres Bornes
+# WU_IPLAIN36  : Bout du Monde, Ebene
 #
 #
-stationIdx = 1
-
-
-WU_stations = [["IPLANEW2",
-                "Quatres Bornes",
-                "./Sample_data/Weather_Underground/Quatres_Bornes_IPLAINEW2",
-               ],
-               ["IPLAIN36",
-                "Bout du Monde, Ebene",
-                "./Sample_data/Weather_Underground/Ebene_IPLAIN36",
-               ]]
+station = station_config("WU_IPLAIN36")
 
 
 
 # Check if given path for weather station data is indeed a directory
-if not path.isdir(WU_stations[stationIdx][2]):
-    print("{:s} is not a directory!".format(WU_stations[stationIdx][2]))
+if not path.isdir(station.path):
+    print("{:s} is not a directory!".format(station.path))
     exit(1)
 
 
 
-###  BEGIN Open files and load relevant data into arrays  ###
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
 
-##  Weather station data
-filelist = sorted( listdir(WU_stations[stationIdx][2]) )
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
 
-print("\nSuccessfully accessed directory")
-print(WU_stations[stationIdx][2])
-print("\nContent of directory:")
-print(filelist)
 
-print()
 
-for i in range(len(filelist)):
-    print("Opening CSV file {:s} ...".format(WU_stations[stationIdx][2] + "/" + filelist[i]))
+###  Directory where the figure is saved (None to show it on screen;  ###
+###  it is saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
+
 
-    tmp_df = pd.read_csv(WU_stations[stationIdx][2] + "/" + filelist[i], parse_dates=['Date'])
 
-    if (i == 0):
-        wind_df = tmp_df[['Date', 'Avg']].dropna(axis=0, how='any')
+###  BEGIN Open files and load relevant data into arrays  ###
 
-    else:
-        # Concatenate into main dataframe, wind_df
-        wind_df = pd.concat([wind_df,
-                             tmp_df[['Date', 'Avg']].dropna(axis=0, how='any')],
-                            axis=0)
+##  Weather station data
+wind_df, ingest_report = load_directory(station.path, read_WU_csv, nproc=nproc, cache_dir=cache_dir)
 
 ###  END Open files and load relevant data into arrays  ###
 
@@ -123,9 +105,12 @@ print("------------------------------------------------------------")
 
 ###  BEGIN Refining data  ###
 
-# Resample
-new_df = wind_df.resample(timedelta(days=2), axis=0, on='Date').mean()
-new_df.reset_index(inplace=True)
+# Mask excluding gaps in the data (see Stations.json) and average over
+# intervals of station.yearly_resample
+trim_df = mask_gaps(wind_df, station)
+avg = resample_wind(trim_df[ station.ts_col ], trim_df[ station.ws_col ], None, station.yearly_resample)
+new_df = pd.DataFrame({ station.ts_col: avg.time,
+                        station.ws_col: avg.ws })
 
 
 print()
@@ -150,41 +135,19 @@ print("------------------------------------------------------------")
 print("\n\n")
 print("------------------------------------------------------------")
 print("Plotting wind speed data for period:")
-print("{:s}  ->  {:s}".format(new_df['Date'].min().strftime("%d.%m.%Y"), new_df['Date'].max().strftime("%d.%m.%Y")))
-print("for WU weather station at {:s} ({:s})".format(WU_stations[stationIdx][1], WU_stations[stationIdx][0]))
+print("{:s}  ->  {:s}".format(new_df[ station.ts_col ].min().strftime("%d.%m.%Y"), new_df[ station.ts_col ].max().strftime("%d.%m.%Y")))
+print("for WU weather station at {:s} ({:s})".format(station.location, station.name))
 print("------------------------------------------------------------")
 print("\n\n")
 
 
-# Set size of figure for laptop screen (1600 x 900 pixels)
-plt.rcParams["figure.figsize"] = [12.00,7.85]
-
-# ------------------------------------------------------------------
-fig, ax = plt.subplots(1,1)
-
-fig.autofmt_xdate()
-x_axis_format = mdates.DateFormatter('%b')
-
-
-##  2022  ##
-ax.xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
-ax.xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
-ax.xaxis.set_major_formatter( mdates.DateFormatter('%b') )
-ax.set_ylabel("u (m/s)")
-ax.grid(True, which='minor', axis='x')
-ax.grid(True, which='major', axis='y')
-
-mask = (new_df['Date'] >= '2022-01-01') & (new_df['Date'] <= '2022-12-31')
-ax.set_xlim(date(year=2022, month=1, day=1), date(year=2022, month=12, day=31))
-ax.set_ylim(0.0, 1.1*new_df['Avg'].loc[mask].max())
-ax.plot(new_df['Date'].loc[mask], new_df['Avg'].loc[mask], linewidth=2.0, marker='o', color='darkorchid')
-
-
-fig.tight_layout()
-# ------------------------------------------------------------------
+# Matplotlib, with the size of figure for laptop screen (1600 x 900 pixels)
+plt = pyplot(plot_dir)
 
+# One subplot per year of the data
+fig = figure_yearly(plt, new_df[ station.ts_col ], new_df[ station.ws_col ])
 
-plt.show()
+show_figure(fig, plot_dir, station.station + "_yearly")
 
 ###  END Plot  ###
 
@@ -0,0 +1,418 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Weibull parameter estimation for many data sets at once.
+#
+#  The data sets (stations, months, seasons, sliding windows, ...) are the
+#  rows of 2-D arrays: one row of moments, one row of histogram counts and,
+#  for the ML method, one row of counts of the distinct wind speeds per data
+#  set. All the rows share the same histogram edges and the same table of
+#  distinct wind speeds. The nine methods of Weibull_methods.py are then
+#  computed for all the rows together with NumPy operations; the only Python
+#  loops are over the iterations of the ML/MML and PDM/EPF solvers.
+#
+#  When the histogram edges are fixed-width bins from 0 m/s (e.g. bin sizes
+#  of 0.1, 0.2, 0.25, 0.5 and 1.0 m/s), each row gives the same k and c as
+#  fitting that data set on its own in the scripts: batch_stats() records
+#  the number of bins of each data set's own histogram, and the bins beyond
+#  are left out of the estimates.
+#
+#
+
+
+import warnings
+from collections import namedtuple
+import numpy as np
+from Weibull_methods import W_param_est, MLResult, ML_Halley_step, hist_midpoints
+from Weibull_moments import gamma_1nk, fit_PDM_arrays, fit_EPF_arrays
+
+
+#---------------------------------------------------------------------#
+#  Statistics of nwin data sets.
+#
+#  count, mean, stddev: arrays of shape (nwin,)
+#  hist_w8ts: histogram counts, shape (nwin, nbins)
+#  hist_edges: histogram edges shared by all rows, shape (nbins + 1,)
+#  hist_nbins: number of bins of the histogram of each row on its own, i.e.
+#      int(ceil(max) / bin_size), shape (nwin,); None to use all the bins
+#  ml_values: distinct wind speeds shared by all rows, shape (nval,)
+#  ml_weights: counts of each distinct wind speed, shape (nwin, nval)
+#
+#  ml_values and ml_weights may be None if the ML method is not needed.
+#
+WeibullBatchStats = namedtuple('WeibullBatchStats', ['count', 'mean', 'stddev', 'hist_w8ts', 'hist_edges', 'hist_nbins', 'ml_values', 'ml_weights'], defaults=[None, None, None])
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Statistics of the data sets defined by labels: labels[i] is the index
+#  (0 to nwin-1) of the data set of wind speed ws[i], or -1 for a wind speed
+#  which belongs to none. NaN wind speeds are ignored.
+#
+#  The histogram has int(ceil_ws / bin_size) bins over [0, ceil_ws], as in
+#  the scripts; ceil_ws defaults to the ceiling of the largest wind speed.
+#  np.histogram closes the last bin of each data set's own histogram, at the
+#  ceiling of its maximum wind speed; a wind speed equal to that ceiling is
+#  counted in that bin, as it would be in the scripts.
+#  If distinct is True, the table of distinct wind speeds is built for the
+#  ML method (nwin x nval counts).
+#
+def batch_stats(ws, labels, nwin, bin_size, ceil_ws=None, distinct=True):
+    ws = np.asarray(ws, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.int64)
+
+    keep = (labels >= 0) & (labels < nwin) & np.logical_not( np.isnan(ws) )
+    ws = ws[keep]
+    labels = labels[keep]
+
+    ##  Moments (two passes, as np.std)
+    count = np.bincount(labels, minlength=nwin)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.bincount(labels, weights=ws, minlength=nwin) / count
+        dev = ws - mean[labels]
+        stddev = np.sqrt( np.bincount(labels, weights=dev*dev, minlength=nwin) / count )
+
+    ##  Histogram, with the bins of np.histogram (last bin closed)
+    if ceil_ws is None:
+        ceil_ws = np.ceil(ws.max())
+
+    nbins = int(ceil_ws / bin_size)
+    hist_edges = np.linspace(0.0, ceil_ws, nbins + 1)
+
+    # Number of bins of each data set's own histogram
+    ws_max = np.full(nwin, -np.inf)
+    np.maximum.at(ws_max, labels, ws)
+    hist_nbins = np.zeros(nwin, dtype=np.int64)
+    nonempty = count > 0
+    hist_nbins[nonempty] = ( np.ceil(ws_max[nonempty]) / bin_size ).astype(np.int64)
+
+    idx = np.searchsorted(hist_edges, ws, side='right') - 1
+    idx = np.minimum(idx, hist_nbins[labels] - 1)
+    inside = (idx >= 0) & (idx < nbins)
+
+    hist_w8ts = np.bincount(labels[inside] * nbins + idx[inside], minlength=nwin*nbins).reshape(nwin, nbins)
+
+    ##  Distinct wind speeds
+    ml_values = None
+    ml_weights = None
+    if distinct:
+        ml_values, inverse = np.unique(ws, return_inverse=True)
+        nval = len(ml_values)
+        ml_weights = np.bincount(labels * nval + inverse.ravel(), minlength=nwin*nval).reshape(nwin, nval)
+
+    return WeibullBatchStats(count, mean, stddev, hist_w8ts, hist_edges, hist_nbins, ml_values, ml_weights)
+#---------------------------------------------------------------------#
+
+
+
+#---------------------------------------------------------------------#
+#  Statistics of data sets given as counts of shared distinct wind speeds:
+#  weights[i,j] is the number of times the wind speed values[j] occurs in
+#  data set i (e.g. bootstrap resamples, or data sets summarised by
+#  np.unique(..., return_counts=True)). values must be sorted in increasing
+#  order, as returned by np.unique.
+#
+#  The histograms are built as in batch_stats(), from the counts of the
+#  distinct wind speeds falling in each bin. If hist_edges is given (e.g.
+#  the edges of the histogram of the whole data, for its bootstrap
+#  resamples), all the rows are binned on these edges, every bin is used,
+#  and the last bin is closed as in np.histogram.
+#
+def batch_stats_from_counts(values, weights, bin_size, ceil_ws=None, hist_edges=None):
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.atleast_2d(weights)
+    nwin, nval = weights.shape
+
+    ##  Moments (two passes, as np.std)
+    count = weights.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = (weights @ values) / count
+        dev = values[np.newaxis,:] - mean[:,np.newaxis]
+        stddev = np.sqrt( (weights * dev * dev).sum(axis=1) / count )
+
+    ##  Histogram
+    present = weights > 0
+    nonempty = count > 0
+    hist_nbins = np.zeros(nwin, dtype=np.int64)
+
+    if hist_edges is None:
+        if ceil_ws is None:
+            ceil_ws = np.ceil( values[ present.any(axis=0) ].max() )
+
+        nbins = int(ceil_ws / bin_size)
+        hist_edges = np.linspace(0.0, ceil_ws, nbins + 1)
+
+        # Number of bins of each data set's own histogram, from its largest
+        # wind speed (the last distinct value with a non-zero count)
+        last = nval - 1 - np.argmax(present[:, ::-1], axis=1)
+        hist_nbins[nonempty] = ( np.ceil(values[ last[nonempty] ]) / bin_size ).astype(np.int64)
+    else:
+        hist_edges = np.asarray(hist_edges, dtype=np.float64)
+        nbins = len(hist_edges) - 1
+        hist_nbins[nonempty] = nbins
+
+    # The values are sorted, so the values of each bin are contiguous. A
+    # value on the last edge belongs to the last bin.
+    idx = np.searchsorted(hist_edges, values, side='right') - 1
+    idx[ values == hist_edges[-1] ] = nbins - 1
+    inside = np.flatnonzero( (idx >= 0) & (idx < nbins) )
+    hist_w8ts = np.zeros((nwin, nbins), dtype=weights.dtype)
+    if (len(inside) > 0):
+        bins, starts = np.unique(idx[inside], return_index=True)
+        hist_w8ts[:, bins] = np.add.reduceat(weights[:, inside], starts, axis=1)
+
+    # np.histogram closes the last bin of each data set's own histogram: the
+    # wind speeds equal to the ceiling of its maximum are moved from the next
+    # bin into the last one
+    r = np.flatnonzero( (hist_nbins > 0) & (hist_nbins < nbins) )
+    hist_w8ts[r, hist_nbins[r] - 1] += hist_w8ts[r, hist_nbins[r]]
+    hist_w8ts[r, hist_nbins[r]] = 0
+
+    return WeibullBatchStats(count, mean, stddev, hist_w8ts, hist_edges, hist_nbins, values, weights)
+#---------------------------------------------------------------------#
+
+
+
+#---------------------------------------------------------------------#
+#  Graphical method (Rohatgi & Nelson, 1994) for each row of hist_w8ts,
+#  regressing against ln(xpts) where xpts are the midpoints (GM1) or upper
+#  edges (GM2) of the bins.
+#
+#  As in the scripts, the NaN and infinite values of y are dropped and the
+#  remaining ones are matched with the first bins of the row. The valid y
+#  values of each row are moved to the front (in order) by a stable sort.
+#  Only the first hist_nbins[i] bins of row i are used, if given.
+#
+def GM_batch(hist_w8ts, xpts, hist_nbins=None):
+    H = np.asarray(hist_w8ts, dtype=np.float64)
+    nbins = H.shape[1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cumul_P = (H / H.sum(axis=1, keepdims=True)).cumsum(axis=1)
+        y = np.log( -1.0 * np.log(1.0 - cumul_P) )
+
+    valid = np.isfinite(y)
+    if hist_nbins is not None:
+        valid = valid & ( np.arange(nbins)[np.newaxis,:] < np.asarray(hist_nbins)[:,np.newaxis] )
+    m = valid.sum(axis=1)
+
+    order = np.argsort(np.logical_not(valid), axis=1, kind='stable')
+    y = np.take_along_axis(y, order, axis=1)
+
+    sel = np.arange(nbins)[np.newaxis,:] < m[:,np.newaxis]
+    y = np.where(sel, y, 0.0)
+    x = np.where(sel, np.log(xpts)[np.newaxis,:], 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = x.sum(axis=1) / m
+        y_mean = y.sum(axis=1) / m
+        Sxx = (x * x).sum(axis=1)
+        Sxy = (x * y).sum(axis=1)
+
+        den = Sxx - (m * x_mean * x_mean)
+
+        k = (Sxy - (m * x_mean * y_mean)) / den
+        num = (y_mean * Sxx) - (x_mean * Sxy)
+        c = np.e**(-1.0 * (num / den) / k)
+
+    return k, c
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Maximum likelihood equation (see ML_solve() in Weibull_methods.py) for
+#  each row of weights w over the shared values x, with n[i] the total
+#  weight of row i and k[i] its seed. All rows are iterated together; a row
+#  stops once the relative change in its k falls below rtol. The rows are
+#  processed in blocks of block rows to bound the memory used by the
+#  (rows x values) arrays.
+#
+#  Returns an MLResult of arrays. As in ML_solve(), c and the residual are
+#  evaluated at the final k, and a RuntimeWarning is issued if some rows
+#  did not converge after max_iter passes (converged is False for them).
+#
+def ML_sums_batch(log_x, w, k):
+    P = np.exp( k[:,np.newaxis] * log_x[np.newaxis,:] )
+    P *= w
+
+    B = P.sum(axis=1)
+    P *= log_x
+    A = P.sum(axis=1)
+    P *= log_x
+    C = P.sum(axis=1)
+    P *= log_x
+    D = P.sum(axis=1)
+
+    return B, A, C, D
+
+
+def ML_solve_batch(x, w, n, k, rtol=1.0e-6, max_iter=50, block=4096):
+    if (max_iter < 1):
+        raise ValueError("max_iter must be at least 1, got {:d}".format(max_iter))
+
+    x = np.asarray(x, dtype=np.float64)
+    w = np.asarray(w, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    nrows = w.shape[0]
+
+    # Only the positive values contribute to the sums
+    pos = x > 0.0
+    log_x = np.log(x[pos])
+    w = w[:, pos]
+    L = w @ log_x
+
+    k = np.array(k, dtype=np.float64)
+    B = np.full(nrows, np.nan)
+    g = np.full(nrows, np.nan)
+    iterations = np.zeros(nrows, dtype=np.int64)
+
+    active = np.isfinite(k) & (n > 0)
+    started = active.copy()
+    converged = np.zeros(nrows, dtype=bool)
+
+    for i in range(1, max_iter+1):
+        rows = np.flatnonzero(active)
+        if (len(rows) == 0):
+            break
+
+        for start in range(0, len(rows), block):
+            r = rows[start : start+block]
+
+            B_r, A_r, C_r, D_r = ML_sums_batch(log_x, w[r], k[r])
+            g_r, new_k = ML_Halley_step(k[r], B_r, A_r, C_r, D_r, L[r], n[r])
+            B[r] = B_r
+            g[r] = g_r
+            iterations[r] = i
+
+            # Rows which converged at the previous iteration stop here,
+            # with the sums evaluated at their final k
+            done = converged[r]
+            active[ r[done] ] = False
+
+            step = np.logical_not(done)
+            converged[ r[step] ] = np.abs(new_k[step] - k[r[step]]) <= rtol * np.abs(new_k[step])
+            k[ r[step] ] = new_k[step]
+
+    # Rows still active after max_iter passes: their last pass updated k, so
+    # the sums and the residual are evaluated again at the final k
+    rows = np.flatnonzero(active)
+    for start in range(0, len(rows), block):
+        r = rows[start : start+block]
+
+        B_r, A_r, C_r, D_r = ML_sums_batch(log_x, w[r], k[r])
+        g[r], new_k = ML_Halley_step(k[r], B_r, A_r, C_r, D_r, L[r], n[r])
+        B[r] = B_r
+
+    failed = started & np.logical_not(converged)
+    if np.any(failed):
+        warnings.warn("Maximum likelihood equation not solved after {:d} iterations for {:d} of {:d} data sets".format(max_iter, np.count_nonzero(failed), np.count_nonzero(started)), RuntimeWarning)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = ( B / n )**(1/k)
+
+    c[ n <= 0 ] = np.nan
+    k[ n <= 0 ] = np.nan
+
+    return MLResult(k, c, iterations, g, converged)
+#---------------------------------------------------------------------#
+
+
+
+#---------------------------------------------------------------------#
+#  Estimators of each method for the rows of a WeibullBatchStats bs. Each
+#  returns arrays k and c of shape (nwin,).
+#
+def EMJ_seed(bs):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (bs.stddev / bs.mean)**-1.086
+
+
+def batch_EMJ(bs):
+    k = EMJ_seed(bs)
+    return k, bs.mean / gamma_1nk(1.0, k)
+
+
+def batch_EML(bs):
+    k = EMJ_seed(bs)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return k, bs.mean * ( 0.568 + 0.434/k )**(-1.0/k)
+
+
+def batch_GM1(bs):
+    return GM_batch(bs.hist_w8ts, hist_midpoints(bs.hist_edges), bs.hist_nbins)
+
+
+def batch_GM2(bs):
+    return GM_batch(bs.hist_w8ts, bs.hist_edges[1:], bs.hist_nbins)
+
+
+def batch_ML(bs, rtol=1.0e-6):
+    if bs.ml_values is None:
+        raise ValueError("The maximum likelihood method needs the table of distinct wind speeds")
+
+    # Number of non-zero wind speed data points
+    n = bs.ml_weights[:, bs.ml_values > 0.1].sum(axis=1)
+
+    res = ML_solve_batch(bs.ml_values, bs.ml_weights, n, EMJ_seed(bs), rtol=rtol)
+    return res.k, res.c
+
+
+def batch_MML(bs, rtol=1.0e-6):
+    res = ML_solve_batch(hist_midpoints(bs.hist_edges), bs.hist_w8ts, bs.hist_w8ts.sum(axis=1), EMJ_seed(bs), rtol=rtol)
+    return res.k, res.c
+
+
+def batch_MM(bs):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = ( (0.9874*bs.mean) / bs.stddev )**1.0983
+    return k, bs.mean / gamma_1nk(1.0, k)
+
+
+def batch_PDM(bs):
+    return fit_PDM_arrays(bs.mean, bs.stddev)
+
+
+def batch_EPF(bs):
+    return fit_EPF_arrays(bs.mean, bs.stddev)
+#---------------------------------------------------------------------#
+
+
+###  Batch estimator of each method  ###
+W_batch_functions = { "EMJ": batch_EMJ,
+                      "EML": batch_EML,
+                      "GM1": batch_GM1,
+                      "GM2": batch_GM2,
+                      "ML":  batch_ML,
+                      "MML": batch_MML,
+                      "MM":  batch_MM,
+                      "PDM": batch_PDM,
+                      "EPF": batch_EPF }
+
+
+#---------------------------------------------------------------------#
+#  Estimate k and c with each method in list methods for every row of the
+#  WeibullBatchStats bs. Returns a dictionary { method: (k, c) } of arrays
+#  of shape (nwin,), in the order of methods.
+#
+def fit_Weibull_batch(bs, methods=W_param_est):
+    return { method: W_batch_functions[method](bs) for method in methods }
+#---------------------------------------------------------------------#
@@ -0,0 +1,208 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Bootstrap confidence intervals for the Weibull parameters.
+#
+#  A resample of the wind speed data is represented by the number of times
+#  each distinct wind speed occurs in it, i.e. one row of counts over the
+#  table of distinct wind speeds. Two ways of resampling are provided:
+#
+#  - multinomial: the counts of the distinct wind speeds are drawn from a
+#    multinomial distribution with the observed frequencies. This is the
+#    ordinary bootstrap of independent data points.
+#  - blocks of days: whole days (or blocks of block_days consecutive days)
+#    are drawn with replacement, which keeps the autocorrelation of the
+#    wind within a day in the resamples.
+#
+#  The resamples are fitted in batches of rows with Weibull_batch.py, with
+#  all nine methods, and the batches may be spread over a pool of worker
+#  processes. Every resample is binned on the edges of the histogram of the
+#  whole data, so that the histogram methods (GM1, GM2, MML) of the
+#  resamples are comparable with the point estimates. Percentile intervals
+#  are then taken over the resamples.
+#
+#
+
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+import pandas as pd
+from Wind_loader import pool_context
+from Wind_store import to_epoch_seconds
+from Wind_stats import ValueCounts, value_counts_histogram
+from Weibull_methods import W_param_est
+from Weibull_batch import batch_stats_from_counts, fit_Weibull_batch
+
+
+###  Bootstrap estimates: arrays k and c of shape (nboot, len(methods))  ###
+BootstrapResult = namedtuple('BootstrapResult', ['methods', 'k', 'c'])
+
+
+#---------------------------------------------------------------------#
+#  Resamplers. Each returns an array (nb, nval) of counts of the distinct
+#  wind speeds for nb resamples, drawn with the generator rng.
+#
+#  counts: number of times each distinct wind speed occurs in the data
+#
+def resample_multinomial(counts, nb, rng):
+    counts = np.asarray(counts, dtype=np.float64)
+    n = int(counts.sum())
+
+    return rng.multinomial(n, counts / counts.sum(), size=nb)
+
+
+#  block_counts: counts of the distinct wind speeds in each block of days
+#      that can be drawn, shape (nblocks, nval)
+#  ndraw: number of blocks drawn per resample
+#
+def resample_blocks(block_counts, ndraw, nb, rng):
+    nblocks = block_counts.shape[0]
+    draws = rng.multinomial(ndraw, np.full(nblocks, 1.0 / nblocks), size=nb)
+
+    return draws @ block_counts
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Counts of the distinct wind speeds for each day with data (UTC), from
+#  the time stamps and wind speeds. Returns values (nval,) and day_counts
+#  (ndays, nval).
+#
+def day_value_counts(timestamps, ws):
+    t = to_epoch_seconds(timestamps)
+    ws = np.asarray(ws, dtype=np.float64)
+
+    keep = np.logical_not( np.isnan(ws) )
+    t = t[keep]
+    ws = ws[keep]
+
+    days, day = np.unique(t // 86400, return_inverse=True)
+    values, inverse = np.unique(ws, return_inverse=True)
+    ndays = len(days)
+    nval = len(values)
+
+    day_counts = np.bincount(day.ravel() * nval + inverse.ravel(), minlength=ndays*nval).reshape(ndays, nval)
+
+    return values, day_counts
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Fit one batch of nb resamples, binned on hist_edges. This is the
+#  function run by the worker processes. Returns arrays k and c of shape
+#  (nb, len(methods)).
+#
+def bootstrap_batch(resampler, values, bin_size, hist_edges, methods, nb, seed):
+    rng = np.random.default_rng(seed)
+
+    bs = batch_stats_from_counts(values, resampler(nb, rng), bin_size, hist_edges=hist_edges)
+    params = fit_Weibull_batch(bs, methods)
+
+    k = np.stack([ params[method][0] for method in methods ], axis=1)
+    c = np.stack([ params[method][1] for method in methods ], axis=1)
+
+    return k, c
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Draw nboot resamples with resampler and fit them, in batches of batch
+#  resamples. counts are the counts of the distinct wind speeds values in
+#  the whole data, whose histogram gives the edges of the bins of the
+#  resamples. If nproc > 1, the batches are fitted by a pool of nproc
+#  worker processes. Each batch has its own random stream derived from
+#  seed, so the result does not depend on nproc.
+#
+def run_bootstrap(resampler, values, counts, bin_size, nboot, methods, batch, nproc, seed):
+    hist_edges = value_counts_histogram(ValueCounts(values, counts), bin_size)[1]
+
+    sizes = [ min(batch, nboot - start) for start in range(0, nboot, batch) ]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    ctx = pool_context()
+    if (nproc > 1) and (len(sizes) > 1) and (ctx is not None):
+        with ProcessPoolExecutor(max_workers=min(nproc, len(sizes)), mp_context=ctx) as pool:
+            results = list( pool.map(bootstrap_batch,
+                                     [resampler] * len(sizes),
+                                     [values] * len(sizes),
+                                     [bin_size] * len(sizes),
+                                     [hist_edges] * len(sizes),
+                                     [methods] * len(sizes),
+                                     sizes,
+                                     seeds) )
+    else:
+        results = [ bootstrap_batch(resampler, values, bin_size, hist_edges, methods, sizes[i], seeds[i]) for i in range(len(sizes)) ]
+
+    k = np.concatenate([ res[0] for res in results ], axis=0)
+    c = np.concatenate([ res[1] for res in results ], axis=0)
+
+    return BootstrapResult(list(methods), k, c)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Bootstrap of independent data points: multinomial resampling of the
+#  counts of the distinct wind speeds values (e.g. from
+#  np.unique(avg_ws, return_counts=True)).
+#
+def bootstrap_Weibull(values, counts, bin_size, nboot=1000, methods=W_param_est, batch=250, nproc=1, seed=None):
+    resampler = partial(resample_multinomial, np.asarray(counts))
+
+    return run_bootstrap(resampler, np.asarray(values, dtype=np.float64), np.asarray(counts), bin_size, nboot, methods, batch, nproc, seed)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Block bootstrap of days: blocks of block_days consecutive days (among
+#  the days with data) are drawn with replacement, as many as needed to
+#  cover the number of days of the data.
+#
+def bootstrap_Weibull_days(timestamps, ws, bin_size, nboot=1000, block_days=1, methods=W_param_est, batch=250, nproc=1, seed=None):
+    values, day_counts = day_value_counts(timestamps, ws)
+    ndays = day_counts.shape[0]
+    block_days = min(block_days, ndays)
+
+    # Counts of each block of block_days consecutive days, from running sums
+    S = np.zeros((ndays + 1, day_counts.shape[1]), dtype=np.int64)
+    np.cumsum(day_counts, axis=0, out=S[1:])
+    block_counts = S[block_days:] - S[:-block_days]
+
+    ndraw = int( np.ceil(ndays / block_days) )
+    resampler = partial(resample_blocks, block_counts, ndraw)
+
+    return run_bootstrap(resampler, values, day_counts.sum(axis=0), bin_size, nboot, methods, batch, nproc, seed)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Percentile intervals of k and c for each method, at confidence level
+#  level. Returns a data frame indexed by method.
+#
+def bootstrap_intervals(res, level=0.95):
+    q = [ 50.0 * (1.0 - level), 50.0 * (1.0 + level) ]
+    k_low, k_high = np.nanpercentile(res.k, q, axis=0)
+    c_low, c_high = np.nanpercentile(res.c, q, axis=0)
+
+    return pd.DataFrame({ 'k_low': k_low, 'k_high': k_high, 'c_low': c_low, 'c_high': c_high }, index=res.methods)
+#---------------------------------------------------------------------#
@@ -0,0 +1,159 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Goodness of fit of the Weibull curves to the wind speed histogram.
+#
+#  The curves of all the methods (and, for batch or bootstrap fitting, of all
+#  the data sets) are stacked in one array of shape (..., nbins), the last
+#  axis running over the histogram bins. The densities are turned into bin
+#  probabilities with the real widths of the bins, np.diff(hist_edges), which
+#  differ from the nominal bin size when it does not divide the range of the
+#  histogram (e.g. 1.53125 m/s bins for a bin size of 1.5 m/s). The scores of every curve are
+#  computed together, from a single array of differences with the observed
+#  probability density which is reused in place for each score:
+#
+#  - RMSE: root mean square error,
+#  - R^2: coefficient of determination,
+#  - MAPE: mean absolute percentage error, the bins with no data being
+#    counted as 0, as in the scripts,
+#  - chi-square: Pearson's statistic, sum of (O - E)^2 / E. Bins with an
+#    expected count E below min_expected (5) would blow the sum up, so
+#    consecutive bins are merged from the left until each group expects at
+#    least 5 data points, a remainder at the end being merged into the last
+#    group. The number of degrees of freedom is the number of groups minus
+#    3 (one for the total count, two for k and c),
+#  - KS: Kolmogorov-Smirnov distance between the cumulative probabilities
+#    at the bin edges.
+#
+#
+
+
+from collections import namedtuple
+import numpy as np
+
+
+###  Scores of each curve  ###
+GOFScores = namedtuple('GOFScores', ['RMSE', 'Rsqrd', 'MAPE', 'chi2', 'KS', 'chi2_dof'])
+
+###  Smallest expected count of a group of bins for the chi-square  ###
+min_expected = 5.0
+
+
+#---------------------------------------------------------------------#
+#  Pearson's chi-square of the observed counts O against the expected
+#  counts E, both of shape (m, nbins), with the bins of each row merged into
+#  groups expecting at least min_exp data points. The bins are scanned once,
+#  all the rows together. Returns the statistic and the number of groups of
+#  each row.
+#
+def chi_square_merged(O, E, min_exp=min_expected):
+    m, nbins = E.shape
+    chi2 = np.zeros(m)
+    ngroups = np.zeros(m, dtype=np.int64)
+
+    # Counts of the group being filled, and of the last group closed
+    acc_O = np.zeros(m)
+    acc_E = np.zeros(m)
+    last_O = np.zeros(m)
+    last_E = np.zeros(m)
+
+    for j in range(nbins):
+        acc_O += O[:, j]
+        acc_E += E[:, j]
+
+        close = acc_E >= min_exp
+        if np.any(close):
+            chi2[close] += (acc_O[close] - acc_E[close])**2 / acc_E[close]
+            ngroups[close] += 1
+            last_O[close] = acc_O[close]
+            last_E[close] = acc_E[close]
+            acc_O[close] = 0.0
+            acc_E[close] = 0.0
+
+    # Remainder after the last group: merged into it, or a single group if
+    # the whole row expects fewer than min_exp data points
+    rest = (acc_E > 0.0) | (acc_O > 0.0)
+    merge = rest & (ngroups > 0)
+    chi2[merge] -= (last_O[merge] - last_E[merge])**2 / last_E[merge]
+    last_O[merge] += acc_O[merge]
+    last_E[merge] += acc_E[merge]
+    chi2[merge] += (last_O[merge] - last_E[merge])**2 / last_E[merge]
+
+    single = rest & (ngroups == 0) & (acc_E > 0.0)
+    chi2[single] = (acc_O[single] - acc_E[single])**2 / acc_E[single]
+    ngroups[single] = 1
+
+    return chi2, ngroups
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Scores of the curves Weibull_P (..., nbins) against the observed
+#  probability density ws_P (nbins,) or (..., nbins). Both are densities per
+#  unit of wind speed, over the bins with edges hist_edges. n is the number
+#  of data points of the histogram, for the chi-square statistic (see
+#  chi_square_merged()).
+#
+#  Returns a GOFScores of arrays with the leading shape of Weibull_P.
+#
+def gof_scores(Weibull_P, ws_P, hist_edges, n):
+    Weibull_P = np.asarray(Weibull_P, dtype=np.float64)
+    ws_P = np.asarray(ws_P, dtype=np.float64)
+    nbins = Weibull_P.shape[-1]
+    widths = np.diff(hist_edges)
+
+    # Differences between the curves and the data, reused in place below
+    diff = np.subtract(Weibull_P, ws_P)
+    buf = np.empty(np.broadcast_shapes(diff.shape, ws_P.shape), dtype=np.float64)
+
+    ##  Kolmogorov-Smirnov distance
+    np.multiply(diff, widths, out=buf)
+    np.cumsum(buf, axis=-1, out=buf)
+    np.abs(buf, out=buf)
+    KS = buf.max(axis=-1)
+
+    ##  MAPE
+    np.abs(diff, out=buf)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(buf, ws_P, out=buf)
+    np.nan_to_num(buf, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    MAPE = ( buf.sum(axis=-1) / nbins ) * 100.0
+
+    ##  RMSE and R^2
+    np.multiply(diff, diff, out=buf)
+    SSE = buf.sum(axis=-1)
+    RMSE = np.sqrt( SSE / nbins )
+
+    dev = ws_P - ws_P.mean(axis=-1, keepdims=True)
+    Rsqrd = 1 - ( SSE / (dev * dev).sum(axis=-1) )
+
+    ##  Chi-square on the counts n width P, with merged bins
+    shape = buf.shape
+    E = np.broadcast_to(n * widths * Weibull_P, shape).reshape(-1, nbins)
+    O = np.broadcast_to(n * widths * ws_P, shape).reshape(-1, nbins)
+    chi2, ngroups = chi_square_merged(O, E)
+
+    chi2 = chi2.reshape(shape[:-1])[()]
+    chi2_dof = (ngroups - 3).reshape(shape[:-1])[()]
+
+    return GOFScores(RMSE, Rsqrd, MAPE, chi2, KS, chi2_dof)
+#---------------------------------------------------------------------#
@@ -0,0 +1,447 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Parameter estimation methods for the Weibull function.
+#
+#  None of the estimators needs the raw wind speed array:
+#
+#  - EMJ, EML, MM, PDM and EPF only use the mean and standard deviation,
+#  - GM1, GM2 and MML only use the histogram,
+#  - ML uses the sums of x^k, x^k ln(x) and ln(x) over the wind speeds x.
+#    These sums can be taken over the raw wind speeds, or over the table of
+#    distinct wind speeds weighted by their counts (see Wind_stats.py), which
+#    gives the same result for quantized anemometer data.
+#
+#  The quantities are held in a WeibullSuffStats tuple, which can be built
+#  from the arrays of a script or from a WindSpeedStats accumulator. The
+#  estimators give the same values of k and c as the original code of the
+#  scripts.
+#
+#
+#  References
+#
+#  EMJ: Empirical method/standard deviation method (Justus et al., 1978)
+#  EML: Lysen empirical method (Lysen, 1983)
+#  GM1, GM2: Graphical method (Rohatgi & Nelson, 1994)
+#  ML: Maximum likelihood method (Stevens & Smulders, 1979)
+#  MML: Modified maximum likelihood method (Seguro & Lambert, 2000)
+#  MM: Method of moments (Bowden et al. 1983)
+#  PDM: Power density method (Akdag & Dinler, 2009)
+#  EPF: Energy pattern factor method (Akdag & Guler, 2015)
+#
+#
+
+
+import warnings
+from collections import namedtuple
+import numpy as np
+from Weibull_moments import gamma_1nk, fit_PDM_arrays, fit_EPF_arrays
+from Wind_stats import value_counts_moments, value_counts_histogram
+
+
+###  Parameter estimation methods, in the order used by the scripts  ###
+W_param_est = ["EMJ", "EML", "GM1", "GM2", "ML", "MML", "MM", "PDM", "EPF"]
+
+###  Names printed by the scripts for each method  ###
+W_method_names = { "EMJ": "Empirical method",
+                   "EML": "Lysen empirical method",
+                   "GM1": "Graphical method (using histogram's midpoints)",
+                   "GM2": "Graphical method (using histogram's upper edges)",
+                   "ML":  "Maximum likelihood method",
+                   "MML": "Modified maximum likelihood method",
+                   "MM":  "Method of moments",
+                   "PDM": "Power density method",
+                   "EPF": "Energy pattern factor method" }
+
+
+#---------------------------------------------------------------------#
+#  Sufficient statistics for the estimators.
+#
+#  mean, stddev: mean and standard deviation (as np.std) of the wind speeds
+#  hist_w8ts, hist_edges: histogram of the wind speeds (as np.histogram)
+#  ml_values, ml_weights: wind speeds used by the ML method. Either the raw
+#  wind speeds (ml_weights = None), or the distinct wind speeds with their
+#  counts. ml_values may be None if the ML method is not needed.
+#
+WeibullSuffStats = namedtuple('WeibullSuffStats', ['mean', 'stddev', 'hist_w8ts', 'hist_edges', 'ml_values', 'ml_weights'], defaults=[None, None])
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Sufficient statistics from a WindSpeedStats accumulator (Wind_stats.py).
+#  The table of distinct wind speeds is used for the ML method; if it was
+#  dropped because there were too many distinct values, the ML method is
+#  not available.
+#
+def suff_stats_from_stats(stats):
+    hist_w8ts, hist_edges = stats.histogram()
+
+    return WeibullSuffStats(stats.mean, stats.stddev, hist_w8ts, hist_edges, stats.values, stats.counts)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Sufficient statistics from a table of distinct wind speeds with their
+#  counts (see value_counts() in Wind_stats.py), for bins of size bin_size.
+#
+def suff_stats_from_counts(vc, bin_size):
+    n, mean, stddev = value_counts_moments(vc)
+    hist_w8ts, hist_edges = value_counts_histogram(vc, bin_size)
+
+    return WeibullSuffStats(mean, stddev, hist_w8ts, hist_edges, vc.values, vc.counts)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Weibull probability density at wind speeds u.
+#
+def Weibull_pdf(u, k, c):
+    return (k/c) * (u/c)**(k-1) * np.exp(-1.0 * (u/c)**k)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Weibull cumulative distribution function at wind speeds u.
+#
+def Weibull_cdf(u, k, c):
+    return -1.0 * np.expm1(-1.0 * (u/c)**k)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Weibull curves to compare with the histogram, for arrays k and c of the
+#  same shape (e.g. one value per method). Returns an array of shape
+#  k.shape + (nbins,) of probability densities, as ws_P in the scripts.
+#
+#  mode = "midpoint": density at the midpoint of each bin, as in the
+#      original scripts. This is biased for wide bins, where the density is
+#      far from linear across a bin.
+#  mode = "cdf": probability of each bin, CDF(upper edge) - CDF(lower edge),
+#      divided by the width of the bin. This is exact whatever the width of
+#      the bins.
+#
+W_comparison_modes = ["midpoint", "cdf"]
+
+def Weibull_curves(hist_edges, k, c, mode="midpoint"):
+    k = np.asarray(k, dtype=np.float64)[..., np.newaxis]
+    c = np.asarray(c, dtype=np.float64)[..., np.newaxis]
+
+    if (mode == "midpoint"):
+        return Weibull_pdf(hist_midpoints(hist_edges), k, c)
+
+    if (mode == "cdf"):
+        return np.diff(Weibull_cdf(hist_edges, k, c), axis=-1) / np.diff(hist_edges)
+
+    raise ValueError("Unknown comparison mode {:s} (expected one of {:s})".format(str(mode), ", ".join(W_comparison_modes)))
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Midpoints of the histogram bins.
+#
+def hist_midpoints(hist_edges):
+    return 0.5 * (hist_edges[:-1] + hist_edges[1:])
+#---------------------------------------------------------------------#
+
+
+
+#---------------------------------------------------------------------#
+#  Empirical method/standard deviation method (Justus et al., 1978)
+#
+def fit_EMJ(ss):
+    k = (ss.stddev / ss.mean)**-1.086
+    c = ss.mean / gamma_1nk(1.0, k)
+
+    return k, c
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Lysen empirical method (Lysen, 1983)
+#
+def fit_EML(ss):
+    k = (ss.stddev / ss.mean)**-1.086
+    c = ss.mean * ( 0.568 + 0.434/k )**(-1.0/k)
+
+    return k, c
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Graphical Method (Rohatgi & Nelson, 1994)
+#
+#  Linear regression of y = ln(-ln(1 - F)) against x = ln(u), where F is the
+#  cumulative probability of the histogram. The points where y is NaN or
+#  infinite are dropped and x is taken from the first len(y) bins, as in the
+#  scripts. GM1 uses the midpoints of the bins for u, GM2 the upper edges.
+#
+def GM_y(hist_w8ts):
+    cumul_P = (hist_w8ts / hist_w8ts.sum()).cumsum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = np.log( -1.0 * np.log(1.0 - cumul_P) )
+
+    # Eliminate NaN or Inf in y array which might arise due to log(0)
+    y = y[ np.logical_not( np.isnan(y) ) ]
+    y = y[ np.logical_not( np.isinf(y) ) ]
+
+    return y
+
+
+def GM_regression(x, y):
+    den = (x * x).sum() - (len(x) * x.mean() * x.mean())
+
+    num = (x * y).sum() - (len(x) * x.mean() * y.mean())
+    k = num / den
+    num = (y.mean() * (x * x).sum()) - (x.mean() * (x * y).sum())
+    c = np.e**(-1.0 * (num / den) / k)
+
+    return k, c
+
+
+def fit_GM1(ss):
+    y = GM_y(ss.hist_w8ts)
+    x = np.log( hist_midpoints(ss.hist_edges)[0 : len(y)] )
+
+    return GM_regression(x, y)
+
+
+def fit_GM2(ss):
+    y = GM_y(ss.hist_w8ts)
+    x = np.log( ss.hist_edges[1 : 1+len(y)] )
+
+    return GM_regression(x, y)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Maximum likelihood method (Stevens & Smulders, 1979)
+#
+#  The ML estimate of k is the root of the profile-likelihood equation
+#
+#      g(k) = A(k)/B(k) - 1/k - L/n = 0
+#
+#  with B = sum(w x^k), A = sum(w x^k ln x) and L = sum(w ln x) over the
+#  values x with weights w, where n is the total weight of the non-zero wind
+#  speeds (x > 0.1). The original code of the scripts solved it by the
+#  fixed-point iteration k = 1/(A/B - L/n), which needs dozens of passes over
+#  the data. Here, Halley steps are taken instead, using
+#
+#      g'(k)  = C/B - (A/B)^2 + 1/k^2
+#      g''(k) = D/B - 3 A C / B^2 + 2 (A/B)^3 - 2/k^3
+#
+#  with C = sum(w x^k ln^2 x) and D = sum(w x^k ln^3 x). The four sums are
+#  obtained in one pass over the data, with ln x computed once and x^k
+#  computed in place as exp(k ln x). Zero wind speeds contribute nothing to
+#  the sums (x^k = 0, and ln 0 is taken as 0) and are left out.
+#
+#  The iteration stops when the relative change in k falls below rtol, or
+#  after max_iter (at least 1) passes over the data. c = (B/n)^(1/k), with B and the
+#  residual g evaluated at the final k. If the relative change is still above
+#  rtol after max_iter passes, converged is False and a RuntimeWarning is
+#  issued.
+#
+MLResult = namedtuple('MLResult', ['k', 'c', 'iterations', 'residual', 'converged'])
+
+
+#  Residual g(k) and Halley update of k from the sums B, A, C, D and L.
+#  Works elementwise on arrays, for the batch estimators.
+def ML_Halley_step(k, B, A, C, D, L, n):
+    a = A / B
+    g = a - 1.0/k - L/n
+
+    dg = C/B - a*a + 1.0/(k*k)
+    d2g = D/B - 3.0*a*(C/B) + 2.0*a*a*a - 2.0/(k*k*k)
+
+    # Halley step, falling back on a Newton step
+    den = 2.0*dg*dg - g*d2g
+    with np.errstate(divide='ignore', invalid='ignore'):
+        new_k = np.where(den != 0.0, k - 2.0*g*dg / den, k - g / dg)
+
+    # Keep k positive
+    new_k = np.where(new_k > 0.0, new_k, 0.5 * k)
+
+    return g, new_k[()]
+
+
+#  Sums B, A, C and D at k over log_x = ln x with weights w (or None), using
+#  buffer buf for x^k and its products with powers of ln x.
+def ML_sums(log_x, w, k, buf):
+    # x^k = exp(k ln x), in place
+    np.multiply(log_x, k, out=buf)
+    np.exp(buf, out=buf)
+    if w is not None:
+        buf *= w
+
+    B = buf.sum()
+    buf *= log_x
+    A = buf.sum()
+    buf *= log_x
+    C = buf.sum()
+    buf *= log_x
+    D = buf.sum()
+
+    return B, A, C, D
+
+
+def ML_solve(x, w, n, k, rtol=1.0e-6, max_iter=50):
+    if (max_iter < 1):
+        raise ValueError("max_iter must be at least 1, got {:d}".format(max_iter))
+
+    x = np.asarray(x, dtype=np.float64)
+
+    # Only the positive values contribute to the sums
+    pos = x > 0.0
+    log_x = np.log(x[pos])
+    if w is not None:
+        w = np.asarray(w, dtype=np.float64)[pos]
+
+    # Buffer for x^k and the products with powers of ln x
+    buf = np.empty(len(log_x), dtype=np.float64)
+
+    if w is None:
+        L = log_x.sum()
+    else:
+        L = (w * log_x).sum()
+
+    converged = False
+    for i in range(1, max_iter+1):
+        B, A, C, D = ML_sums(log_x, w, k, buf)
+        g, new_k = ML_Halley_step(k, B, A, C, D, L, n)
+
+        if converged:
+            break
+
+        step = abs(new_k - k)
+        converged = step <= rtol * abs(new_k)
+        k = new_k
+    else:
+        # The last pass updated k: sums and residual at the final k
+        B, A, C, D = ML_sums(log_x, w, k, buf)
+        g, new_k = ML_Halley_step(k, B, A, C, D, L, n)
+
+    if not converged:
+        warnings.warn("Maximum likelihood equation not solved after {:d} iterations (k = {:g}, last change {:.3g}, residual {:.3g})".format(max_iter, k, step, g), RuntimeWarning)
+
+    c = ( B / n )**(1/k)
+
+    return MLResult(k, c, i, g, converged)
+
+
+#  The ML and MML estimators return k and c; ML_result() and MML_result()
+#  return the whole MLResult, with the number of iterations, the residual
+#  and whether the iteration converged.
+def ML_result(ss, rtol=1.0e-6):
+    if ss.ml_values is None:
+        raise ValueError("The maximum likelihood method needs the wind speeds or the table of distinct wind speeds")
+
+    x = np.asarray(ss.ml_values, dtype=np.float64)
+
+    # Number of non-zero wind speed data points
+    if ss.ml_weights is None:
+        n = np.count_nonzero(x > 0.1)
+    else:
+        n = np.asarray(ss.ml_weights)[x > 0.1].sum()
+
+    # Seed k using estimate from empirical method (Justus et al., 1978)
+    k = (ss.stddev / ss.mean)**-1.086
+
+    return ML_solve(x, ss.ml_weights, n, k, rtol=rtol)
+
+
+def fit_ML(ss, rtol=1.0e-6):
+    res = ML_result(ss, rtol)
+
+    return res.k, res.c
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Modified maximum likelihood method (Seguro & Lambert, 2000)
+#
+#  Same equation as the ML method, over the midpoints of the histogram bins
+#  weighted by the bin counts. n is the total count.
+#
+def MML_result(ss, rtol=1.0e-6):
+    # Seed k using estimate from empirical method (Justus et al., 1978)
+    k = (ss.stddev / ss.mean)**-1.086
+
+    return ML_solve(hist_midpoints(ss.hist_edges), ss.hist_w8ts, ss.hist_w8ts.sum(), k, rtol=rtol)
+
+
+def fit_MML(ss, rtol=1.0e-6):
+    res = MML_result(ss, rtol)
+
+    return res.k, res.c
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Method of moments (Bowden et al. 1983)
+#
+def fit_MM(ss):
+    k = ( (0.9874*ss.mean) / ss.stddev )**1.0983
+    c = ss.mean / gamma_1nk(1.0, k)
+
+    return k, c
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Power density method (Akdag & Dinler, 2009)
+#  Energy pattern factor method (Akdag & Guler, 2015)
+#
+#  See Weibull_moments.py.
+#
+def fit_PDM(ss):
+    k, c = fit_PDM_arrays(ss.mean, ss.stddev)
+
+    return float(k), float(c)
+
+
+def fit_EPF(ss):
+    k, c = fit_EPF_arrays(ss.mean, ss.stddev)
+
+    return float(k), float(c)
+#---------------------------------------------------------------------#
+
+
+###  Estimator of each method  ###
+W_fit_functions = { "EMJ": fit_EMJ,
+                    "EML": fit_EML,
+                    "GM1": fit_GM1,
+                    "GM2": fit_GM2,
+                    "ML":  fit_ML,
+                    "MML": fit_MML,
+                    "MM":  fit_MM,
+                    "PDM": fit_PDM,
+                    "EPF": fit_EPF }
+
+
+#---------------------------------------------------------------------#
+#  Estimate k and c with each method in list methods from the sufficient
+#  statistics ss. Returns a dictionary { method: (k, c) }, in the order of
+#  methods.
+#
+def fit_Weibull(ss, methods=W_param_est):
+    return { method: W_fit_functions[method](ss) for method in methods }
+#---------------------------------------------------------------------#
@@ -0,0 +1,150 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Moments of the Weibull distribution, for arrays of k.
+#
+#  The moments of the Weibull distribution involve Gamma(1 + n/k): the mean
+#  is c Gamma(1 + 1/k) and the energy pattern factor is
+#
+#      Epf = Gamma(1 + 3/k) / Gamma(1 + 1/k)^3
+#
+#  For k between 0.5 and 10 and n = 1, 2, 3, the argument 1 + n/k lies
+#  between 1 and 7. ln(Gamma(1 + s)) is tabulated once for 0 <= s <= 6 and
+#  linearly interpolated, which is accurate to about 1e-9 (relative) and
+#  works on whole arrays at once. Values outside the table are computed with
+#  scipy.special.gamma.
+#
+#  The power density (PDM) and energy pattern factor (EPF) methods are
+#  solved here for arrays of wind speed statistics, all the elements being
+#  iterated together.
+#
+#
+
+
+import numpy as np
+from scipy.special import gamma, gammaln
+
+
+###  Range of k covered by the table of Gamma(1 + n/k), n <= 3  ###
+gamma_table_k = (0.5, 10.0)
+
+###  Table of ln(Gamma(1 + s)) for 0 <= s <= 6  ###
+gamma_table_step = 1.0e-4
+gamma_table_s = np.linspace(0.0, 6.0, int(round(6.0 / gamma_table_step)) + 1)
+gamma_table_lng = gammaln(1.0 + gamma_table_s)
+
+
+#---------------------------------------------------------------------#
+#  Gamma(1 + n/k) for arrays (or scalars) of k.
+#
+def gamma_1nk(n, k):
+    s = n / np.asarray(k, dtype=np.float64)
+    g = np.exp( np.interp(s, gamma_table_s, gamma_table_lng) )
+
+    # Outside the table
+    out = (s < 0.0) | (s > gamma_table_s[-1]) | np.isnan(s)
+    if np.any(out):
+        g = np.where(out, gamma(1.0 + s), g)
+
+    return g[()]
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Energy pattern factor of the Weibull distribution with shape k.
+#
+def Epf_from_k(k):
+    return gamma_1nk(3.0, k) / ( gamma_1nk(1.0, k)**3 )
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  k as a function of the energy pattern factor, for the power density
+#  method (Akdag & Dinler, 2009) and the energy pattern factor method
+#  (Akdag & Guler, 2015).
+#
+def PDM_k(Epf):
+    return 1.0 + 3.69/(Epf*Epf)
+
+
+def EPF_k(Epf):
+    return (0.59039*Epf**4 + 2.15143*Epf**3 - 5.78961*Epf*Epf + 3.27527*Epf - 0.220374) / (0.992007*Epf**4 - 0.800468*Epf**3 - 2.60973*Epf*Epf + 3.69115*Epf - 1.27285)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Fixed-point iteration k = k_of_Epf( Epf(k) ), as done in the scripts,
+#  starting from the array k0. Each element stops as soon as its own change
+#  in k is less than tol, so the result is the same as iterating every
+#  element separately.
+#
+def solve_Epf(k0, k_of_Epf, tol=0.005, max_iter=100):
+    k = np.array(k0, dtype=np.float64, ndmin=1)
+    active = np.isfinite(k)
+
+    for i in range(max_iter):
+        if not np.any(active):
+            break
+
+        prev_k = k[active]
+        new_k = k_of_Epf( Epf_from_k(prev_k) )
+        k[active] = new_k
+
+        done = np.abs(new_k - prev_k) < tol
+        done = done | np.logical_not( np.isfinite(new_k) )
+        active[active] = np.logical_not(done)
+
+    return k.reshape(np.shape(k0))[()]
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  k and c of the PDM or EPF method for arrays of wind speed statistics.
+#
+#  If the energy pattern factor Epf = mean(u^3) / mean(u)^3 of the data is
+#  given, k is obtained directly from it. Otherwise, as in the scripts, k is
+#  iterated from the seed of the empirical method (Justus et al., 1978),
+#  computed from the mean and standard deviation.
+#
+#  Returns arrays k and c with the shape of mean.
+#
+def fit_Epf_method(k_of_Epf, mean, stddev=None, Epf=None, tol=0.005):
+    mean = np.asarray(mean, dtype=np.float64)
+
+    if Epf is not None:
+        k = k_of_Epf( np.asarray(Epf, dtype=np.float64) )
+    else:
+        k0 = (np.asarray(stddev, dtype=np.float64) / mean)**-1.086
+        k = solve_Epf(k0, k_of_Epf, tol=tol)
+
+    c = mean / gamma_1nk(1.0, k)
+
+    return k, c
+
+
+def fit_PDM_arrays(mean, stddev=None, Epf=None, tol=0.005):
+    return fit_Epf_method(PDM_k, mean, stddev, Epf, tol)
+
+
+def fit_EPF_arrays(mean, stddev=None, Epf=None, tol=0.005):
+    return fit_Epf_method(EPF_k, mean, stddev, Epf, tol)
+#---------------------------------------------------------------------#
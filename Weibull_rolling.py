@@ -0,0 +1,175 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Weibull parameters over a rolling time window.
+#
+#  The time axis is cut into blocks of length step (e.g. 1 day) and the
+#  window (e.g. 30 days) is a whole number w of blocks. For each block, the
+#  count, sum and sum of squares of the wind speeds, the histogram counts
+#  and, optionally, the counts of the distinct wind speeds are accumulated
+#  once. Running (prefix) sums of these block statistics are then taken, so
+#  that moving the window by one step adds the entering block and subtracts
+#  the leaving one:
+#
+#      S_window(j) = S(j + w) - S(j)
+#
+#  which is O(1) work per window and per statistic, whatever the length of
+#  the window. The statistics of all the windows are fitted together with
+#  Weibull_batch.py.
+#
+#  The sums of the wind speeds are taken about the overall mean of the data
+#  to limit the round-off error in the variance. The histogram and distinct
+#  value counts are integers and are exact.
+#
+#
+
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from Wind_store import to_epoch_seconds
+from Wind_resample import interval_seconds
+from Weibull_batch import WeibullBatchStats, fit_Weibull_batch
+
+
+###  Methods which only need the moments and the histogram  ###
+rolling_methods = ["EMJ", "EML", "GM1", "GM2", "MML", "MM", "PDM", "EPF"]
+
+
+#---------------------------------------------------------------------#
+#  Statistics of the rolling windows of length window, moved by step, over
+#  the wind speeds ws measured at times timestamps (datetime64). window must
+#  be a whole number of steps. The blocks are aligned on multiples of step
+#  since 1970-01-01 (i.e. on midnight UTC for a step of 1 day).
+#
+#  The histogram of each window has the fixed-width bins of size bin_size
+#  over [0, ceil_ws]; ceil_ws defaults to the ceiling of the largest wind
+#  speed. If distinct is True, the counts of the distinct wind speeds are
+#  also kept, for the ML method.
+#
+#  Returns the end time of each window (datetime64[s]) and the
+#  WeibullBatchStats of the windows.
+#
+def rolling_stats(timestamps, ws, window, step, bin_size, ceil_ws=None, distinct=False):
+    step_s = interval_seconds(step)
+    window_s = interval_seconds(window)
+    if (window_s % step_s != 0):
+        raise ValueError("The window ({:s}) must be a whole number of steps ({:s})".format(str(window), str(step)))
+    w = window_s // step_s
+
+    t = to_epoch_seconds(timestamps)
+    ws = np.asarray(ws, dtype=np.float64)
+
+    keep = np.logical_not( np.isnan(ws) )
+    t = t[keep]
+    ws = ws[keep]
+    if (len(ws) == 0):
+        raise ValueError("No wind speed data")
+
+    ##  Block of each sample
+    t0 = (t.min() // step_s) * step_s
+    block = (t - t0) // step_s
+    nblocks = max(int(block.max()) + 1, w)
+    nwin = nblocks - w + 1
+
+    ##  Statistics of each block, and their running sums
+    def running(block_stat):
+        S = np.zeros((nblocks + 1,) + block_stat.shape[1:], dtype=block_stat.dtype)
+        np.cumsum(block_stat, axis=0, out=S[1:])
+        return S[w:] - S[:-w]
+
+    shift = ws.mean()
+    dev = ws - shift
+
+    count = running( np.bincount(block, minlength=nblocks) )
+    S1 = running( np.bincount(block, weights=dev, minlength=nblocks) )
+    S2 = running( np.bincount(block, weights=dev*dev, minlength=nblocks) )
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = shift + S1 / count
+        stddev = np.sqrt( np.maximum(S2 / count - (S1 / count)**2, 0.0) )
+
+    ##  Histogram counts
+    if ceil_ws is None:
+        ceil_ws = np.ceil(ws.max())
+
+    nbins = int(ceil_ws / bin_size)
+    hist_edges = np.linspace(0.0, ceil_ws, nbins + 1)
+
+    # Number of bins of each window's own histogram, from the maximum wind
+    # speed in the window
+    block_max = np.full(nblocks, -np.inf)
+    np.maximum.at(block_max, block, ws)
+    win_max = sliding_window_view(block_max, w).max(axis=1)
+    hist_nbins = np.zeros(nwin, dtype=np.int64)
+    nonempty = count > 0
+    hist_nbins[nonempty] = ( np.ceil(win_max[nonempty]) / bin_size ).astype(np.int64)
+
+    idx = np.searchsorted(hist_edges, ws, side='right') - 1
+    inside = (idx >= 0) & (idx < nbins)
+
+    hist_w8ts = running( np.bincount(block[inside] * nbins + idx[inside], minlength=nblocks*nbins).reshape(nblocks, nbins) )
+
+    # np.histogram closes the last bin of each window's own histogram: the
+    # wind speeds equal to the ceiling of the window's maximum (i.e. to the
+    # maximum itself) are moved from the next bin into the last one
+    r = np.flatnonzero( (hist_nbins > 0) & (hist_nbins < nbins) )
+    hist_w8ts[r, hist_nbins[r] - 1] += hist_w8ts[r, hist_nbins[r]]
+    hist_w8ts[r, hist_nbins[r]] = 0
+
+    ##  Distinct wind speeds
+    ml_values = None
+    ml_weights = None
+    if distinct:
+        ml_values, inverse = np.unique(ws, return_inverse=True)
+        nval = len(ml_values)
+        ml_weights = running( np.bincount(block * nval + inverse.ravel(), minlength=nblocks*nval).reshape(nblocks, nval) )
+
+    t_end = ( t0 + (np.arange(nwin) + w) * step_s ).astype('datetime64[s]')
+
+    return t_end, WeibullBatchStats(count, mean, stddev, hist_w8ts, hist_edges, hist_nbins, ml_values, ml_weights)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Series of the Weibull parameters over rolling windows (see
+#  rolling_stats()). Windows with fewer than min_count wind speeds are left
+#  as NaN.
+#
+#  Returns a data frame indexed by the end time of each window, with the
+#  number of wind speeds in the window ('count') and columns <method>_k and
+#  <method>_c for each method in methods. The ML method may be included in
+#  methods; the counts of the distinct wind speeds are then kept as well.
+#
+def rolling_Weibull(timestamps, ws, window, step, bin_size, methods=rolling_methods, min_count=1, ceil_ws=None):
+    t_end, bs = rolling_stats(timestamps, ws, window, step, bin_size, ceil_ws=ceil_ws, distinct=("ML" in methods))
+    params = fit_Weibull_batch(bs, methods)
+
+    valid = bs.count >= min_count
+    columns = { 'count': bs.count }
+    for method in methods:
+        k, c = params[method]
+        columns[method + "_k"] = np.where(valid, k, np.nan)
+        columns[method + "_c"] = np.where(valid, c, np.nan)
+
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(t_end, name='window_end'))
+#---------------------------------------------------------------------#
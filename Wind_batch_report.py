@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Weibull parameters and goodness of fit for all the stations in one run.
+#
+#  For each station of the registry Stations.json (IOS-net, Weather
+#  Underground, Meteostat and UoM Farm), the data is loaded, the gaps are
+#  masked out, and the histogram, the nine parameter estimation methods and
+#  the statistical comparison are computed as in the
+#  ..._calc_Weibull_diff.py scripts. The stations are processed
+#  in parallel by a pool of worker processes, one station per worker, and
+#  the results are written to a single table (one row per station and
+#  method). If StorePath is set, the stations which have a store (see
+#  Wind_update_stores.py) are read from the memory maps of the store
+#  instead of their data files; if store_chunk_rows is also set, the
+#  histogram and moments are accumulated from the store one chunk at a
+#  time (see Wind_stats.py), for stores larger than the memory.
+#
+#  Usage:
+#      ./Wind_batch_report.py                  all the stations
+#      ./Wind_batch_report.py Name1 Name2 ...  only the stations named
+#
+#
+
+
+from sys import argv
+from os import path, cpu_count
+import numpy as np
+import pandas as pd
+from Wind_registry import select_stations, load_station, map_stations, station_mask
+from Wind_store import open_station_store
+from Wind_stats import value_counts, stream_array_stats
+from Weibull_methods import W_param_est, suff_stats_from_counts, suff_stats_from_stats, fit_Weibull, Weibull_curves
+from Weibull_gof import gof_scores
+
+
+###  Weibull curves compared with the histogram: density at the bin  ###
+###  midpoints ("midpoint") or bin probabilities from the CDF ("cdf")  ###
+W_comparison = "midpoint"
+
+###  File where the table of results is written  ###
+ReportPath = "./Weibull_report.csv"
+
+###  Number of worker processes, one station per worker  ###
+nproc = cpu_count()
+
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
+
+###  Directory of the station stores (see Wind_update_stores.py). If set,  ###
+###  a station with a store is read from its memory maps instead of its    ###
+###  data files. None to always load the data files.                       ###
+StorePath = None
+
+###  Number of rows of a store accumulated at a time (see Wind_stats.py),  ###
+###  for stores larger than the memory. None to load the whole store.      ###
+store_chunk_rows = None
+
+
+
+
+
+#---------------------------------------------------------------------#
+#  Load, mask, fit and compare for one station (a StationConfig of the
+#  registry). Returns a data frame with one row per estimation method.
+#
+def station_report(station):
+    bin_size = station.bin_size
+
+    store_dir = StorePath + "/" + station.station if (StorePath is not None) else None
+    has_store = (store_dir is not None) and path.isfile(store_dir + "/meta.json")
+
+    if has_store and (store_chunk_rows is not None):
+        ##  Mask of the gaps, and histogram and moments accumulated from
+        ##  the memory maps of the store one chunk at a time
+        st = open_station_store(store_dir)
+        timestamps = st.time.view('datetime64[s]')
+        keep = station_mask(timestamps, st.ws, station)
+        W_stats = suff_stats_from_stats( stream_array_stats(st.ws, bin_size, keep, store_chunk_rows) )
+
+        kept = np.flatnonzero(keep)
+        count = len(kept)
+        start = pd.Timestamp(timestamps[kept[0]])
+        end = pd.Timestamp(timestamps[kept[-1]])
+    else:
+        ##  Load the data, masking out the gaps
+        wind_df = load_station(station, cache_dir=cache_dir, store_dir=store_dir)
+
+        ##  Histogram and moments
+        ws_vc = value_counts( wind_df[station.ws_col].to_numpy() )
+        W_stats = suff_stats_from_counts(ws_vc, bin_size)
+
+        count = ws_vc.counts.sum()
+        start = wind_df[station.ts_col].min()
+        end = wind_df[station.ts_col].max()
+
+    ##  Parameter estimation. A store with too many distinct wind speeds
+    ##  for their table to be kept (see Wind_stats.py) gives no ML
+    ##  estimate: its row is left empty
+    methods = W_param_est
+    if (W_stats.ml_values is None) and ("ML" in methods):
+        print("Warning: too many distinct wind speeds in the store of {:s} for the ML method, which is skipped".format(station.station))
+        methods = [ method for method in W_param_est if (method != "ML") ]
+
+    W_params = fit_Weibull(W_stats, methods)
+    fitted = np.array([ method in W_params for method in W_param_est ])
+
+    W_k = np.array([ W_params[method][0] if method in W_params else np.nan for method in W_param_est ])
+    W_c = np.array([ W_params[method][1] if method in W_params else np.nan for method in W_param_est ])
+    Weibull_P = Weibull_curves(W_stats.hist_edges, W_k[fitted], W_c[fitted], W_comparison)
+
+    ##  Statistical comparison, NaN for the methods skipped
+    ws_P = (W_stats.hist_w8ts / W_stats.hist_w8ts.sum()) / np.diff(W_stats.hist_edges)
+    W_gof = gof_scores(Weibull_P, ws_P, W_stats.hist_edges, W_stats.hist_w8ts.sum())
+    if not np.all(fitted):
+        scores = []
+        for score in W_gof:
+            full = np.full(len(fitted), np.nan)
+            full[fitted] = score
+            scores.append(full)
+        W_gof = W_gof._make(scores)
+
+    nmethods = len(W_param_est)
+    return pd.DataFrame({ 'station': [station.station] * nmethods,
+                          'source': [station.source] * nmethods,
+                          'location': [station.location] * nmethods,
+                          'start': [ start ] * nmethods,
+                          'end': [ end ] * nmethods,
+                          'count': [ count ] * nmethods,
+                          'mean': [ W_stats.mean ] * nmethods,
+                          'stddev': [ W_stats.stddev ] * nmethods,
+                          'bin_size': [ bin_size ] * nmethods,
+                          'method': W_param_est,
+                          'k': W_k,
+                          'c': W_c,
+                          'RMSE': W_gof.RMSE,
+                          'Rsqrd': W_gof.Rsqrd,
+                          'MAPE': W_gof.MAPE,
+                          'chi2': W_gof.chi2,
+                          'chi2_dof': W_gof.chi2_dof,
+                          'KS': W_gof.KS })
+#---------------------------------------------------------------------#
+
+
+
+###  BEGIN Select stations  ###
+
+available = select_stations(argv)
+
+###  END Select stations  ###
+
+
+
+###  BEGIN Process stations  ###
+
+print("\nProcessing {:d} stations with {:d} worker processes ...".format(len(available), min(nproc, len(available))))
+results = map_stations(station_report, available, nproc)
+
+frames = []
+for i in range(len(available)):
+    report_df, log = results[i]
+    if report_df is None:
+        print("\n{:s} failed:".format(available[i].station))
+        print(log)
+        continue
+
+    print("{:s}: {:d} wind speeds".format(available[i].station, report_df['count'].iloc[0]))
+    for line in log.splitlines():
+        if line.startswith("Warning"):
+            print(line)
+    frames.append(report_df)
+
+###  END Process stations  ###
+
+
+
+###  BEGIN Write report  ###
+
+if (len(frames) == 0):
+    print("No results!")
+    exit(1)
+
+report_df = pd.concat(frames, axis=0, ignore_index=True)
+
+# The scores of the methods fitted must be finite: e.g. a chi-square blown
+# up by bins with a tiny expected count would not rank the methods
+scores = ['RMSE', 'Rsqrd', 'MAPE', 'chi2', 'KS']
+bad = np.logical_not( np.isfinite(report_df[scores].to_numpy()).all(axis=1) ) & np.isfinite(report_df['k'].to_numpy())
+if np.any(bad):
+    print("\nWarning: scores which are not finite for")
+    print(report_df.loc[bad, ['station', 'method']].to_string(index=False))
+report_df.to_csv(ReportPath, index=False, float_format="%.6g")
+
+print()
+print(report_df[['station', 'method', 'k', 'c', 'RMSE', 'Rsqrd', 'MAPE', 'chi2', 'chi2_dof', 'KS']].to_string(index=False, float_format="{:.4f}".format))
+print("\nWrote {:s}".format(ReportPath))
+
+###  END Write report  ###
+
+
+print()
+exit(0)
@@ -0,0 +1,128 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Binary cache for the parsed data files.
+#
+#  Each parsed data file (time stamp, wind direction and wind speed columns)
+#  is saved as a NumPy .npz archive, one array per column. The cache entry is
+#  keyed on the absolute path of the data file, its size, its modification
+#  time and the reader with its arguments (i.e. the selected columns). On the
+#  next run, the columns are loaded back from the archive without going
+#  through the text parser. If the data file is modified, the key changes and
+#  the file is parsed again.
+#
+#  NumPy archives are used rather than Parquet/Feather so that no dependency
+#  other than NumPy and pandas is needed.
+#
+#
+
+
+from os import path, makedirs, remove, replace, stat
+from glob import glob
+import hashlib
+import numpy as np
+import pandas as pd
+
+
+#---------------------------------------------------------------------#
+#  Name of the cache file for data file filename, read with
+#  reader(filename, *reader_args). The first part of the name identifies the
+#  data file, the last part identifies its current state.
+#
+def cache_filename(cache_dir, filename, reader, reader_args):
+    abs_name = path.abspath(filename)
+    st = stat(abs_name)
+
+    file_id = hashlib.sha1( abs_name.encode() ).hexdigest()[:12]
+    key = repr( (abs_name, st.st_size, st.st_mtime_ns, reader.__name__, tuple(reader_args)) )
+    key = hashlib.sha1( key.encode() ).hexdigest()[:16]
+
+    return cache_dir + "/" + file_id + "_" + path.basename(filename) + "_" + key + ".npz"
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Load the data frame for filename from the cache.
+#  Returns None if there is no valid cache entry.
+#
+def load_cached(cache_dir, filename, reader, reader_args):
+    cache_file = cache_filename(cache_dir, filename, reader, reader_args)
+    if not path.isfile(cache_file):
+        return None
+
+    try:
+        with np.load(cache_file, allow_pickle=False) as archive:
+            columns = [ str(col) for col in archive['__columns__'] ]
+            index = archive['__index__']
+
+            # Rows kept after dropping NaN values are often contiguous
+            if (len(index) > 0) and (index[-1] - index[0] == len(index) - 1):
+                index = pd.RangeIndex(index[0], index[-1] + 1)
+
+            tmp_df = pd.DataFrame({ col: archive['col_' + str(i)] for i, col in enumerate(columns) },
+                                  index=index)
+
+    except (OSError, KeyError, ValueError):
+        # Corrupted or incomplete archive: parse the file again
+        return None
+
+    return tmp_df
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Save data frame tmp_df, parsed from filename, in the cache. Older entries
+#  for the same data file are removed.
+#
+def save_cached(cache_dir, filename, reader, reader_args, tmp_df):
+    makedirs(cache_dir, exist_ok=True)
+    cache_file = cache_filename(cache_dir, filename, reader, reader_args)
+
+    for old_file in glob( cache_file[:cache_file.rfind("_")] + "_*.npz" ):
+        remove(old_file)
+
+    arrays = { 'col_' + str(i): tmp_df[col].to_numpy() for i, col in enumerate(tmp_df.columns) }
+    arrays['__columns__'] = np.array(tmp_df.columns, dtype=str)
+    arrays['__index__'] = tmp_df.index.to_numpy()
+
+    # Write to a temporary file first so that an interrupted run never
+    # leaves a truncated archive behind
+    with open(cache_file + ".tmp", 'wb') as f:
+        np.savez(f, **arrays)
+
+    replace(cache_file + ".tmp", cache_file)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Parse filename with reader(filename, *reader_args) and store the result
+#  in the cache. This is the function run by the worker processes when the
+#  files are parsed in parallel.
+#
+def read_and_cache(filename, reader, reader_args, cache_dir):
+    tmp_df = reader(filename, *reader_args)
+
+    if cache_dir is not None:
+        save_cached(cache_dir, filename, reader, reader_args, tmp_df)
+
+    return tmp_df
+#---------------------------------------------------------------------#
@@ -0,0 +1,239 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Wind power density, capacity factor and annual energy production.
+#
+#  The mean power density of the wind (W/m^2) is 1/2 rho <u^3>, which for a
+#  Weibull distribution is
+#
+#      1/2 rho c^3 Gamma(1 + 3/k)
+#
+#  The mean electrical power of a turbine is the integral of its power curve
+#  P(u) against the distribution of the wind speeds. The power curves of all
+#  the turbines are interpolated once on a shared grid of wind speeds (0.05
+#  m/s steps), and their running integral is kept, so that the mean power of
+#  a turbine over any interval of wind speeds is a difference of two values
+#  of the running integral. The distribution (Weibull or histogram) is turned
+#  into the probabilities of the same intervals, and the mean power of every
+#  turbine is then a single matrix product:
+#
+#      mean power[..., turbine] = sum over bins of P[..., bin] Pbin[turbine, bin]
+#
+#  k and c may be arrays of any shape (e.g. methods x stations), and the
+#  results have one more axis, over the turbines. The capacity factor is the
+#  mean power divided by the rated power, and the annual energy production
+#  (AEP) is the mean power times the number of hours in a year.
+#
+#  The wind speeds must be in m/s at the hub height of the turbines. Wind
+#  speeds measured at another height z_ref can be extrapolated to the hub
+#  height z_hub with the power law of the wind shear,
+#
+#      u(z_hub) = u(z_ref) (z_hub / z_ref)^alpha
+#
+#  which scales c and the edges of the histogram by the same factor and
+#  leaves k unchanged (alpha = 1/7 over open land).
+#
+#
+
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from Weibull_methods import Weibull_cdf
+from Weibull_moments import gamma_1nk
+
+
+###  Default density of the air (kg/m^3, sea level at 15 degrees C)  ###
+air_density = 1.225
+
+###  Default exponent of the power law of the wind shear  ###
+shear_exponent = 1.0/7.0
+
+###  Number of hours in a year  ###
+hours_per_year = 8766.0
+
+###  Default path of the table of power curves  ###
+power_curves_path = "./Power_curves.csv"
+
+###  Step of the grid of wind speeds of the power curves (m/s)  ###
+power_grid_step = 0.05
+
+###  Power curves of a set of turbines  ###
+#  names: names of the turbines, shape (nturb,)
+#  rated_power: rated power of each turbine (kW), shape (nturb,)
+#  grid_step: step of the grid of wind speeds (m/s)
+#  cum_power: running integral of the power curves from 0 m/s at the
+#      nodes of the grid, in kW m/s, shape (nturb, ngrid+1)
+#
+PowerCurves = namedtuple('PowerCurves', ['names', 'rated_power', 'grid_step', 'cum_power'])
+
+###  Energy production of turbines  ###
+#  mean_power (kW), capacity_factor and AEP (kWh per year), each of shape
+#  (..., nturb)
+#
+EnergyYield = namedtuple('EnergyYield', ['mean_power', 'capacity_factor', 'AEP'])
+
+
+#---------------------------------------------------------------------#
+#  Factor scaling the wind speeds measured at height z_ref to the hub height
+#  z_hub (same unit), with the power law of the wind shear of exponent alpha.
+#
+def shear_factor(z_hub, z_ref, alpha=shear_exponent):
+    if (z_hub <= 0.0) or (z_ref <= 0.0):
+        raise ValueError("Heights must be positive, got z_hub = {:g} and z_ref = {:g}".format(z_hub, z_ref))
+
+    return (z_hub / z_ref)**alpha
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Power curves of the turbines named names, where ws_tables[i] and
+#  power_tables[i] are the points (wind speed in m/s, power in kW) of the
+#  curve of turbine i, in increasing order of wind speed. Between the points
+#  the power is interpolated linearly; it is zero below the first point and
+#  above the last one.
+#
+def tabulate_power_curves(names, ws_tables, power_tables, grid_step=power_grid_step):
+    top = max([ np.max(ws) for ws in ws_tables ])
+    ngrid = int(np.ceil(top / grid_step)) + 1
+    u = grid_step * np.arange(ngrid + 1)
+
+    power = np.zeros((len(names), ngrid + 1))
+    for i in range(len(names)):
+        ws = np.asarray(ws_tables[i], dtype=np.float64)
+        if np.any(np.diff(ws) < 0.0):
+            raise ValueError("The power curve of {:s} is not in increasing order of wind speed".format(names[i]))
+
+        power[i] = np.interp(u, ws, np.asarray(power_tables[i], dtype=np.float64), left=0.0, right=0.0)
+
+    # Trapezoidal running integral, starting at 0 at 0 m/s
+    cum_power = np.zeros_like(power)
+    cum_power[:, 1:] = np.cumsum(0.5 * grid_step * (power[:, 1:] + power[:, :-1]), axis=1)
+
+    rated_power = np.array([ np.max(p) for p in power_tables ], dtype=np.float64)
+
+    return PowerCurves(np.array(names), rated_power, grid_step, cum_power)
+
+
+#  Power curves of the table filename (CSV with columns turbine, ws and
+#  power, one row per point of a curve, lines starting with # ignored), in
+#  the order of the table.
+#
+def read_power_curves(filename=power_curves_path, grid_step=power_grid_step):
+    table = pd.read_csv(filename, comment='#')
+    groups = table.groupby('turbine', sort=False)
+
+    names = list(groups.groups)
+    ws_tables = [ groups.get_group(name)['ws'].to_numpy() for name in names ]
+    power_tables = [ groups.get_group(name)['power'].to_numpy() for name in names ]
+
+    return tabulate_power_curves(names, ws_tables, power_tables, grid_step)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Mean power of every turbine over each interval between consecutive
+#  wind speeds of the sorted array edges (kW). Returns an array of shape
+#  (nturb, len(edges)-1).
+#
+#  The running integrals are interpolated linearly at the edges for all the
+#  turbines at once; beyond the grid they stay at their last value, since
+#  the power is zero there.
+#
+def interval_mean_power(curves, edges):
+    edges = np.asarray(edges, dtype=np.float64)
+    ngrid = curves.cum_power.shape[1] - 1
+
+    x = np.clip(edges / curves.grid_step, 0.0, ngrid)
+    i = np.minimum(np.floor(x).astype(np.int64), ngrid - 1)
+    frac = x - i
+    cum = (1.0 - frac) * curves.cum_power[:, i] + frac * curves.cum_power[:, i + 1]
+
+    return np.diff(cum, axis=1) / np.diff(edges)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Capacity factor and AEP of the mean powers mean_power (..., nturb) of
+#  turbines with power curves curves.
+#
+def energy_yield(mean_power, curves):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capacity_factor = mean_power / curves.rated_power
+
+    return EnergyYield(mean_power, capacity_factor, hours_per_year * mean_power)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Mean power density (W/m^2) of Weibull distributions with parameters k and
+#  c (arrays of the same shape, c in m/s).
+#
+def power_density_Weibull(k, c, rho=air_density):
+    k = np.asarray(k, dtype=np.float64)
+    c = np.asarray(c, dtype=np.float64)
+
+    return 0.5 * rho * c**3 * gamma_1nk(3.0, k)
+
+
+#  Mean power density (W/m^2) of histograms hist_w8ts (..., nbins) with
+#  edges hist_edges (m/s), the wind speeds being spread uniformly in each
+#  bin: the mean of u^3 over a bin [a, b] is (b^4 - a^4) / (4 (b - a)).
+#
+def power_density_hist(hist_w8ts, hist_edges, rho=air_density):
+    hist_w8ts = np.asarray(hist_w8ts, dtype=np.float64)
+    u3 = np.diff(hist_edges**4) / (4.0 * np.diff(hist_edges))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 0.5 * rho * (hist_w8ts @ u3) / hist_w8ts.sum(axis=-1)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Mean power, capacity factor and AEP of every turbine for Weibull
+#  distributions with parameters k and c (arrays of the same shape, c in
+#  m/s). The probabilities of the cells of the grid of the power curves
+#  are computed for all the distributions at once; the probability above
+#  the grid produces no power. Returns an EnergyYield of arrays of shape
+#  k.shape + (nturb,).
+#
+def energy_Weibull(k, c, curves):
+    k = np.asarray(k, dtype=np.float64)[..., np.newaxis]
+    c = np.asarray(c, dtype=np.float64)[..., np.newaxis]
+
+    edges = curves.grid_step * np.arange(curves.cum_power.shape[1])
+    P = np.diff(Weibull_cdf(edges, k, c), axis=-1)
+
+    return energy_yield(P @ interval_mean_power(curves, edges).T, curves)
+
+
+#  Mean power, capacity factor and AEP of every turbine for histograms
+#  hist_w8ts (..., nbins) sharing the edges hist_edges (m/s). Returns an
+#  EnergyYield of arrays of shape hist_w8ts.shape[:-1] + (nturb,).
+#
+def energy_hist(hist_w8ts, hist_edges, curves):
+    hist_w8ts = np.asarray(hist_w8ts, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        P = hist_w8ts / hist_w8ts.sum(axis=-1, keepdims=True)
+
+    return energy_yield(P @ interval_mean_power(curves, hist_edges).T, curves)
+#---------------------------------------------------------------------#
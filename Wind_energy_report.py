@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Wind power density, capacity factor and annual energy production of
+#  candidate turbines at all the stations.
+#
+#  For each station of the registry Stations.json, the data is loaded, the
+#  gaps are masked out and k and c are estimated with the nine methods, as
+#  in Wind_batch_report.py (one station per worker process). The power
+#  density and the mean power, capacity factor and AEP of every turbine of
+#  the table Power_curves.csv are then computed for all the methods,
+#  stations and turbines together (see Wind_energy.py), and also from the
+#  histogram of each station. The results are written to a single table,
+#  with one row per station, method and turbine.
+#
+#  The wind speeds are those measured at the height of the anemometers,
+#  unless hub_height is set: c and the edges of the histograms are then
+#  scaled to the hub height with the power law of the wind shear (see
+#  Wind_energy.py). The height the results refer to is printed with them.
+#
+#  Usage:
+#      ./Wind_energy_report.py                  all the stations
+#      ./Wind_energy_report.py Name1 Name2 ...  only the stations named
+#
+#
+
+
+from sys import argv
+from os import cpu_count
+import numpy as np
+import pandas as pd
+from Wind_registry import select_stations, load_station, map_stations
+from Wind_stats import value_counts
+from Weibull_methods import W_param_est, suff_stats_from_counts, fit_Weibull
+from Wind_energy import air_density, shear_exponent, power_curves_path, shear_factor, read_power_curves, power_density_Weibull, power_density_hist, energy_Weibull, energy_hist
+
+
+###  Density of the air (kg/m^3)  ###
+rho = air_density
+
+###  Factor converting the wind speeds of each data source to m/s  ###
+ws_to_ms = { 'Meteostat': 1.0/3.6,
+             'WU': 0.44704 }
+
+###  Hub height of the turbines (m), None to keep the wind speeds at the  ###
+###  height of the anemometers  ###
+hub_height = None
+
+###  Height of the anemometers (m) of the stations, default_height if  ###
+###  not listed, and exponent of the power law of the wind shear  ###
+anemometer_height = {}
+default_height = 10.0
+shear_alpha = shear_exponent
+
+###  Method whose capacity factors are printed, with those of the histogram  ###
+summary_method = "ML"
+
+###  File where the table of results is written  ###
+ReportPath = "./Energy_report.csv"
+
+###  Number of worker processes, one station per worker  ###
+nproc = cpu_count()
+
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
+
+
+
+
+
+#---------------------------------------------------------------------#
+#  Load, mask and fit for one station (a StationConfig of the registry).
+#  Returns the number of wind speeds, the arrays of k and c in the order of
+#  W_param_est, and the histogram with its edges, in m/s.
+#
+def station_fit(station):
+    ##  Load the data, masking out the gaps
+    wind_df = load_station(station, cache_dir=cache_dir)
+
+    ##  Histogram, moments and parameter estimation
+    ws_vc = value_counts( wind_df[station.ws_col].to_numpy() )
+    W_stats = suff_stats_from_counts(ws_vc, station.bin_size)
+    W_params = fit_Weibull(W_stats, W_param_est)
+
+    scale = ws_to_ms.get(station.source, 1.0)
+    if hub_height is not None:
+        scale *= shear_factor(hub_height, anemometer_height.get(station.station, default_height), shear_alpha)
+    W_k = np.array([ W_params[method][0] for method in W_param_est ])
+    W_c = scale * np.array([ W_params[method][1] for method in W_param_est ])
+
+    return ws_vc.counts.sum(), W_k, W_c, W_stats.hist_w8ts, scale * W_stats.hist_edges
+#---------------------------------------------------------------------#
+
+
+
+
+###  BEGIN Select stations  ###
+
+available = select_stations(argv)
+
+curves = read_power_curves(power_curves_path)
+print("\n{:d} turbines in {:s}: {:s}".format(len(curves.names), power_curves_path, ", ".join(curves.names)))
+
+###  END Select stations  ###
+
+
+
+###  BEGIN Fit stations  ###
+
+print("\nProcessing {:d} stations with {:d} worker processes ...".format(len(available), min(nproc, len(available))))
+results = map_stations(station_fit, available, nproc)
+
+stations = []
+fits = []
+for i in range(len(available)):
+    fit, log = results[i]
+    if fit is None:
+        print("\n{:s} failed:".format(available[i].station))
+        print(log)
+        continue
+
+    print("{:s}: {:d} wind speeds".format(available[i].station, fit[0]))
+    stations.append(available[i])
+    fits.append(fit)
+
+if (len(fits) == 0):
+    print("No results!")
+    exit(1)
+
+###  END Fit stations  ###
+
+
+
+###  BEGIN Energy  ###
+
+nstations = len(stations)
+nmethods = len(W_param_est)
+nturb = len(curves.names)
+
+##  Weibull distributions: arrays of shape (nmethods, nstations), and
+##  (nmethods, nstations, nturb) for the turbines
+W_k = np.stack([ fit[1] for fit in fits ], axis=1)
+W_c = np.stack([ fit[2] for fit in fits ], axis=1)
+
+W_density = power_density_Weibull(W_k, W_c, rho)
+W_energy = energy_Weibull(W_k, W_c, curves)
+
+##  Histograms: one set of edges per station
+H_density = np.array([ power_density_hist(fit[3], fit[4], rho) for fit in fits ])
+H_energy = [ energy_hist(fit[3], fit[4], curves) for fit in fits ]
+
+###  END Energy  ###
+
+
+
+###  BEGIN Write report  ###
+
+# Rows in the order station, method (the histogram last), turbine
+methods = W_param_est + ["hist"]
+shape = (nstations, nmethods + 1, nturb)
+
+k = np.concatenate(( W_k.T, np.full((nstations, 1), np.nan) ), axis=1)
+c = np.concatenate(( W_c.T, np.full((nstations, 1), np.nan) ), axis=1)
+density = np.concatenate(( W_density.T, H_density[:, np.newaxis] ), axis=1)
+
+def report_column(W_values, H_values):
+    return np.concatenate(( W_values.transpose(1, 0, 2), np.array(H_values)[:, np.newaxis, :] ), axis=1).ravel()
+
+report_df = pd.DataFrame({ 'station': np.broadcast_to(np.array([ station.station for station in stations ])[:, np.newaxis, np.newaxis], shape).ravel(),
+                           'method': np.broadcast_to(np.array(methods)[np.newaxis, :, np.newaxis], shape).ravel(),
+                           'k': np.broadcast_to(k[:, :, np.newaxis], shape).ravel(),
+                           'c': np.broadcast_to(c[:, :, np.newaxis], shape).ravel(),
+                           'power_density': np.broadcast_to(density[:, :, np.newaxis], shape).ravel(),
+                           'turbine': np.broadcast_to(curves.names[np.newaxis, np.newaxis, :], shape).ravel(),
+                           'mean_power': report_column(W_energy.mean_power, [ e.mean_power for e in H_energy ]),
+                           'capacity_factor': report_column(W_energy.capacity_factor, [ e.capacity_factor for e in H_energy ]),
+                           'AEP': report_column(W_energy.AEP, [ e.AEP for e in H_energy ]) })
+report_df.to_csv(ReportPath, index=False, float_format="%.6g")
+
+if hub_height is None:
+    print("\nWind speeds at the height of the anemometers, not at the hub height of the turbines")
+else:
+    print("\nWind speeds extrapolated to a hub height of {:g} m (wind shear exponent {:.3f})".format(hub_height, shear_alpha))
+
+print("\nPower density (W/m^2):")
+print(pd.DataFrame(density, index=[ station.station for station in stations ], columns=methods).to_string(float_format="{:.2f}".format))
+
+for method in [summary_method, "hist"]:
+    print("\nCapacity factor ({:s}):".format(method))
+    summary_df = report_df.loc[ report_df['method'] == method ].pivot(index='station', columns='turbine', values='capacity_factor')
+    print(summary_df.loc[ [ station.station for station in stations ], curves.names ].to_string(float_format="{:.4f}".format))
+
+print("\nWrote {:s}".format(ReportPath))
+
+###  END Write report  ###
+
+
+print()
+exit(0)
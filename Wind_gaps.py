@@ -0,0 +1,186 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Automatic detection of the gaps in a wind speed series.
+#
+#  The series (sorted by time) is scanned once, with vectorized differences,
+#  for three kinds of faults:
+#
+#  - outages: consecutive time stamps further apart than max_gap (the
+#    logger was down, files are missing, ...),
+#  - missing values: runs of NaN wind speeds,
+#  - flat lines: runs of identical wind speeds lasting at least flat_run
+#    (stuck anemometer, logger repeating its last value). Runs of calms,
+#    at or below calm_ws (0.1 m/s, the calm threshold of the maximum
+#    likelihood method), are genuine data and are not counted. A run is
+#    broken by an outage, so that equal readings on either side of a long
+#    outage are not taken for a flat line.
+#
+#  The result is an interval index of the valid periods, i.e. the runs of
+#  good samples not broken by an outage. A valid period starts and ends on
+#  a sample, and both ends are included. The periods are turned into a mask
+#  of the samples (valid_mask()), which station_mask() in Wind_registry.py
+#  applies before the histogram or the resampling. All the steps are linear
+#  in the length of the series.
+#
+#
+
+
+import numpy as np
+import pandas as pd
+
+
+###  Default thresholds  ###
+default_max_gap = "10min"
+default_flat_run = "6h"
+default_calm_ws = 0.1
+
+
+#---------------------------------------------------------------------#
+#  Time stamps as datetime64 array, and length of an interval (string
+#  understood by pandas, e.g. "10min", or timedelta) in the unit of the time
+#  stamps.
+#
+def as_datetime64(timestamps):
+    t = np.asarray(timestamps)
+    if (t.dtype.kind != 'M'):
+        t = t.astype('datetime64[ns]')
+
+    return t
+
+
+def interval_in_units(interval, dtype):
+    return pd.Timedelta(interval).to_numpy().astype( np.dtype('timedelta64[' + np.datetime_data(dtype)[0] + ']') )
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Boolean array of the samples in runs of identical wind speeds ws above
+#  calm_ws lasting at least flat_run, t being the sorted time stamps. The
+#  runs are broken where consecutive time stamps are further apart than
+#  max_gap (None not to break them).
+#
+def flat_line_samples(t, ws, flat_run, calm_ws=default_calm_ws, max_gap=None):
+    n = len(ws)
+    flat = np.zeros(n, dtype=bool)
+    if (n < 2):
+        return flat
+
+    # Start and end (included) of each run of identical values without an
+    # outage
+    split = ws[1:] != ws[:-1]
+    if max_gap is not None:
+        split |= np.diff(t) > max_gap
+    change = np.flatnonzero(split) + 1
+    start = np.concatenate(( [0], change ))
+    end = np.concatenate(( change, [n] )) - 1
+
+    # Runs of NaN are not flat lines: NaN != NaN splits them into single
+    # samples, which are never long enough
+    long_run = ((t[end] - t[start]) >= flat_run) & (ws[start] > calm_ws)
+
+    # Mark the samples of the long runs with +1/-1 at their bounds
+    marks = np.zeros(n + 1, dtype=np.int64)
+    marks[ start[long_run] ] += 1
+    marks[ end[long_run] + 1 ] -= 1
+    flat[:] = np.cumsum(marks[:-1]) > 0
+
+    return flat
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Valid periods of the wind speed series ws at the sorted time stamps
+#  timestamps. Periods shorter than min_period are dropped.
+#
+#  Returns a pd.IntervalIndex of the valid periods, closed on both sides.
+#
+def detect_valid_periods(timestamps, ws, max_gap=default_max_gap, flat_run=default_flat_run, calm_ws=default_calm_ws, min_period="0s"):
+    t = as_datetime64(timestamps)
+    ws = np.asarray(ws, dtype=np.float64)
+    n = len(t)
+
+    if (n > 1) and np.any(t[1:] < t[:-1]):
+        raise ValueError("The time stamps must be sorted")
+
+    ##  Bad samples: missing or flat-lined wind speeds
+    bad = np.isnan(ws)
+    if flat_run is not None:
+        gap = None if max_gap is None else interval_in_units(max_gap, t.dtype)
+        bad |= flat_line_samples(t, ws, interval_in_units(flat_run, t.dtype), calm_ws, gap)
+
+    ##  Breaks between consecutive samples: a bad sample on either side,
+    ##  or an outage
+    brk = bad[1:] | bad[:-1]
+    if max_gap is not None:
+        brk |= np.diff(t) > interval_in_units(max_gap, t.dtype)
+
+    ##  Runs of good samples without breaks
+    good = np.flatnonzero( np.logical_not(bad) )
+    if (len(good) == 0):
+        return pd.IntervalIndex.from_arrays(t[:0], t[:0], closed='both')
+
+    # A run starts at a good sample which is the first one or follows a
+    # break, and ends at a good sample which is the last one or precedes a
+    # break
+    starts_run = np.ones(n, dtype=bool)
+    starts_run[1:] = brk
+    ends_run = np.ones(n, dtype=bool)
+    ends_run[:-1] = brk
+
+    left = t[ good[ starts_run[good] ] ]
+    right = t[ good[ ends_run[good] ] ]
+
+    keep = (right - left) >= interval_in_units(min_period, t.dtype)
+
+    return pd.IntervalIndex.from_arrays(left[keep], right[keep], closed='both')
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Boolean mask of the time stamps falling in one of the valid periods (a
+#  pd.IntervalIndex of sorted, non-overlapping periods).
+#
+def valid_mask(timestamps, periods):
+    t = as_datetime64(timestamps)
+    n = len(t)
+    if (len(periods) == 0) or (n == 0):
+        return np.zeros(n, dtype=bool)
+
+    left = periods.left.to_numpy().astype(t.dtype)
+    right = periods.right.to_numpy().astype(t.dtype)
+
+    if np.all(t[1:] >= t[:-1]):
+        # Sorted time stamps: +1/-1 marks at the positions of the bounds
+        # of the periods, and running sum
+        marks = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(marks, np.searchsorted(t, left, side='left'), 1)
+        np.add.at(marks, np.searchsorted(t, right, side='right'), -1)
+
+        return np.cumsum(marks[:-1]) > 0
+
+    # Time stamps out of order: last period starting at or before each
+    # time stamp
+    i = np.searchsorted(left, t, side='right') - 1
+
+    return (i >= 0) & (t <= right[np.maximum(i, 0)])
+#---------------------------------------------------------------------#
@@ -0,0 +1,247 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Shared loader for the wind data files.
+#
+#  The IOS-net monthly CSV files have 14 columns, but only the time stamp,
+#  the average wind direction (WD_xxxx_Avg) and the average wind speed
+#  (WS_xxxx_Avg) are used by the scripts. Only these columns are parsed, with
+#  explicit data types, so that the irradiance, humidity, pressure, etc.
+#  columns are skipped by the CSV parser.
+#
+#  The files of a data directory are read one by one and the resulting data
+#  frames are concatenated only once at the end, instead of growing the main
+#  data frame file after file. The files can also be parsed concurrently by a
+#  pool of worker processes, the results being merged in sorted filename order
+#  so that the data frame is the same as when reading serially. Parsed files
+#  can be kept in a binary cache (see Wind_cache.py) to skip the parser on
+#  later runs.
+#
+#
+
+
+from os import path,listdir
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+import numpy as np
+import pandas as pd
+from Wind_cache import load_cached, read_and_cache
+
+
+###  Time stamp format used in the IOS-net CSV files  ###
+IOSnet_ts_format = "%Y-%m-%dT%H:%M:%SZ"
+
+###  Columns kept from the Weather Underground, UoM Farm and Meteostat files  ###
+WU_columns = ['Date', 'Avg']
+UoM_Farm_columns = ['TIMESTAMP', 'WS_ms_Avg', 'WS_ms_S_WVT', 'WindDir_D1_WVT', 'WindDir_SD1_WVT']
+Meteostat_columns = ['date', 'wdir', 'wspd']
+
+###  Summary of what was read from a data directory  ###
+IngestReport = namedtuple('IngestReport', ['files', 'bytes', 'rows'])
+
+
+#---------------------------------------------------------------------#
+#  Convert an array of IOS-net time stamp strings to datetime64.
+#
+#  The time stamps are all of the fixed form YYYY-MM-DDThh:mm:ssZ, which
+#  NumPy parses natively (and much faster than pandas) once the trailing 'Z'
+#  is dropped. If any string does not follow this form, we fall back on
+#  pd.to_datetime with the explicit format.
+#
+def parse_IOSnet_timestamps(ts):
+    try:
+        ts = np.asarray(ts, dtype='U20').astype('U19').astype('datetime64[s]')
+        return ts.astype('datetime64[ns]')
+
+    except ValueError:
+        return pd.to_datetime(ts, format=IOSnet_ts_format).to_numpy(dtype='datetime64[ns]')
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read one IOS-net CSV file and return a data frame with the columns
+#  'timestamp', wd_col and ws_col only. Rows with any NaN are dropped and the
+#  time stamps are converted to datetime objects.
+#
+#  WD_xxxx_Avg: average wind direction (degrees)
+#  WS_xxxx_Avg: wind speed (m/s)
+#
+def read_IOSnet_csv(filename, wd_col, ws_col):
+    tmp_df = pd.read_csv(filename,
+                         header=0,
+                         usecols=['timestamp', wd_col, ws_col],
+                         dtype={'timestamp': str, wd_col: np.float32, ws_col: np.float64})
+
+    # Keep the same column order as in the scripts
+    tmp_df = tmp_df[['timestamp', wd_col, ws_col]].dropna(axis=0, how='any')
+    tmp_df['timestamp'] = parse_IOSnet_timestamps(tmp_df['timestamp'].to_numpy())
+
+    return tmp_df
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read one Weather Underground CSV file (daily data) and return a data
+#  frame with the date and the average wind speed only.
+#
+def read_WU_csv(filename):
+    tmp_df = pd.read_csv(filename,
+                         usecols=WU_columns,
+                         dtype={'Avg': np.float64},
+                         parse_dates=['Date'])
+
+    return tmp_df[WU_columns].dropna(axis=0, how='any')
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read one TOA5 data file from the UoM Farm weather station. The first line
+#  of the file describes the data logger, and the 3rd and 4th lines give the
+#  units and type of averaging; they are skipped.
+#
+def read_UoM_Farm_dat(filename):
+    tmp_df = pd.read_csv(filename,
+                         skiprows=[0,2,3],
+                         usecols=UoM_Farm_columns,
+                         dtype={ col: np.float64 for col in UoM_Farm_columns[1:] },
+                         parse_dates=['TIMESTAMP'])
+
+    return tmp_df[UoM_Farm_columns].dropna(axis=0, how='any')
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read one Meteostat CSV file (daily data) and return a data frame with the
+#  date, the wind direction and the wind speed, without the rows with
+#  missing values.
+#
+def read_Meteostat_csv(filename):
+    tmp_df = pd.read_csv(filename,
+                         usecols=Meteostat_columns,
+                         dtype={ col: np.float64 for col in Meteostat_columns[1:] },
+                         parse_dates=['date'])
+
+    return tmp_df[Meteostat_columns].dropna(axis=0, how='any')
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Multiprocessing context for the worker pools.
+#
+#  The scripts run their code at module level, without any
+#  if __name__ == '__main__' guard, so worker processes must be forked: a
+#  spawned worker would re-import, and thus re-run, the calling script.
+#  Returns None on platforms which cannot fork.
+#
+def pool_context():
+    if 'fork' in mp.get_all_start_methods():
+        return mp.get_context('fork')
+
+    return None
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read the files in list filenames using reader(filename, *reader_args)
+#  and return the list of data frames, in the same order as filenames.
+#
+#  If nproc > 1, the files are parsed by a pool of nproc worker processes.
+#  reader must then be a module-level function (e.g. read_IOSnet_csv) so
+#  that it can be sent to the workers. The results are collected in the
+#  order of the file list, so the output is identical to that of the serial
+#  path.
+#
+#  If cache_dir is given, files which are already in the binary cache are
+#  loaded from there, and the others are parsed and added to the cache.
+#
+def read_files(filenames, reader, reader_args, nproc=1, cache_dir=None):
+    # Files found in the cache
+    frames = [None] * len(filenames)
+    if cache_dir is not None:
+        for i in range(len(filenames)):
+            frames[i] = load_cached(cache_dir, filenames[i], reader, reader_args)
+
+    # Files which have to be parsed
+    todo = [ i for i in range(len(filenames)) if frames[i] is None ]
+    if (cache_dir is not None):
+        print("{:d} files loaded from cache {:s}, {:d} to parse".format(len(filenames) - len(todo), cache_dir, len(todo)))
+
+    ctx = pool_context()
+    if (nproc > 1) and (len(todo) > 1) and (ctx is not None):
+        nproc = min(nproc, len(todo))
+        print("Parsing {:d} files with {:d} worker processes ...".format(len(todo), nproc))
+
+        with ProcessPoolExecutor(max_workers=nproc, mp_context=ctx) as pool:
+            # map() returns the results in the order of filenames
+            parsed = list( pool.map(read_and_cache,
+                                    [ filenames[i] for i in todo ],
+                                    [reader] * len(todo),
+                                    [reader_args] * len(todo),
+                                    [cache_dir] * len(todo)) )
+
+    else:
+        parsed = [ read_and_cache(filenames[i], reader, reader_args, cache_dir) for i in todo ]
+
+    for i in range(len(todo)):
+        frames[ todo[i] ] = parsed[i]
+
+    return frames
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read every file found in directory dirpath, in sorted order, using the
+#  function reader(filename, *reader_args). The data frames are collected
+#  in a list and concatenated once. See read_files() for nproc and
+#  cache_dir.
+#
+#  Returns the concatenated data frame and an IngestReport giving the
+#  number of files and bytes read, and the number of rows kept.
+#
+def load_directory(dirpath, reader, *reader_args, nproc=1, cache_dir=None):
+    filelist = sorted( listdir(dirpath) )
+
+    print("\nSuccessfully accessed directory")
+    print(dirpath)
+    print("\nContent of directory:")
+    print(filelist)
+
+    print()
+
+    if (len(filelist) == 0):
+        raise ValueError("No data files found in {:s}".format(dirpath))
+
+    filenames = [ dirpath + "/" + filelist[i] for i in range(len(filelist)) ]
+    nbytes = 0
+    for i in range(len(filenames)):
+        print("Opening CSV file {:s} ...".format(filenames[i]))
+        nbytes = nbytes + path.getsize(filenames[i])
+
+    frames = read_files(filenames, reader, reader_args, nproc=nproc, cache_dir=cache_dir)
+    wind_df = pd.concat(frames, axis=0)
+
+    report = IngestReport(len(filelist), nbytes, len(wind_df))
+    print("\nIngested {:d} rows from {:d} files ({:.2f} MB)".format(report.rows, report.files, report.bytes / 1048576.0))
+
+    return wind_df, report
+#---------------------------------------------------------------------#
@@ -0,0 +1,300 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Rendering of the figures, on screen or to files.
+#
+#  Matplotlib is only imported when a figure is made, through pyplot(), so
+#  that the scripts and modules which do not plot never load it. When the
+#  figures are written to a directory, or when there is no display (e.g. a
+#  nightly job on a server), the non-interactive Agg backend is selected and
+#  show_figure() saves the figure to PNG, SVG or PDF files instead of
+#  opening a window.
+#
+#  The figures of the ..._plot_hist.py and ..._plot_hist_Weibull.py scripts
+#  can also be built by the functions below, for the batch rendering of all
+#  the stations (see Wind_render_plots.py). The yearly plots of all the
+#  scripts are built by figure_yearly(), with one subplot per year of the
+#  data.
+#
+#
+
+
+from os import path, environ, makedirs
+from sys import platform
+import numpy as np
+from Weibull_methods import Weibull_pdf
+from Wind_gaps import as_datetime64
+
+
+###  Directory used when there is no display and no directory was given  ###
+default_plot_dir = "./Plots"
+
+###  File formats written by show_figure()  ###
+plot_formats = ["png"]
+
+###  Backends which cannot open a window  ###
+noninteractive_backends = ["agg", "pdf", "svg", "ps", "cairo", "pgf", "template"]
+
+###  Size of the figures (1600 x 900 pixels laptop screen) and font size  ###
+figure_size = [12.00, 7.85]
+font_size = 16.0
+
+###  Curves of the Weibull overlay: method, marker and colour  ###
+W_curve_styles = [["EMJ", 'o', 'red'],
+                  ["EML", 'v', 'chocolate'],
+                  ["GM1", '+', 'olive'],
+                  ["GM2", 'D', 'darkorchid'],
+                  ["ML",  '^', 'goldenrod'],
+                  ["MML", 'x', 'gold'],
+                  ["MM",  's', 'steelblue'],
+                  ["PDM", '1', 'green'],
+                  ["EPF", '|', 'purple']]
+
+###  Number of wind speed classes stacked in the wind roses  ###
+rose_nclasses = 6
+
+###  Colour of each year in the yearly plots, indexed by year % 5  ###
+###  (2018: red, 2019: blue, 2020: gold, 2021: green, 2022: darkorchid)  ###
+yearly_colors = ['gold', 'green', 'darkorchid', 'red', 'blue']
+
+
+#---------------------------------------------------------------------#
+#  True if figures cannot be shown on screen: no X11/Wayland display on
+#  Linux, or a non-interactive backend chosen (e.g. MPLBACKEND=Agg).
+#
+def has_display():
+    if platform.startswith('linux'):
+        return ('DISPLAY' in environ) or ('WAYLAND_DISPLAY' in environ)
+
+    return True
+
+
+def is_headless():
+    if not has_display():
+        return True
+
+    backend = environ.get('MPLBACKEND', '').lower()
+    if backend in noninteractive_backends:
+        return True
+
+    # Backend already chosen by an earlier call of pyplot()
+    import matplotlib
+    return matplotlib.get_backend().lower() in noninteractive_backends
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Import matplotlib.pyplot, with the Agg backend if the figures are written
+#  to directory plot_dir (not None) or if there is no display. Sets the font
+#  size and the figure size of the scripts. Returns the pyplot module.
+#
+def pyplot(plot_dir=None):
+    import matplotlib
+
+    if (plot_dir is not None) or not has_display():
+        matplotlib.use('Agg')
+
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.size'] = font_size
+    plt.rcParams['figure.figsize'] = figure_size
+
+    return plt
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Show figure fig on screen, or save it as plot_dir/name.<format> for each
+#  format in formats if plot_dir is given or if there is no display (to
+#  default_plot_dir). The figure is closed once saved, so that batch runs do
+#  not accumulate open figures. Returns the list of files written.
+#
+def show_figure(fig, plot_dir, name, formats=plot_formats):
+    import matplotlib.pyplot as plt
+
+    if (plot_dir is None):
+        if not is_headless():
+            plt.show()
+            return []
+
+        plot_dir = default_plot_dir
+        print("No display: writing the figure to {:s}".format(plot_dir))
+
+    makedirs(plot_dir, exist_ok=True)
+
+    filenames = []
+    for fmt in formats:
+        filename = path.join(plot_dir, name + "." + fmt)
+        fig.savefig(filename, format=fmt)
+        filenames.append(filename)
+        print("Saved figure {:s}".format(filename))
+
+    plt.close(fig)
+
+    return filenames
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Histogram of the wind speeds (weights of the bins) up to ceil_ws, as in
+#  the ..._plot_hist.py scripts.
+#
+def figure_hist(plt, hist_w8ts, hist_edges, bin_size, ceil_ws):
+    fig, ax = plt.subplots(1,1)
+
+    ax.set_xlim(0.0, ceil_ws)
+    ax.set_ylim(0.0, 1.1 * hist_w8ts.max())
+    ax.set_xlabel("Wind speed (m/s)")
+    ax.set_ylabel("Weight")
+    ax.bar(hist_edges[:-1], hist_w8ts, align='edge', width=bin_size, color='whitesmoke', edgecolor='black', linewidth=1.5)
+    fig.tight_layout()
+
+    return fig
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Probability density ws_P of the wind speeds with the Weibull curves of
+#  the estimation methods overlaid, as in the ..._plot_hist_Weibull.py
+#  scripts. W_params is the dict {method: (k, c)} of fit_Weibull().
+#
+def figure_hist_Weibull(plt, ws_P, hist_edges, bin_size, ceil_ws, W_params):
+    u = np.linspace(0.0, ceil_ws, 100)
+    curves = [ [method, marker, color, Weibull_pdf(u, *W_params[method])] for method, marker, color in W_curve_styles if method in W_params ]
+
+    # maximum y ordinate (the density is infinite at u = 0 if k < 1)
+    ceil_y = 1.1 * np.max([ws_P.max()] + [ curve[3][np.isfinite(curve[3])].max() for curve in curves ])
+
+    fig, ax = plt.subplots(1,1)
+
+    ax.set_xlim(0.0, ceil_ws)
+    ax.set_ylim(0.0, ceil_y)
+    ax.set_xlabel("Wind speed (m/s)")
+    ax.set_ylabel("Probability density")
+    ax.bar(hist_edges[:-1], ws_P, align='edge', width=bin_size, color='whitesmoke', edgecolor='black', linewidth=1.5)
+    for method, marker, color, P in curves:
+        ax.plot(u, P, linewidth=2.0, marker=marker, color=color, label=method)
+
+    ax.legend(loc="upper right", bbox_to_anchor=(0.85,0.87), frameon=True).get_frame().set_alpha(1.0)
+    fig.tight_layout()
+
+    return fig
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Split the sorted time stamps into calendar years. The bounds of the years
+#  between the first and the last time stamp are located with one binary
+#  search, so that each year is a slice [lo, hi) of the series. Returns a
+#  list of (year, lo, hi), empty years left out.
+#
+def split_years(timestamps):
+    t = as_datetime64(timestamps)
+    if (len(t) == 0):
+        return []
+
+    first = t[0].astype('datetime64[Y]')
+    last = t[-1].astype('datetime64[Y]')
+    bounds = np.arange(first, last + np.timedelta64(2, 'Y'), dtype='datetime64[Y]')
+    idx = np.searchsorted(t, bounds.astype(t.dtype), side='left')
+
+    years = bounds[:-1].astype(np.int64) + 1970
+    return [ (int(years[i]), idx[i], idx[i+1]) for i in range(len(years)) if (idx[i+1] > idx[i]) ]
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  One subplot per calendar year of the (resampled) wind speeds ws at the
+#  time stamps timestamps, as in the ..._plot_yearly_... scripts. The years
+#  are those found in the data; years without any wind speed are left out.
+#
+def figure_yearly(plt, timestamps, ws):
+    import matplotlib.dates as mdates
+
+    t = as_datetime64(timestamps)
+    ws = np.asarray(ws, dtype=np.float64)
+    if np.any(t[1:] < t[:-1]):
+        order = np.argsort(t, kind='stable')
+        t = t[order]
+        ws = ws[order]
+
+    years = [ (year, lo, hi) for year, lo, hi in split_years(t) if np.any(np.isfinite(ws[lo:hi])) ]
+
+    fig, ax = plt.subplots(max(len(years), 1), 1, squeeze=False)
+    ax = ax[:,0]
+    fig.autofmt_xdate()
+
+    for i in range(len(years)):
+        year, lo, hi = years[i]
+
+        ax[i].xaxis.set_major_locator( mdates.MonthLocator(bymonthday=15) )
+        ax[i].xaxis.set_minor_locator( mdates.MonthLocator(bymonthday=1) )
+        ax[i].xaxis.set_major_formatter( mdates.DateFormatter('%b') )
+        ax[i].set_ylabel("u (m/s)")
+        ax[i].grid(True, which='minor', axis='x')
+        ax[i].grid(True, which='major', axis='y')
+
+        ax[i].set_xlim(np.datetime64("{:d}-01-01".format(year)), np.datetime64("{:d}-12-31".format(year)))
+        ax[i].set_ylim(0.0, 1.1*np.nanmax(ws[lo:hi]))
+        ax[i].plot(t[lo:hi], ws[lo:hi], linewidth=2.0, marker='o', color=yearly_colors[year % 5])
+
+    fig.tight_layout()
+
+    return fig
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Wind rose: frequency (%) of the wind in each sector, stacked by classes
+#  of wind speed. hist_w8ts is the (sector x speed bin) histogram with edges
+#  hist_edges, and centres the centres of the sectors (degrees). The bins
+#  are grouped into nclasses classes of about equal width.
+#
+def figure_wind_rose(plt, hist_w8ts, hist_edges, centres, nclasses=rose_nclasses, units="m/s"):
+    hist_w8ts = np.asarray(hist_w8ts, dtype=np.float64)
+    nsectors, nbins = hist_w8ts.shape
+
+    # Bins where each class starts, and frequencies of the classes
+    starts = np.unique( np.linspace(0, nbins, nclasses + 1).round().astype(np.int64)[:-1] )
+    freq = 100.0 * np.add.reduceat(hist_w8ts, starts, axis=1) / hist_w8ts.sum()
+    class_edges = np.concatenate(( hist_edges[starts], [ hist_edges[-1] ] ))
+
+    theta = np.deg2rad(centres)
+    width = 0.9 * 2.0*np.pi / nsectors
+    colors = plt.get_cmap('viridis')( np.linspace(0.0, 1.0, len(starts)) )
+
+    fig, ax = plt.subplots(1, 1, subplot_kw={'projection': 'polar'})
+    ax.set_theta_zero_location('N')
+    ax.set_theta_direction(-1)
+
+    bottom = np.zeros(nsectors)
+    for i in range(len(starts)):
+        ax.bar(theta, freq[:,i], width=width, bottom=bottom, color=colors[i], edgecolor='black', linewidth=0.5,
+               label="{:g} - {:g} {:s}".format(class_edges[i], class_edges[i+1], units))
+        bottom += freq[:,i]
+
+    ax.set_rlabel_position(22.5)
+    ax.yaxis.set_major_formatter( plt.FuncFormatter(lambda r, pos: "{:g}%".format(r)) )
+    ax.legend(loc="upper left", bbox_to_anchor=(1.05, 1.0), frameon=True).get_frame().set_alpha(1.0)
+    fig.tight_layout()
+
+    return fig
+#---------------------------------------------------------------------#
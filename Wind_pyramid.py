@@ -0,0 +1,423 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#
+#  Multi-resolution aggregates of a station store (see Wind_store.py).
+#
+#  The 1-minute data of a station is summarised at four levels of time
+#  resolution: 10 minutes, 1 hour, 1 day and 1 calendar month. For each
+#  interval of a level which holds data, the pyramid keeps
+#
+#      time      start of the interval (seconds since 1970-01-01)
+#      count     number of wind speeds
+#      sum       sum of the wind speeds
+#      sumsq     sum of the squares of the wind speeds
+#      min, max  smallest and largest wind speed
+#      wd_count  number of wind directions
+#      sum_sin   sum of the sines of the wind directions
+#      sum_cos   sum of the cosines of the wind directions
+#
+#  from which the mean, standard deviation, extremes and vector mean
+#  direction over any union of intervals are computed exactly. The
+#  10-minute level is built from the raw data and each coarser level from
+#  the level below it, with np.add.reduceat (and np.fmin/np.fmax) over the
+#  runs of samples in the same interval, so the raw data is read once.
+#
+#  The levels are stored as binary arrays in store_dir/pyramid, with a JSON
+#  description, in the same way as the store itself. They are updated with
+#  the store by update_station_store(): only the intervals from the first
+#  changed time stamp onwards are recomputed.
+#
+#  A query for an averaging interval (e.g. the 2-day means of the yearly
+#  plots) reads the coarsest level whose intervals divide it, i.e. a few
+#  thousand rows instead of millions of raw samples.
+#
+#
+
+
+from os import path, makedirs, replace, remove
+from collections import namedtuple
+import json
+import numpy as np
+from Wind_store import open_station_store
+from Wind_registry import gap_mask
+from Wind_resample import ResampledWind, interval_seconds, bucket_ids, vector_mean_direction
+
+
+###  Levels of the pyramid, finest first  ###
+pyramid_levels = ["10min", "1h", "1D", "1M"]
+
+###  Names understood as calendar months in queries  ###
+monthly_intervals = ["1M", "M", "MS", "1MS", "ME", "1ME"]
+
+###  Data type of each array of a level  ###
+pyramid_dtypes = { 'time': np.int64,
+                   'count': np.int64,
+                   'sum': np.float64,
+                   'sumsq': np.float64,
+                   'min': np.float64,
+                   'max': np.float64,
+                   'wd_count': np.int64,
+                   'sum_sin': np.float64,
+                   'sum_cos': np.float64 }
+
+###  Arrays of one level  ###
+PyramidLevel = namedtuple('PyramidLevel', list(pyramid_dtypes))
+
+
+#---------------------------------------------------------------------#
+#  Start of the interval of level (one of pyramid_levels) holding each time
+#  stamp t_sec (seconds since 1970-01-01).
+#
+def level_start(level, t_sec):
+    t_sec = np.asarray(t_sec, dtype=np.int64)
+
+    if (level == "1M"):
+        return t_sec.astype('datetime64[s]').astype('datetime64[M]').astype('datetime64[s]').astype(np.int64)
+
+    interval_s = interval_seconds(level)
+    return (t_sec // interval_s) * interval_s
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Positions where a new run of equal values starts in the sorted array
+#  starts_of (the interval starts of the samples).
+#
+def run_starts(starts_of):
+    change = np.flatnonzero(starts_of[1:] != starts_of[:-1]) + 1
+    return np.concatenate(( [0], change ))
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Empty level.
+#
+def empty_level():
+    return PyramidLevel(*[ np.zeros(0, dtype=pyramid_dtypes[name]) for name in pyramid_dtypes ])
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Aggregate the raw wind speeds ws and directions wd (degrees) at the
+#  sorted time stamps t_sec into the intervals of level. NaN values are
+#  left out of the sums and extremes. The sines and cosines are computed in
+#  single precision, as in Wind_resample.py.
+#
+def aggregate_raw(t_sec, ws, wd, level):
+    if (len(t_sec) == 0):
+        return empty_level()
+
+    t_sec = np.asarray(t_sec, dtype=np.int64)
+    ws = np.asarray(ws, dtype=np.float64)
+    wd = np.asarray(wd)
+
+    start_of = level_start(level, t_sec)
+    idx = run_starts(start_of)
+
+    ok_ws = np.isfinite(ws)
+    ws0 = np.where(ok_ws, ws, 0.0)
+
+    ok_wd = np.isfinite(wd)
+    rad = np.deg2rad( np.where(ok_wd, wd, 0.0).astype(np.float32) )
+    sin = np.where(ok_wd, np.sin(rad), 0.0)
+    cos = np.where(ok_wd, np.cos(rad), 0.0)
+
+    return PyramidLevel(start_of[idx],
+                        np.add.reduceat(ok_ws.astype(np.int64), idx),
+                        np.add.reduceat(ws0, idx),
+                        np.add.reduceat(ws0 * ws0, idx),
+                        np.fmin.reduceat(ws, idx),
+                        np.fmax.reduceat(ws, idx),
+                        np.add.reduceat(ok_wd.astype(np.int64), idx),
+                        np.add.reduceat(sin.astype(np.float64), idx),
+                        np.add.reduceat(cos.astype(np.float64), idx))
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Aggregate the rows of the finer level fine (a PyramidLevel, sorted by
+#  time) into the intervals of level.
+#
+def aggregate_level(fine, level):
+    if (len(fine.time) == 0):
+        return empty_level()
+
+    start_of = level_start(level, fine.time)
+    idx = run_starts(start_of)
+
+    return PyramidLevel(start_of[idx],
+                        np.add.reduceat(fine.count, idx),
+                        np.add.reduceat(fine.sum, idx),
+                        np.add.reduceat(fine.sumsq, idx),
+                        np.fmin.reduceat(fine.min, idx),
+                        np.fmax.reduceat(fine.max, idx),
+                        np.add.reduceat(fine.wd_count, idx),
+                        np.add.reduceat(fine.sum_sin, idx),
+                        np.add.reduceat(fine.sum_cos, idx))
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Rows of a level from position i onwards.
+#
+def level_tail(lv, i):
+    return PyramidLevel(*[ arr[i:] for arr in lv ])
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read / write the JSON description of the pyramid of a store.
+#
+def pyramid_dir(store_dir):
+    return store_dir + "/pyramid"
+
+
+def read_pyramid_meta(store_dir):
+    with open(pyramid_dir(store_dir) + "/meta.json", 'r') as f:
+        return json.load(f)
+
+
+def write_pyramid_meta(store_dir, meta):
+    # Write to a temporary file first so that the description is never
+    # left half-written
+    with open(pyramid_dir(store_dir) + "/meta.json.tmp", 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    replace(pyramid_dir(store_dir) + "/meta.json.tmp", pyramid_dir(store_dir) + "/meta.json")
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Arrays of a level as described by meta, as read-only memory maps.
+#
+def level_arrays(store_dir, meta, level):
+    n = meta['levels'][level]
+    if (n == 0):
+        # np.memmap cannot map an empty file
+        return empty_level()
+
+    return PyramidLevel(*[ np.memmap(pyramid_dir(store_dir) + "/" + level + "_" + name + ".bin", dtype=pyramid_dtypes[name], mode='r', shape=(n,)) for name in pyramid_dtypes ])
+
+
+#  True if the store in store_dir has a pyramid built from all its rows.
+#
+def pyramid_up_to_date(store_dir):
+    if not path.isfile(pyramid_dir(store_dir) + "/meta.json"):
+        return False
+
+    return read_pyramid_meta(store_dir)['store_length'] == open_station_store(store_dir).time.shape[0]
+
+
+#  Open one level of the pyramid of a store, which must be up to date with
+#  the store.
+#
+def open_pyramid_level(store_dir, level):
+    if not pyramid_up_to_date(store_dir):
+        raise ValueError("Store {:s} has no pyramid, or it is out of date".format(store_dir))
+
+    meta = read_pyramid_meta(store_dir)
+
+    if level not in meta['levels']:
+        raise ValueError("Unknown level {:s}. Levels are: {:s}".format(level, ", ".join(pyramid_levels)))
+
+    return level_arrays(store_dir, meta, level)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Build or update the pyramid of the store in store_dir.
+#
+#  since is the first time stamp (seconds since 1970-01-01) at which the
+#  data of the store has changed, or None to rebuild the whole pyramid. The
+#  intervals of each level starting before the one holding since are kept;
+#  the others are recomputed, the finest level from the raw data from since
+#  onwards, and each coarser level from the updated level below it.
+#
+#  The raw time stamps must be sorted for an update; a store whose time
+#  stamps are out of order is sorted in memory and rebuilt in full.
+#
+def update_pyramid(store_dir, since=None):
+    st = open_station_store(store_dir)
+    t = st.time
+    n = t.shape[0]
+
+    meta = None
+    if path.isfile(pyramid_dir(store_dir) + "/meta.json"):
+        meta = read_pyramid_meta(store_dir)
+
+        # Without description, an interrupted update is found on the next
+        # one, which then rebuilds the pyramid
+        remove(pyramid_dir(store_dir) + "/meta.json")
+
+        if not meta.get('sorted', False):
+            meta = None
+
+    if (meta is None):
+        since = None
+
+    ##  Raw data from the first interval to recompute
+    if since is None:
+        first = 0
+    else:
+        first = np.searchsorted(t, level_start(pyramid_levels[0], since), side='left')
+
+    if (n - first > 1) and np.any(t[first+1:] < t[first:-1]):
+        # Time stamps out of order: sort them and rebuild everything
+        order = np.argsort(t, kind='stable')
+        raw = (t[order], st.ws[order], st.wd[order])
+        is_sorted = False
+        since = None
+    else:
+        raw = (t[first:], st.ws[first:], st.wd[first:])
+        is_sorted = True
+
+    makedirs(pyramid_dir(store_dir), exist_ok=True)
+    new_meta = { 'store_length': int(n),
+                 'sorted': is_sorted,
+                 'levels': {},
+                 'dtypes': { name: np.dtype(pyramid_dtypes[name]).str for name in pyramid_dtypes } }
+
+    fine = None
+    for level in pyramid_levels:
+        ##  Rows kept: the intervals starting before the one holding since
+        if since is None:
+            keep = 0
+            fine_from = fine
+        else:
+            cut = level_start(level, since)
+            keep = int(np.searchsorted(level_arrays(store_dir, meta, level).time, cut, side='left'))
+            if fine is not None:
+                fine_from = level_tail(fine, np.searchsorted(fine.time, cut, side='left'))
+
+        ##  Recompute the other intervals
+        if fine is None:
+            new_rows = aggregate_raw(*raw, level)
+        else:
+            new_rows = aggregate_level(fine_from, level)
+
+        ##  Truncate the arrays after the rows kept, and append the new rows
+        for name, arr in zip(pyramid_dtypes, new_rows):
+            filename = pyramid_dir(store_dir) + "/" + level + "_" + name + ".bin"
+            mode = 'r+b' if path.isfile(filename) else 'wb'
+
+            with open(filename, mode) as f:
+                f.truncate(keep * np.dtype(pyramid_dtypes[name]).itemsize)
+                f.seek(0, 2)
+                np.ascontiguousarray(arr, dtype=pyramid_dtypes[name]).tofile(f)
+
+        new_meta['levels'][level] = keep + len(new_rows.time)
+        fine = level_arrays(store_dir, new_meta, level)
+
+    write_pyramid_meta(store_dir, new_meta)
+
+    print("Pyramid {:s}: {:s}".format(pyramid_dir(store_dir), ", ".join([ "{:s} {:d} rows".format(level, new_meta['levels'][level]) for level in pyramid_levels ])))
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Coarsest level which answers a query for averages over interval (string
+#  understood by pandas, or timedelta): "1M" for calendar months, else the
+#  coarsest fixed level whose length divides interval. None if no level
+#  does (e.g. 5 minutes), in which case the raw data must be used.
+#
+def level_for_interval(interval):
+    if isinstance(interval, str) and (interval in monthly_intervals):
+        return "1M"
+
+    interval_s = interval_seconds(interval)
+    for level in reversed(pyramid_levels[:-1]):
+        if (interval_s % interval_seconds(level) == 0):
+            return level
+
+    return None
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Rows of a level whose interval starts outside the exclusion intervals
+#  exclude (see Wind_registry.py). The exclusions are applied to whole
+#  intervals of the level, so they are exact for the daily and finer levels
+#  when they are given in whole days, as in Stations.json. They are not
+#  applied to the monthly level, where a month would be kept or dropped
+#  whole on the start of the month alone.
+#
+def level_rows(lv, exclude, level):
+    if (len(exclude) == 0):
+        return lv
+
+    if (level == "1M"):
+        raise ValueError("Exclusion intervals cannot be applied to the monthly level of the pyramid; use the daily level")
+
+    keep = gap_mask(lv.time.view('datetime64[s]'), exclude)
+
+    return PyramidLevel(*[ arr[keep] for arr in lv ])
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Average the wind data of the store in store_dir over intervals of length
+#  interval, from the coarsest level of its pyramid which answers it. The
+#  result is the same as resample_epoch() on the raw data (up to rounding)
+#  when no interval is excluded.
+#
+#  Returns a ResampledWind.
+#
+def pyramid_resample(store_dir, interval, exclude=()):
+    level = level_for_interval(interval)
+    if level is None:
+        raise ValueError("No level of the pyramid divides the interval {:s}".format(str(interval)))
+
+    lv = level_rows(open_pyramid_level(store_dir, level), exclude, level)
+    if (len(lv.time) == 0):
+        empty = np.zeros(0)
+        return ResampledWind(np.zeros(0, dtype='datetime64[s]'), np.zeros(0, dtype=np.int64), empty, empty)
+
+    if (level == "1M"):
+        # One row per month which holds data
+        months = np.asarray(lv.time).astype('datetime64[s]').astype('datetime64[M]')
+        ids = (months - months[0]).astype(np.int64)
+        nb = ids[-1] + 1
+        time = (months[0] + np.arange(nb)).astype('datetime64[s]')
+    else:
+        # Intervals aligned on midnight of the first day, as resample_epoch()
+        interval_s = interval_seconds(interval)
+        origin_s = (lv.time[0] // 86400) * 86400
+        ids = bucket_ids(np.asarray(lv.time), interval_s, origin_s)
+        first = ids[0]
+        ids = ids - first
+        nb = ids[-1] + 1
+        time = (origin_s + interval_s * (first + np.arange(nb, dtype=np.int64))).astype('datetime64[s]')
+
+    count = np.bincount(ids, weights=lv.count, minlength=nb).astype(np.int64)
+    sum_ws = np.bincount(ids, weights=lv.sum, minlength=nb)
+
+    ws_mean = np.full(nb, np.nan)
+    has = count > 0
+    ws_mean[has] = sum_ws[has] / count[has]
+
+    wd_mean = vector_mean_direction(np.bincount(ids, weights=lv.sum_sin, minlength=nb),
+                                    np.bincount(ids, weights=lv.sum_cos, minlength=nb),
+                                    np.bincount(ids, weights=lv.wd_count, minlength=nb))
+
+    return ResampledWind(time, count, ws_mean, wd_mean)
+#---------------------------------------------------------------------#
@@ -0,0 +1,316 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Registry of the weather stations and masks of the gaps in their data.
+#
+#  The stations are described in the JSON file Stations.json: data source,
+#  name and location, path to the data, reader function, keywords of the
+#  time stamp, wind direction and wind speed columns, bin size of the
+#  histogram, and the time intervals to exclude because of gaps in the
+#  collection. Each interval is a pair [start, end] of time stamps, both
+#  included; null stands for the beginning or the end of the data.
+#
+#  A station may also have thresholds for the automatic detection of
+#  outages and flat-lined data (see Wind_gaps.py), applied after the
+#  exclusion intervals, and the interval over which the wind speeds are
+#  averaged for the yearly plots (e.g. "2D").
+#
+#  The bounds of the intervals are located in the sorted time stamps with
+#  np.searchsorted, and each interval then excludes a slice of the data, so
+#  that the mask is built in one pass instead of comparing every time stamp
+#  with every bound.
+#
+#  The multi-station scripts (Wind_batch_report.py, Wind_render_plots.py,
+#  ...) also share the selection of the stations from the command line, the
+#  loading and masking of the data of a station, and the pool of worker
+#  processes running one station per worker, defined at the end of this
+#  module.
+#
+#
+
+
+import json
+from os import path
+from io import StringIO
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from collections import namedtuple
+import numpy as np
+from Wind_loader import read_IOSnet_csv, read_WU_csv, read_UoM_Farm_dat, read_Meteostat_csv, load_directory, pool_context
+from Wind_store import station_store_df
+from Wind_gaps import as_datetime64, detect_valid_periods, valid_mask
+
+
+###  Default path of the registry  ###
+registry_path = "./Stations.json"
+
+###  Reader functions which can be named in the registry  ###
+registry_readers = { 'read_IOSnet_csv': read_IOSnet_csv,
+                     'read_WU_csv': read_WU_csv,
+                     'read_UoM_Farm_dat': read_UoM_Farm_dat,
+                     'read_Meteostat_csv': read_Meteostat_csv }
+
+###  Thresholds of the gap detection which can be given in the registry  ###
+registry_gap_detection = ['max_gap', 'flat_run', 'calm_ws', 'min_period']
+
+###  Description of a station  ###
+StationConfig = namedtuple('StationConfig', ['station', 'source', 'name', 'location', 'path',
+                                             'reader', 'reader_args', 'ts_col', 'wd_col', 'ws_col',
+                                             'bin_size', 'exclude', 'gap_detection', 'yearly_resample'])
+
+
+#---------------------------------------------------------------------#
+#  Read the registry file filename. Returns a dict of StationConfig indexed
+#  by station, in the order of the file.
+#
+def load_registry(filename=registry_path):
+    with open(filename, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    registry = {}
+    for station in entries:
+        entry = entries[station]
+
+        if entry['reader'] not in registry_readers:
+            raise ValueError("Unknown reader {:s} for station {:s}".format(entry['reader'], station))
+        reader = registry_readers[ entry['reader'] ]
+
+        # The IOS-net files have many columns; the reader is given the
+        # wind direction and wind speed columns to parse
+        if (reader is read_IOSnet_csv):
+            reader_args = ( entry['columns']['wd'], entry['columns']['ws'] )
+        else:
+            reader_args = ()
+
+        for interval in entry['exclude']:
+            if (len(interval) != 2):
+                raise ValueError("Exclusion interval {:s} of station {:s} is not a pair [start, end]".format(str(interval), station))
+
+        gap_detection = entry.get('gap_detection')
+        if gap_detection is not None:
+            for key in gap_detection:
+                if key not in registry_gap_detection:
+                    raise ValueError("Unknown gap detection threshold {:s} for station {:s}".format(key, station))
+
+        registry[station] = StationConfig(station,
+                                          entry['source'],
+                                          entry['name'],
+                                          entry['location'],
+                                          entry['path'],
+                                          reader, reader_args,
+                                          entry['columns']['timestamp'],
+                                          entry['columns']['wd'],
+                                          entry['columns']['ws'],
+                                          float(entry['bin_size']),
+                                          [ tuple(interval) for interval in entry['exclude'] ],
+                                          gap_detection,
+                                          entry.get('yearly_resample', "1D"))
+
+    return registry
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Description of one station of the registry.
+#
+def station_config(station, filename=registry_path):
+    registry = load_registry(filename)
+    if station not in registry:
+        raise ValueError("Station {:s} not found in {:s}. Stations are: {:s}".format(station, filename, ", ".join(registry)))
+
+    return registry[station]
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Bounds of the exclusion intervals as two datetime64 arrays start and end,
+#  in the unit of the time stamps. An open bound (None) extends to the
+#  beginning or the end of time.
+#
+def exclusion_bounds(exclude, unit='s'):
+    dtype = np.dtype('datetime64[' + unit + ']')
+    lo = np.iinfo(np.int64).min + 1  # the minimum is NaT
+    hi = np.iinfo(np.int64).max
+
+    start = np.array([ lo if (interval[0] is None) else np.datetime64(interval[0], unit).astype(np.int64) for interval in exclude ], dtype=np.int64)
+    end = np.array([ hi if (interval[1] is None) else np.datetime64(interval[1], unit).astype(np.int64) for interval in exclude ], dtype=np.int64)
+
+    return start.astype(dtype), end.astype(dtype)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Boolean mask of the time stamps (datetime64 array or Series) which fall
+#  outside all the exclusion intervals, i.e. the data to keep.
+#
+def gap_mask(timestamps, exclude):
+    t = np.asarray(timestamps)
+    if (t.dtype.kind != 'M'):
+        t = t.astype('datetime64[ns]')
+
+    n = len(t)
+    keep = np.ones(n, dtype=bool)
+    if (len(exclude) == 0) or (n == 0):
+        return keep
+
+    start, end = exclusion_bounds(exclude, np.datetime_data(t.dtype)[0])
+
+    if np.all(t[1:] >= t[:-1]):
+        # Sorted time stamps: each interval is a slice between the
+        # positions of its bounds
+        lo = np.searchsorted(t, start, side='left')
+        hi = np.searchsorted(t, end, side='right')
+        for i in range(len(lo)):
+            keep[ lo[i]:hi[i] ] = False
+
+        return keep
+
+    # Time stamps out of order: last interval starting at or before each
+    # time stamp, the intervals being sorted by start, and the latest end
+    # of the intervals up to it
+    order = np.argsort(start)
+    start = start[order]
+    end = np.maximum.accumulate(end[order])
+    i = np.searchsorted(start, t, side='right') - 1
+
+    return (i < 0) | (t > end[np.maximum(i, 0)])
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Boolean mask of the samples (sorted time stamps timestamps, wind speeds
+#  ws) outside the exclusion intervals of station (a StationConfig) and,
+#  if the station has gap detection thresholds, in the valid periods
+#  detected in the remaining data.
+#
+def station_mask(timestamps, ws, station):
+    keep = gap_mask(timestamps, station.exclude)
+
+    if station.gap_detection is not None:
+        idx = np.flatnonzero(keep)
+        t = as_datetime64(timestamps)[idx]
+        periods = detect_valid_periods(t, np.asarray(ws)[idx], **station.gap_detection)
+        keep[idx] = valid_mask(t, periods)
+
+    return keep
+
+
+#  Rows of data frame wind_df kept by station_mask().
+#
+def mask_gaps(wind_df, station):
+    return wind_df.loc[ station_mask(wind_df[station.ts_col], wind_df[station.ws_col], station) ]
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Stations of the registry named on the command line argv (all of them if
+#  none is named), in the order of the registry. The stations whose data
+#  cannot be accessed are skipped, as are those without wind direction if
+#  need_wd is True. Exits with an error if a name is unknown or if no
+#  station is left.
+#
+def select_stations(argv, need_wd=False, filename=registry_path):
+    registry = load_registry(filename)
+
+    if (len(argv) > 1):
+        for name in argv[1:]:
+            if name not in registry:
+                print("Unknown station {:s}! Stations are:".format(name))
+                print(list(registry))
+                exit(1)
+
+        todo = [ registry[name] for name in registry if name in argv[1:] ]
+    else:
+        todo = list( registry.values() )
+
+    # Check that the data is accessible
+    available = []
+    for station in todo:
+        if need_wd and (station.wd_col is None):
+            print("No wind direction for {:s}! Skipping".format(station.station))
+            continue
+
+        if not path.exists(station.path):
+            print("Cannot access {:s}! Skipping {:s}".format(station.path, station.station))
+            continue
+
+        available.append(station)
+
+    if (len(available) == 0):
+        print("No station to process!")
+        exit(1)
+
+    return available
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Data frame of a station (a StationConfig) with the gaps masked out. The
+#  data is read from the store in store_dir if given and present (see
+#  Wind_store.py), else from the data directory (see load_directory() for
+#  nproc and cache_dir) or the single data file of the station.
+#
+def load_station(station, nproc=1, cache_dir=None, store_dir=None):
+    if (store_dir is not None) and path.isfile(store_dir + "/meta.json"):
+        wind_df = station_store_df(store_dir, station.ts_col, station.wd_col, station.ws_col)
+    elif path.isdir(station.path):
+        wind_df, ingest_report = load_directory(station.path, station.reader, *station.reader_args, nproc=nproc, cache_dir=cache_dir)
+    else:
+        wind_df = station.reader(station.path, *station.reader_args)
+
+    return mask_gaps(wind_df, station)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Run func(station) with its output kept apart, so that the logs of the
+#  stations processed in parallel are not interleaved. Returns the result
+#  (None if func failed) and the log.
+#
+def run_logged(func, station):
+    log = StringIO()
+    with redirect_stdout(log):
+        try:
+            result = func(station)
+        except Exception as err:
+            print("Error: {:s}".format(repr(err)))
+            result = None
+
+    return result, log.getvalue()
+
+
+#  Run func on every station of list stations with run_logged(), one
+#  station per worker process in a pool of nproc workers (serially if
+#  nproc is 1 or the workers cannot be forked). func must be a module-level
+#  function. Returns the list of (result, log), in the order of stations.
+#
+def map_stations(func, stations, nproc):
+    ctx = pool_context()
+    nproc = min(nproc, len(stations))
+
+    if (nproc > 1) and (ctx is not None):
+        with ProcessPoolExecutor(max_workers=nproc, mp_context=ctx) as pool:
+            return list( pool.map(partial(run_logged, func), stations) )
+
+    return [ run_logged(func, station) for station in stations ]
+#---------------------------------------------------------------------#
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Figures of all the stations in one unattended run.
+#
+#  For each station of the registry Stations.json, the data is loaded and
+#  the gaps are masked out, then the histogram, the histogram with the
+#  Weibull curves of the nine estimation methods, and the yearly plot of the
+#  averaged wind speeds are made as in the ..._plot_hist.py,
+#  ..._plot_hist_Weibull.py and ..._plot_yearly_... scripts. The figures are
+#  rendered with the Agg backend, without a display, and saved to PlotDir as
+#  <station>_hist, <station>_hist_Weibull and <station>_yearly in each of
+#  the formats of plot_formats. The stations are processed in parallel by a
+#  pool of worker processes, one station per worker.
+#
+#  Usage:
+#      ./Wind_render_plots.py                  all the stations
+#      ./Wind_render_plots.py Name1 Name2 ...  only the stations named
+#
+#
+
+
+from sys import argv
+from os import cpu_count
+import numpy as np
+from Wind_registry import select_stations, load_station, map_stations
+from Wind_stats import value_counts, value_counts_histogram
+from Wind_resample import resample_wind
+from Wind_pyramid import pyramid_up_to_date, pyramid_resample
+from Weibull_methods import suff_stats_from_counts, fit_Weibull
+from Wind_plots import pyplot, show_figure, figure_hist, figure_hist_Weibull, figure_yearly
+
+
+###  Directory where the figures are written  ###
+PlotDir = "./Plots"
+
+###  File formats of the figures ("png", "svg", "pdf")  ###
+plot_formats = ["png"]
+
+###  Number of worker processes, one station per worker  ###
+nproc = cpu_count()
+
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
+
+###  Directory of the station stores (see Wind_update_stores.py). If set,  ###
+###  the yearly plot of a station with an up-to-date store is read from    ###
+###  the pyramid of the store: the exclusion intervals of Stations.json    ###
+###  are applied to whole intervals of the pyramid, and the automatic gap  ###
+###  detection is not applied. None to average the loaded data.            ###
+StorePath = None
+
+
+
+
+
+#---------------------------------------------------------------------#
+#  Load and mask the data of one station (a StationConfig of the registry),
+#  make its three figures and save them to PlotDir. Returns the list of
+#  files written.
+#
+def render_station(station):
+    bin_size = station.bin_size
+    plt = pyplot(PlotDir)
+
+    ##  Load the data, masking out the gaps
+    wind_df = load_station(station, cache_dir=cache_dir)
+
+    ##  Histogram, probability density and parameter estimation
+    ws_vc = value_counts( wind_df[station.ws_col].to_numpy() )
+    ceil_ws = np.ceil(ws_vc.values.max())
+    hist_w8ts, hist_edges = value_counts_histogram(ws_vc, bin_size)
+    ws_P = (hist_w8ts / hist_w8ts.sum()) / bin_size
+
+    W_params = fit_Weibull( suff_stats_from_counts(ws_vc, bin_size) )
+
+    ##  Wind speeds averaged over station.yearly_resample
+    if (StorePath is not None) and pyramid_up_to_date(StorePath + "/" + station.station):
+        avg = pyramid_resample(StorePath + "/" + station.station, station.yearly_resample, station.exclude)
+    else:
+        avg = resample_wind(wind_df[station.ts_col], wind_df[station.ws_col], None, station.yearly_resample)
+
+    ##  Figures
+    filenames = []
+
+    fig = figure_hist(plt, hist_w8ts, hist_edges, bin_size, ceil_ws)
+    filenames += show_figure(fig, PlotDir, station.station + "_hist", plot_formats)
+
+    fig = figure_hist_Weibull(plt, ws_P, hist_edges, bin_size, ceil_ws, W_params)
+    filenames += show_figure(fig, PlotDir, station.station + "_hist_Weibull", plot_formats)
+
+    fig = figure_yearly(plt, avg.time, avg.ws)
+    filenames += show_figure(fig, PlotDir, station.station + "_yearly", plot_formats)
+
+    return filenames
+#---------------------------------------------------------------------#
+
+
+
+
+###  BEGIN Select stations  ###
+
+available = select_stations(argv)
+
+###  END Select stations  ###
+
+
+
+###  BEGIN Render figures  ###
+
+print("\nRendering {:d} stations with {:d} worker processes ...".format(len(available), min(nproc, len(available))))
+results = map_stations(render_station, available, nproc)
+
+nfailed = 0
+for i in range(len(available)):
+    filenames, log = results[i]
+    if filenames is None:
+        print("\n{:s} failed:".format(available[i].station))
+        print(log)
+        nfailed += 1
+        continue
+
+    print("{:s}: {:s}".format(available[i].station, ", ".join(filenames)))
+
+print("\nWrote the figures of {:d} stations to {:s}".format(len(available) - nfailed, PlotDir))
+
+###  END Render figures  ###
+
+
+print()
+exit(1 if (nfailed > 0) else 0)
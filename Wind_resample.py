@@ -0,0 +1,176 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Averaging of the wind data over fixed time intervals (10 minutes, 1 hour,
+#  1 day, 2 days, ...).
+#
+#  The interval of each sample is found by integer division of its time
+#  stamp, in seconds since 1970-01-01, by the length of the interval. The
+#  sums and counts of each interval are then accumulated with np.bincount,
+#  directly from the arrays, without building a data frame.
+#
+#  The wind direction is circular (359 and 1 degrees are 2 degrees apart,
+#  not 358), so it is averaged as a vector: the sines and cosines of the
+#  directions are summed over the interval and the mean direction is the
+#  angle of the sum.
+#
+#  As with DataFrame.resample, the intervals are aligned on midnight of the
+#  first day, every interval from the first to the last sample is returned,
+#  and the means of the intervals without data are NaN.
+#
+#
+
+
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from Wind_store import to_epoch_seconds
+
+
+###  Averaged wind data: start of the intervals (datetime64[s]), number of  ###
+###  wind speeds, mean wind speed and vector mean wind direction (degrees)  ###
+ResampledWind = namedtuple('ResampledWind', ['time', 'count', 'ws', 'wd'])
+
+
+#---------------------------------------------------------------------#
+#  Length of an interval (string understood by pandas, e.g. "10min", "2D",
+#  or timedelta) in whole seconds.
+#
+def interval_seconds(interval):
+    seconds = pd.Timedelta(interval).total_seconds()
+    if (seconds <= 0) or (seconds != int(seconds)):
+        raise ValueError("Interval {:s} is not a positive whole number of seconds".format(str(interval)))
+
+    return int(seconds)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Index of the interval of length interval_s (seconds) of each time stamp
+#  t_sec (seconds since 1970-01-01), counted from origin_s.
+#
+def bucket_ids(t_sec, interval_s, origin_s):
+    return (t_sec - origin_s) // interval_s
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Interval indices ids and values x of the samples where x is not NaN. The
+#  arrays are returned as they are (no copy) when there is no NaN.
+#
+def finite_samples(ids, x):
+    ok = np.isfinite(x)
+    if ok.all():
+        return ids, x
+
+    return ids[ok], x[ok]
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Vector mean of the directions wd (degrees) in each interval ids, from the
+#  sums of their sines and cosines. NaN for intervals without direction.
+#
+#  The sines and cosines are computed in single precision (the precision of
+#  the directions in the station stores), which is several times faster
+#  than in double precision; the sums are accumulated in double precision.
+#
+def circular_mean(ids, wd, nb):
+    ids, wd = finite_samples(ids, wd)
+    rad = np.deg2rad( wd.astype(np.float32) )
+
+    sum_sin = np.bincount(ids, weights=np.sin(rad), minlength=nb)
+    sum_cos = np.bincount(ids, weights=np.cos(rad), minlength=nb)
+    count = np.bincount(ids, minlength=nb)
+
+    return vector_mean_direction(sum_sin, sum_cos, count)
+
+
+#  Mean direction (degrees, in [0, 360)) from the sums of the sines and
+#  cosines of count directions. NaN where count is 0.
+#
+def vector_mean_direction(sum_sin, sum_cos, count):
+    wd_mean = np.full(len(count), np.nan)
+    has = count > 0
+    wd_mean[has] = np.mod(np.rad2deg( np.arctan2(sum_sin[has], sum_cos[has]) ), 360.0)
+
+    # np.mod() of a tiny negative angle rounds to 360
+    wd_mean[wd_mean >= 360.0] = 0.0
+
+    return wd_mean
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Average the wind speeds ws, and directions wd (None if there are no
+#  directions), at the time stamps t_sec (seconds since 1970-01-01, int64,
+#  in any order) over intervals of length interval. The intervals are
+#  aligned on origin_s (seconds), by default midnight of the day of the
+#  first sample. NaN values are left out.
+#
+#  Returns a ResampledWind.
+#
+def resample_epoch(t_sec, ws, wd=None, interval="2D", origin_s=None):
+    t_sec = np.asarray(t_sec, dtype=np.int64)
+    ws = np.asarray(ws, dtype=np.float64)
+    interval_s = interval_seconds(interval)
+
+    if (len(t_sec) == 0):
+        empty = np.zeros(0)
+        return ResampledWind(np.zeros(0, dtype='datetime64[s]'), np.zeros(0, dtype=np.int64), empty, empty)
+
+    if origin_s is None:
+        origin_s = (t_sec.min() // 86400) * 86400
+
+    # Intervals counted from the one of the first sample
+    ids = bucket_ids(t_sec, interval_s, origin_s)
+    first = ids.min()
+    ids -= first
+    nb = ids.max() + 1
+
+    ##  Mean wind speed
+    ids_ws, ws_ok = finite_samples(ids, ws)
+    count = np.bincount(ids_ws, minlength=nb)
+    sum_ws = np.bincount(ids_ws, weights=ws_ok, minlength=nb)
+
+    ws_mean = np.full(nb, np.nan)
+    has = count > 0
+    ws_mean[has] = sum_ws[has] / count[has]
+
+    ##  Vector mean wind direction
+    if wd is None:
+        wd_mean = np.full(nb, np.nan)
+    else:
+        wd_mean = circular_mean(ids, np.asarray(wd), nb)
+
+    time = (origin_s + interval_s * (first + np.arange(nb, dtype=np.int64))).astype('datetime64[s]')
+
+    return ResampledWind(time, count, ws_mean, wd_mean)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Same as resample_epoch() for datetime64 time stamps (array or Series).
+#
+def resample_wind(timestamps, ws, wd=None, interval="2D"):
+    return resample_epoch(to_epoch_seconds(timestamps), ws, wd, interval)
+#---------------------------------------------------------------------#
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Series of the Weibull parameters k(t) and c(t) of the stations over a
+#  rolling time window.
+#
+#  For each station of the registry Stations.json, the data is loaded and
+#  the gaps are masked out. k and c are then estimated over a window of
+#  length window moved by step (30 days moved by 1 day by default), all the
+#  windows of a station being fitted together (see Weibull_rolling.py). The
+#  series of all the stations are written to a single table, with one row
+#  per station and window, indexed by the end time of the window.
+#
+#  Usage:
+#      ./Wind_rolling_Weibull.py                  all the stations
+#      ./Wind_rolling_Weibull.py Name1 Name2 ...  only the stations named
+#
+#
+
+
+from sys import argv
+import pandas as pd
+from Wind_registry import select_stations, load_station
+from Weibull_rolling import rolling_methods, rolling_Weibull
+
+
+###  Length of the window and step by which it is moved (the window must  ###
+###  be a whole number of steps)  ###
+window = "30D"
+step = "1D"
+
+###  Weibull parameter estimation methods (ML may be added; it then keeps  ###
+###  the counts of the distinct wind speeds of every window)  ###
+methods = rolling_methods
+
+###  Smallest number of wind speeds in a window for k and c to be given  ###
+###  (e.g. 30 for the daily Weather Underground and Meteostat data)  ###
+min_count = 30
+
+###  File where the table of results is written  ###
+ReportPath = "./Rolling_Weibull.csv"
+
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
+
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
+
+
+
+###  BEGIN Select stations  ###
+
+available = select_stations(argv)
+
+###  END Select stations  ###
+
+
+
+###  BEGIN Rolling Weibull parameters  ###
+
+series = []
+for station in available:
+    ##  Load the data, masking out the gaps
+    wind_df = load_station(station, nproc=nproc, cache_dir=cache_dir)
+
+    ##  k and c over the rolling windows
+    W_roll = rolling_Weibull(wind_df[station.ts_col].to_numpy(), wind_df[station.ws_col].to_numpy(),
+                             window, step, station.bin_size, methods=methods, min_count=min_count)
+
+    nvalid = int( (W_roll['count'] >= min_count).sum() )
+
+    print()
+    print("------------------------------------------------------------")
+    print("{:s} ({:s}): {:d} windows of {:s} moved by {:s}, {:d} with at least {:d} wind speeds".format(station.station, station.location, len(W_roll), window, step, nvalid, min_count))
+    print("------------------------------------------------------------")
+    print(W_roll.iloc[:5].to_string(float_format="{:.3f}".format))
+    print(". . .")
+    print(W_roll.iloc[-5:].to_string(float_format="{:.3f}".format))
+
+    W_roll.insert(0, 'station', station.station)
+    series.append(W_roll)
+
+###  END Rolling Weibull parameters  ###
+
+
+
+###  BEGIN Write report  ###
+
+pd.concat(series).to_csv(ReportPath, float_format="%.6g")
+print("\nWrote {:s}".format(ReportPath))
+
+###  END Write report  ###
+
+
+print()
+exit(0)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Directional analysis of the wind data of the stations: wind rose and
+#  Weibull parameters in each sector of wind direction.
+#
+#  For each station of the registry Stations.json which records the wind
+#  direction, the data is loaded and the gaps are masked out. The wind
+#  directions are split into nsectors sectors, and the histogram and the
+#  Weibull parameters of every sector are computed together (see
+#  Wind_sectors.py). The frequency, mean wind speed and k and c of each
+#  sector are printed, and the wind rose is shown or saved to plot_dir.
+#
+#  Usage:
+#      ./Wind_sector_analysis.py                  all the stations
+#      ./Wind_sector_analysis.py Name1 Name2 ...  only the stations named
+#
+#
+
+
+from sys import argv
+import pandas as pd
+from Wind_registry import select_stations, load_station
+from Wind_sectors import sector_analysis
+from Weibull_methods import W_param_est
+from Wind_plots import pyplot, show_figure, figure_wind_rose
+
+
+###  Number of sectors of wind direction (4, 8, 16 are named N, NE, ...)  ###
+nsectors = 12
+
+###  Methods whose k and c are printed for each sector  ###
+methods = ["EMJ", "ML", "MM", "EPF"]
+
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
+
+###  Directory for the binary cache of parsed data files (None to disable)  ###
+cache_dir = "./.wind_cache"
+
+###  Units of the wind speeds of each data source in the wind rose  ###
+ws_units = { 'Meteostat': "km/h" }
+
+###  Directory where the figures are saved (None to show them on screen;  ###
+###  they are saved to ./Plots anyway if there is no display)  ###
+plot_dir = None
+
+
+
+###  BEGIN Select stations  ###
+
+available = select_stations(argv, need_wd=True)
+
+###  END Select stations  ###
+
+
+
+###  BEGIN Sector analysis  ###
+
+plt = pyplot(plot_dir)
+
+for station in available:
+    ##  Load the data, masking out the gaps
+    wind_df = load_station(station, nproc=nproc, cache_dir=cache_dir)
+
+    ##  Histograms and Weibull parameters of the sectors
+    sectors = sector_analysis(wind_df[station.wd_col].to_numpy(), wind_df[station.ws_col].to_numpy(),
+                              station.bin_size, nsectors, W_param_est)
+
+    table = { 'sector': sectors.names,
+              'centre': sectors.centres,
+              'freq (%)': 100.0 * sectors.frequency,
+              'count': sectors.stats.count,
+              'mean': sectors.stats.mean,
+              'stddev': sectors.stats.stddev }
+    for method in methods:
+        table['k ' + method] = sectors.W_params[method][0]
+        table['c ' + method] = sectors.W_params[method][1]
+
+    print()
+    print("------------------------------------------------------------")
+    print("{:s} ({:s}): {:d} wind speeds with direction in {:d} sectors".format(station.station, station.location, int(sectors.stats.count.sum()), nsectors))
+    print("------------------------------------------------------------")
+    print(pd.DataFrame(table).to_string(index=False, float_format="{:.3f}".format))
+
+    ##  Wind rose
+    fig = figure_wind_rose(plt, sectors.stats.hist_w8ts, sectors.stats.hist_edges, sectors.centres, units=ws_units.get(station.source, "m/s"))
+    show_figure(fig, plot_dir, station.station + "_wind_rose")
+
+###  END Sector analysis  ###
+
+
+print()
+exit(0)
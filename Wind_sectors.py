@@ -0,0 +1,114 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#
+#  Directional (sector) analysis of the wind data.
+#
+#  The wind directions are split into nsectors sectors of equal width, the
+#  first one centred on north (e.g. 12 sectors of 30 degrees: 345-15, 15-45,
+#  ...). The sector of each sample is used as the data set label of
+#  batch_stats() (Weibull_batch.py), which builds the moments, the
+#  (sector x speed bin) histogram and the table of distinct wind speeds of
+#  all the sectors together with np.bincount, in one pass over the data. The
+#  Weibull parameters of every sector are then estimated at once with the
+#  vectorized estimators of Weibull_batch.py.
+#
+#  Samples without wind direction are left out.
+#
+#
+
+
+from collections import namedtuple
+import numpy as np
+from Weibull_methods import W_param_est
+from Weibull_batch import batch_stats, fit_Weibull_batch
+
+
+###  Default number of sectors  ###
+default_nsectors = 12
+
+###  Names of the directions for 4, 8 and 16 sectors  ###
+compass_names = { 4: ["N", "E", "S", "W"],
+                  8: ["N", "NE", "E", "SE", "S", "SW", "W", "NW"],
+                  16: ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+                       "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"] }
+
+###  Statistics of the sectors: centres of the sectors (degrees), their  ###
+###  names, frequency of each sector (fraction of the samples with a     ###
+###  direction), the WeibullBatchStats of the sectors and the estimates  ###
+###  { method: (k, c) } of arrays of shape (nsectors,)                    ###
+SectorStats = namedtuple('SectorStats', ['centres', 'names', 'frequency', 'stats', 'W_params'])
+
+
+#---------------------------------------------------------------------#
+#  Centres (degrees) and names of nsectors sectors. Sectors other than 4, 8
+#  and 16 are named by their centre.
+#
+def sector_centres(nsectors):
+    return np.arange(nsectors) * (360.0 / nsectors)
+
+
+def sector_names(nsectors):
+    if nsectors in compass_names:
+        return compass_names[nsectors]
+
+    return [ "{:g}".format(centre) for centre in sector_centres(nsectors) ]
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Index (0 to nsectors-1) of the sector of each wind direction wd
+#  (degrees), -1 for a missing direction.
+#
+def sector_index(wd, nsectors=default_nsectors):
+    wd = np.asarray(wd, dtype=np.float64)
+    width = 360.0 / nsectors
+
+    ok = np.isfinite(wd)
+    idx = np.full(len(wd), -1, dtype=np.int64)
+    idx[ok] = np.floor( np.mod(wd[ok] + 0.5*width, 360.0) / width ).astype(np.int64) % nsectors
+
+    return idx
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Statistics and Weibull parameters of the wind speeds ws in each of
+#  nsectors sectors of the directions wd, with histogram bins of bin_size.
+#  The histograms of all the sectors share the bins of the histogram of
+#  all the data (up to the ceiling of the largest wind speed).
+#
+#  Returns a SectorStats.
+#
+def sector_analysis(wd, ws, bin_size, nsectors=default_nsectors, methods=W_param_est):
+    labels = sector_index(wd, nsectors)
+
+    # The table of distinct wind speeds is only needed for ML and MML
+    distinct = ("ML" in methods) or ("MML" in methods)
+    bs = batch_stats(ws, labels, nsectors, bin_size, distinct=distinct)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frequency = bs.count / bs.count.sum()
+        W_params = fit_Weibull_batch(bs, methods)
+
+    return SectorStats(sector_centres(nsectors), sector_names(nsectors), frequency, bs, W_params)
+#---------------------------------------------------------------------#
@@ -0,0 +1,251 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Streaming statistics of wind speed data.
+#
+#  The scripts compute the histogram, mean and standard deviation of the
+#  wind speeds with
+#
+#      ceil_ws = np.ceil(avg_ws.max())
+#      hist_w8ts, hist_edges = np.histogram( avg_ws, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws) )
+#      ws_mean = avg_ws.mean()
+#      ws_stddev = np.std(avg_ws)
+#
+#  which needs the full wind speed array in memory. WindSpeedStats gives the
+#  same quantities from chunks of data (e.g. the memory maps of a station
+#  store, see stream_array_stats()) with bounded memory. It keeps:
+#
+#  - the count and maximum of the wind speeds, with the mean and variance
+#    accumulated chunk by chunk (Chan et al.) for accuracy,
+#  - fixed-width bin counts from 0 m/s, extended whenever a larger wind speed
+#    shows up,
+#  - a table of the distinct wind speeds with their counts, as long as there
+#    are fewer than max_distinct of them. Anemometer data is quantized, so
+#    this table is usually small.
+#
+#  np.histogram places the edges at np.linspace(0, ceil_ws, nbins + 1). When
+#  ceil_ws / nbins rounds to bin_size (e.g. bin sizes of 0.1, 0.2, 0.25, 0.5
+#  and 1.0 m/s), these edges coincide with those of the fixed-width bins and
+#  the bin counts give the same histogram as the scripts. Otherwise (e.g.
+#  1.5 m/s for Meteostat), the histogram is computed from the table of
+#  distinct wind speeds.
+#
+#  The table of distinct wind speeds with their counts (ValueCounts) can also
+#  be built directly from a wind speed array with value_counts(). Since the
+#  anemometer data is quantized, a few hundred distinct values usually
+#  stand for millions of data points, and the moments, the histogram and
+#  the ML estimator (see Weibull_methods.py) are computed from the table
+#  instead of the full array.
+#
+#
+
+
+from collections import namedtuple
+import numpy as np
+
+
+###  Distinct wind speeds (sorted) and the number of times each occurs  ###
+ValueCounts = namedtuple('ValueCounts', ['values', 'counts'])
+
+
+#---------------------------------------------------------------------#
+#  Table of the distinct wind speeds of array ws. NaN values are ignored.
+#
+def value_counts(ws):
+    ws = np.asarray(ws, dtype=np.float64)
+    values, counts = np.unique(ws[ np.logical_not( np.isnan(ws) ) ], return_counts=True)
+
+    return ValueCounts(values, counts.astype(np.int64))
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Merge two tables of distinct wind speeds.
+#
+def merge_value_counts(vc1, vc2):
+    values, inverse = np.unique(np.concatenate(( vc1.values, vc2.values )), return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=np.concatenate(( vc1.counts, vc2.counts )), minlength=len(values))
+
+    return ValueCounts(values, counts.astype(np.int64))
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Number of data points, mean and standard deviation (as np.std) of the
+#  wind speeds in table vc.
+#
+def value_counts_moments(vc):
+    n = vc.counts.sum()
+    mean = (vc.counts @ vc.values) / n
+    dev = vc.values - mean
+
+    return n, mean, np.sqrt( (vc.counts @ (dev * dev)) / n )
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Histogram over [0, ceil_ws] with int(ceil_ws / bin_size) bins of the
+#  wind speeds in table vc, where ceil_ws is the ceiling of the largest
+#  wind speed, as computed in the scripts. Returns hist_w8ts, hist_edges.
+#
+def value_counts_histogram(vc, bin_size):
+    ceil_ws = np.ceil(vc.values.max())
+    hist_w8ts, hist_edges = np.histogram(vc.values, bins=int(ceil_ws / bin_size), range=(0.0, ceil_ws), weights=vc.counts)
+
+    return np.rint(hist_w8ts).astype(np.int64), hist_edges
+#---------------------------------------------------------------------#
+
+
+
+class WindSpeedStats:
+
+    #---------------------------------------------------------------------#
+    def __init__(self, bin_size, max_distinct=100000):
+        self.bin_size = bin_size
+        self.max_distinct = max_distinct
+
+        self.count = 0
+        self.max = -np.inf
+
+        # Running mean and sum of squared deviations from the mean
+        self._mean = 0.0
+        self._M2 = 0.0
+
+        # Fixed-width bin counts, edges at i * bin_size
+        self.bin_counts = np.zeros(0, dtype=np.int64)
+
+        # Distinct wind speeds and their counts (None once too many)
+        self.values = np.zeros(0, dtype=np.float64)
+        self.counts = np.zeros(0, dtype=np.int64)
+    #---------------------------------------------------------------------#
+
+
+    #---------------------------------------------------------------------#
+    #  Add a chunk of wind speeds. NaN values are ignored.
+    #
+    def add(self, ws):
+        ws = np.asarray(ws, dtype=np.float64)
+        ws = ws[ np.logical_not( np.isnan(ws) ) ]
+        n = len(ws)
+        if (n == 0):
+            return
+
+        ##  Moments
+        chunk_mean = ws.mean()
+        chunk_M2 = ((ws - chunk_mean)**2).sum()
+
+        delta = chunk_mean - self._mean
+        total = self.count + n
+        self._mean = self._mean + delta * n / total
+        self._M2 = self._M2 + chunk_M2 + delta * delta * self.count * n / total
+
+        self.count = total
+        self.max = max(self.max, ws.max())
+
+
+        ##  Fixed-width bins, extended up to the current maximum
+        #
+        #  Bin i holds i*bin_size <= u < (i+1)*bin_size. The edges are passed
+        #  explicitly to np.histogram so that the values lying on an edge are
+        #  assigned exactly as np.histogram does in the scripts.
+        #
+        nbins = int( np.floor(self.max / self.bin_size) ) + 2
+        if (nbins > len(self.bin_counts)):
+            self.bin_counts = np.concatenate(( self.bin_counts, np.zeros(nbins - len(self.bin_counts), dtype=np.int64) ))
+
+        edges = np.arange(nbins + 1) * self.bin_size
+        self.bin_counts = self.bin_counts + np.histogram(ws, bins=edges)[0]
+
+
+        ##  Distinct values
+        if self.values is not None:
+            self.values, self.counts = merge_value_counts(ValueCounts(self.values, self.counts), value_counts(ws))
+
+            if (len(self.values) > self.max_distinct):
+                self.values = None
+                self.counts = None
+    #---------------------------------------------------------------------#
+
+
+    #---------------------------------------------------------------------#
+    #  Mean, standard deviation (as np.std) and ceiling of the maximum.
+    #
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def stddev(self):
+        return np.sqrt(self._M2 / self.count)
+
+    @property
+    def ceil_ws(self):
+        return np.ceil(self.max)
+    #---------------------------------------------------------------------#
+
+
+    #---------------------------------------------------------------------#
+    #  Histogram over [0, ceil_ws] with int(ceil_ws / bin_size) bins, as
+    #  computed in the scripts. Returns hist_w8ts, hist_edges.
+    #
+    def histogram(self):
+        ceil_ws = self.ceil_ws
+        nbins = int(ceil_ws / self.bin_size)
+        hist_edges = np.linspace(0.0, ceil_ws, nbins + 1)
+
+        if np.array_equal(hist_edges[:-1], np.arange(nbins) * self.bin_size):
+            # The bins of the scripts are the fixed-width bins. The values
+            # between nbins*bin_size and ceil_ws (included) belong to the
+            # last bin.
+            hist_w8ts = np.zeros(nbins, dtype=np.int64)
+            n = min(nbins, len(self.bin_counts))
+            hist_w8ts[:n] = self.bin_counts[:n]
+            hist_w8ts[-1] = hist_w8ts[-1] + self.bin_counts[nbins:].sum()
+
+            return hist_w8ts, hist_edges
+
+        if self.values is None:
+            raise ValueError("Bin size {:g} m/s does not divide the histogram range into fixed-width bins, and there are too many distinct wind speeds to rebuild it".format(self.bin_size))
+
+        return value_counts_histogram(ValueCounts(self.values, self.counts), self.bin_size)
+    #---------------------------------------------------------------------#
+
+
+
+#---------------------------------------------------------------------#
+#  Accumulate the wind speeds of a large array ws (e.g. the memory map of a
+#  station store, see Wind_store.py) chunk_rows rows at a time, so that only
+#  one chunk is copied in memory at once. keep is an optional boolean mask
+#  of the rows to use.
+#
+def stream_array_stats(ws, bin_size, keep=None, chunk_rows=1000000):
+    stats = WindSpeedStats(bin_size)
+
+    for lo in range(0, len(ws), chunk_rows):
+        chunk = np.asarray(ws[lo:lo + chunk_rows])
+        if keep is not None:
+            chunk = chunk[ keep[lo:lo + chunk_rows] ]
+
+        stats.add(chunk)
+
+    return stats
+#---------------------------------------------------------------------#
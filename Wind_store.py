@@ -0,0 +1,301 @@
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Memory-mapped time series store for one weather station.
+#
+#  The time stamps (seconds since 1970-01-01, int64), wind directions
+#  (float32) and wind speeds (float64) are written as three contiguous binary
+#  files in a store directory, together with a small JSON file describing
+#  them:
+#
+#      store_dir/meta.json
+#      store_dir/time.bin
+#      store_dir/wd.bin
+#      store_dir/ws.bin
+#
+#  The arrays are opened with np.memmap, so that the wind speed array can be
+#  passed to np.histogram, etc. as a zero-copy view: the pages are read from
+#  disk only when needed and are shared by all the processes which open the
+#  same store.
+#
+#  A store can be updated incrementally from a data directory which grows by
+#  one file per month. meta.json then also holds a manifest of the files
+#  already ingested (size, modification time, SHA-1 checksum, and position
+#  of their rows in the arrays). Only new or modified files are parsed; their
+#  rows are appended to the arrays after truncating the rows of any modified
+#  file and of the files which follow it. The pyramid of aggregates of the
+#  store (10 minutes, 1 hour, 1 day and 1 month, see Wind_pyramid.py) is
+#  updated at the same time.
+#
+#
+
+
+from os import path, makedirs, replace, listdir, stat
+from collections import namedtuple
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from Wind_loader import IngestReport, read_files
+
+
+###  Data type of each array in the store  ###
+store_dtypes = { 'time': np.int64, 'wd': np.float32, 'ws': np.float64 }
+
+###  Arrays of a station store  ###
+StationArrays = namedtuple('StationArrays', ['time', 'wd', 'ws'])
+
+
+#---------------------------------------------------------------------#
+#  Convert a datetime64 array (or Series) to seconds since 1970-01-01.
+#
+def to_epoch_seconds(timestamps):
+    return np.asarray(timestamps, dtype='datetime64[s]').astype(np.int64)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Read / write the JSON description of a store.
+#
+def read_store_meta(store_dir):
+    with open(store_dir + "/meta.json", 'r') as f:
+        return json.load(f)
+
+
+def write_store_meta(store_dir, meta):
+    # Write to a temporary file first so that the description is never
+    # left half-written
+    with open(store_dir + "/meta.json.tmp", 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    replace(store_dir + "/meta.json.tmp", store_dir + "/meta.json")
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Write the time stamps, wind directions and wind speeds of a station to
+#  store_dir, replacing any existing store. station is a free-form string
+#  saved in the description of the store.
+#
+def write_station_store(store_dir, timestamps, wd, ws, station=""):
+    makedirs(store_dir, exist_ok=True)
+
+    arrays = { 'time': to_epoch_seconds(timestamps),
+               'wd': np.asarray(wd, dtype=store_dtypes['wd']),
+               'ws': np.asarray(ws, dtype=store_dtypes['ws']) }
+
+    if not (len(arrays['time']) == len(arrays['wd']) == len(arrays['ws'])):
+        raise ValueError("time, wd and ws arrays must have the same length")
+
+    for name in arrays:
+        np.ascontiguousarray(arrays[name], dtype=store_dtypes[name]).tofile(store_dir + "/" + name + ".bin")
+
+    write_store_meta(store_dir, { 'station': station,
+                                  'length': len(arrays['time']),
+                                  'dtypes': { name: np.dtype(store_dtypes[name]).str for name in store_dtypes } })
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Open the arrays of a station store as read-only memory maps.
+#
+def open_station_store(store_dir):
+    meta = read_store_meta(store_dir)
+    n = meta['length']
+
+    arrays = {}
+    for name in store_dtypes:
+        if (n == 0):
+            # np.memmap cannot map an empty file
+            arrays[name] = np.zeros(0, dtype=store_dtypes[name])
+        else:
+            arrays[name] = np.memmap(store_dir + "/" + name + ".bin", dtype=store_dtypes[name], mode='r', shape=(n,))
+
+    return StationArrays(arrays['time'], arrays['wd'], arrays['ws'])
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Data frame with columns ts_col, wd_col and ws_col, backed by the memory
+#  maps of a station store. The time stamps are a datetime64[s] view of the
+#  epoch seconds; since each column has its own data type, pandas does not
+#  need to consolidate (i.e. copy) them. wd_col may be None for sources
+#  without wind direction.
+#
+def station_store_df(store_dir, ts_col, wd_col, ws_col):
+    st = open_station_store(store_dir)
+
+    columns = { ts_col: st.time.view('datetime64[s]') }
+    if wd_col is not None:
+        columns[wd_col] = st.wd
+    columns[ws_col] = st.ws
+
+    return pd.DataFrame(columns, copy=False)
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  SHA-1 checksum of a data file.
+#
+def file_sha1(filename):
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(1048576), b''):
+            h.update(block)
+
+    return h.hexdigest()
+#---------------------------------------------------------------------#
+
+
+#---------------------------------------------------------------------#
+#  Bring the store in store_dir up to date with the files of directory
+#  dirpath, read with reader(filename, *reader_args).
+#
+#  columns = (ts_col, wd_col, ws_col) gives the names of the time stamp,
+#  wind direction and wind speed columns in the data frames returned by
+#  reader. wd_col may be None for sources without wind direction (Weather
+#  Underground), in which case NaN is stored. nproc is passed on to
+#  read_files().
+#
+#  The files of the manifest are compared in sorted order with the files
+#  now in dirpath. Files whose size and modification time are unchanged are
+#  kept without being read. If they have changed, the checksum is computed
+#  and the file is kept only if the checksum is the same. From the first
+#  file which is new, modified or removed, the rows are dropped from the
+#  store and the remaining files are parsed and appended.
+#
+#  Returns an IngestReport giving the number of files and bytes parsed, and
+#  the number of rows appended.
+#
+def update_station_store(store_dir, dirpath, columns, reader, *reader_args, nproc=1, station=""):
+    ts_col, wd_col, ws_col = columns
+    filelist = sorted( listdir(dirpath) )
+
+    if path.isfile(store_dir + "/meta.json"):
+        meta = read_store_meta(store_dir)
+    else:
+        meta = { 'station': station, 'length': 0 }
+
+    meta['dtypes'] = { name: np.dtype(store_dtypes[name]).str for name in store_dtypes }
+
+    # A store written without manifest is rebuilt from scratch
+    manifest = meta.get('files', [])
+    if (len(manifest) == 0):
+        meta['length'] = 0
+
+
+    ##  Find the first file which is new, modified or removed
+    keep = 0
+    while (keep < len(manifest)) and (keep < len(filelist)):
+        entry = manifest[keep]
+        if (entry['name'] != filelist[keep]):
+            break
+
+        st = stat(dirpath + "/" + filelist[keep])
+        if (st.st_size != entry['size']) or (st.st_mtime_ns != entry['mtime_ns']):
+            if (file_sha1(dirpath + "/" + filelist[keep]) != entry['sha1']):
+                break
+
+            # Only touched: the content is the same
+            entry['size'] = st.st_size
+            entry['mtime_ns'] = st.st_mtime_ns
+
+        keep = keep + 1
+
+    if (keep < len(manifest)):
+        offset = manifest[keep]['offset']
+    else:
+        offset = meta['length']
+
+    manifest = manifest[:keep]
+    new_files = filelist[keep:]
+
+    print("\nStore {:s}: {:d} files up to date, {:d} files to parse".format(store_dir, keep, len(new_files)))
+
+
+    ##  Parse the new files
+    filenames = [ dirpath + "/" + name for name in new_files ]
+    frames = read_files(filenames, reader, reader_args, nproc=nproc)
+
+    nbytes = 0
+    new_arrays = { 'time': [], 'wd': [], 'ws': [] }
+    n = offset
+    for i in range(len(filenames)):
+        st = stat(filenames[i])
+        nbytes = nbytes + st.st_size
+        nrows = len(frames[i])
+
+        new_arrays['time'].append( to_epoch_seconds(frames[i][ts_col].to_numpy()) )
+        new_arrays['ws'].append( frames[i][ws_col].to_numpy(dtype=store_dtypes['ws']) )
+        if wd_col is None:
+            new_arrays['wd'].append( np.full(nrows, np.nan, dtype=store_dtypes['wd']) )
+        else:
+            new_arrays['wd'].append( frames[i][wd_col].to_numpy(dtype=store_dtypes['wd']) )
+
+        manifest.append({ 'name': new_files[i],
+                          'size': st.st_size,
+                          'mtime_ns': st.st_mtime_ns,
+                          'sha1': file_sha1(filenames[i]),
+                          'offset': n,
+                          'rows': nrows })
+        n = n + nrows
+
+
+    ##  First time stamp which changes: the first row dropped or appended
+    since = None
+    if (offset < meta['length']):
+        since = int( np.fromfile(store_dir + "/time.bin", dtype=store_dtypes['time'], count=1, offset=offset * np.dtype(store_dtypes['time']).itemsize)[0] )
+    if (n > offset):
+        first_new = int( np.concatenate(new_arrays['time']).min() )
+        since = first_new if (since is None) else min(since, first_new)
+
+
+    ##  Truncate the arrays after the files kept, and append the new rows
+    makedirs(store_dir, exist_ok=True)
+    for name in store_dtypes:
+        filename = store_dir + "/" + name + ".bin"
+        mode = 'r+b' if path.isfile(filename) else 'wb'
+
+        with open(filename, mode) as f:
+            f.truncate(offset * np.dtype(store_dtypes[name]).itemsize)
+            f.seek(0, 2)
+
+            for arr in new_arrays[name]:
+                np.ascontiguousarray(arr, dtype=store_dtypes[name]).tofile(f)
+
+    # The description is written last: if the update is interrupted, the
+    # arrays are truncated back to the old length on the next update
+    meta['length'] = n
+    meta['files'] = manifest
+    write_store_meta(store_dir, meta)
+
+    report = IngestReport(len(new_files), nbytes, n - offset)
+    print("Appended {:d} rows from {:d} files ({:.2f} MB), store now has {:d} rows".format(report.rows, report.files, report.bytes / 1048576.0, n))
+
+    # Aggregates of the pyramid from the first time stamp which changed
+    # (imported here since Wind_pyramid.py reads the store with this module)
+    from Wind_pyramid import update_pyramid, pyramid_up_to_date
+    if (since is not None) or not pyramid_up_to_date(store_dir):
+        update_pyramid(store_dir, since)
+
+    return report
+#---------------------------------------------------------------------#
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+#
+#  Copyright (c) 2022 Nitish Ragoomundun, Mauritius
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#
+#
+#  Incremental update of the memory-mapped station stores (see
+#  Wind_store.py) for the IOS-net and Weather Underground stations of the
+#  registry Stations.json.
+#
+#  The data directories grow by one file per month. Only the files which are
+#  new or have been modified since the last update are parsed and appended to
+#  the stores, so that this script can be run every night.
+#
+#
+
+
+from os import path
+from Wind_registry import load_registry
+from Wind_store import update_station_store
+
+
+###  Directory where the station stores are kept  ###
+StorePath = "./Station_store"
+
+###  Number of worker processes used to parse the data files  ###
+nproc = 4
+
+
+###  Data sources whose stations are kept in stores (see Stations.json)  ###
+store_sources = ["IOS-net", "WU"]
+
+
+
+###  BEGIN Update stores  ###
+
+for station in load_registry().values():
+    if station.source not in store_sources:
+        continue
+
+    if not path.isdir(station.path):
+        print("{:s} is not a directory! Skipping {:s}".format(station.path, station.station))
+        continue
+
+    update_station_store(StorePath + "/" + station.station, station.path,
+                         [station.ts_col, station.wd_col, station.ws_col],
+                         station.reader, *station.reader_args,
+                         nproc=nproc, station=station.station)
+
+###  END Update stores  ###
+
+
+print()
+exit(0)